@@ -4,12 +4,14 @@ Enhanced PDF Anonymization App - Refactored Main Module with Text Processing
 import gradio as gr
 import os
 import shutil
+import tempfile
 from datetime import datetime
 import logging
 from typing import List, Dict, Tuple, Optional
 import torch
 from transformers import AutoTokenizer, AutoModelForTokenClassification, pipeline
 import re
+import fitz  # PyMuPDF
 
 # Import refactored modules
 from pdf.extractor import PDFExtractor
@@ -17,16 +19,30 @@ from pdf.redact import PDFRedactor
 from pdf.replace import PDFReplacer
 from pdf.validators import PDFValidators
 from pdf.text_processor import TextProcessor  # New import
+from pdf.gazetteer import GazetteerDetector
+from pdf.propagation import EntityPropagator
+from pdf.ner_decoder import FastNERDecoder, NERRunner
+from pdf.ner_cache import (ChunkResultCache, DetectionCache, FileHashCache, compute_bytes_hash,
+                           compute_file_hash, copy_entities)
+from pdf.pipeline import StreamingPipeline
+from pdf.verify import LeakVerifier
+from pdf.checkpoint import ProcessingCheckpoint
+from pdf.sharding import PDFSharder
+from pdf.preview import PDFPreviewer
+from pdf.spans import SpanTable
 
 # Import custom data lists
 from samplelists import (
     iban_samples, email_samples, adres_len_samples, ad_soyad_len_samples,
     sirket_len_samples, tarih_samples, telefon_samples, adres_samples,
-    para_samples, ad_soyad_samples, sirket_samples
+    para_samples, ad_soyad_samples, sirket_samples, sirketler
 )
 
 
 class EnhancedAnonymizationApp:
+    # Confidence threshold slider positions (min 0.1, max 1.0, step 0.1)
+    THRESHOLD_STEPS = [round(step / 10, 1) for step in range(1, 11)]
+
     def __init__(self):
         # Logger setup
         logging.basicConfig(level=logging.INFO)
@@ -39,16 +55,44 @@ class EnhancedAnonymizationApp:
         self.extractor = PDFExtractor()
         self.redactor = PDFRedactor()
         self.replacer = PDFReplacer()
+
+        # Re-scan every output for original entity text
+        self.verifier = LeakVerifier()
+
+        # Detect-only previews (entity geometry + thumbnails) for review before apply
+        self.previewer = PDFPreviewer()
         
         # Organize custom data and initialize validators
         self.organized_data = self._organize_data_by_length()
         self.validators = PDFValidators(self.organized_data)
 
-        # Load NER model
+        # Gazetteer of known names (sample lists + customer lists in gazetteers/)
+        self.gazetteer_dir = "gazetteers"
+        self.gazetteer = self._build_gazetteer()
+        self.propagator = EntityPropagator()
+
+        # Un-thresholded candidates per document, so threshold changes skip re-inference
+        self.detection_cache = DetectionCache()
+        self.file_hashes = FileHashCache()
+
+        # Load NER model (the fast decoder is set up alongside the pipeline)
+        self.fast_decoder = None
         self.ner_pipeline = self.load_custom_ner_model()
 
+        # Chunk-level result cache for repeated boilerplate (set a path to persist it on disk)
+        self.chunk_cache_path = None
+        self.chunk_cache = ChunkResultCache(model_version=self._get_model_version(),
+                                            disk_path=self.chunk_cache_path)
+        self.ner_runner = NERRunner(self.ner_pipeline, self.fast_decoder, self.chunk_cache)
+
         # Initialize text processor
-        self.text_processor = TextProcessor(self.ner_pipeline, self.validators, self.organized_data)
+        self.text_processor = TextProcessor(self.ner_pipeline, self.validators, self.organized_data,
+                                            gazetteer=self.gazetteer, ner_runner=self.ner_runner)
+
+        # Process uploads as one in-memory document; uploads/ and outputs/ copies only when archiving
+        self.in_memory_processing = True
+        self.archive_files = False
+        self.temp_output_dir = tempfile.mkdtemp(prefix="anonymization_")
 
         # Create directories
         for dir_name in ["uploads", "outputs"]:
@@ -106,6 +150,33 @@ class EnhancedAnonymizationApp:
 
         return organized
 
+    def _build_gazetteer(self) -> GazetteerDetector:
+        """Compile known organisation and person names into a gazetteer detector"""
+        gazetteer = GazetteerDetector()
+        gazetteer.add_terms('sirket', sirket_samples + sirketler)
+        # Single first names ("Ali", "Can") are ordinary words too, only full names are used
+        gazetteer.add_terms('ad_soyad', [name for name in ad_soyad_samples if ' ' in name.strip()])
+        gazetteer.load_terms_directory(self.gazetteer_dir)
+
+        self.logger.info(f"Gazetteer ready with {len(gazetteer)} terms")
+        return gazetteer
+
+    def _get_model_version(self) -> str:
+        """Identify the loaded model by path and latest file modification time"""
+        try:
+            mtimes = [os.path.getmtime(os.path.join(self.model_path, name))
+                      for name in os.listdir(self.model_path)]
+            return f"{os.path.abspath(self.model_path)}@{max(mtimes, default=0):.0f}"
+        except OSError:
+            return os.path.abspath(self.model_path)
+
+    def get_cache_metrics(self) -> Dict:
+        """Hit rate and memory metrics of the NER caches"""
+        return {
+            'chunk_cache': self.chunk_cache.get_metrics(),
+            'detection_cache_documents': len(self.detection_cache)
+        }
+
     def load_custom_ner_model(self):
         """Load custom NER model"""
         try:
@@ -126,6 +197,12 @@ class EnhancedAnonymizationApp:
                 device=0 if torch.cuda.is_available() else -1
             )
 
+            # Batched inference with NumPy BIO decoding (needs offset mapping)
+            if getattr(tokenizer, "is_fast", False):
+                self.fast_decoder = FastNERDecoder(tokenizer, ner_pipeline.model)
+            else:
+                self.logger.warning("Slow tokenizer: fast NER decoding disabled, using pipeline")
+
             self.logger.info("Model loaded successfully!")
             return ner_pipeline
 
@@ -136,21 +213,37 @@ class EnhancedAnonymizationApp:
     def extract_entities_with_custom_model(self, full_text: str, text_blocks: List[Dict], 
                                          confidence_threshold: float, progress) -> List[Dict]:
         """Extract entities using custom NER model + regex for TC kimlik"""
+        candidates = self.collect_entity_candidates(full_text, text_blocks, progress)
+        return self.select_entities(candidates, full_text, text_blocks, confidence_threshold)
+
+    def collect_entity_candidates(self, full_text: str, text_blocks: List[Dict], progress) -> List[Dict]:
+        """Collect un-thresholded entity candidates (model, TC kimlik regex, gazetteer)"""
         try:
+            text_blocks = SpanTable.coerce(text_blocks)  # once, not per entity lookup
+
+            # Headers/footers repeated on many pages go through NER once (copies are blanked)
+            repeats = self.extractor.find_repeated_spans(text_blocks)
+            ner_text = self.extractor.mask_repeated_text(text_blocks, repeats)
+
             # Split text into chunks
             max_length = 512
             text_chunks = []
             chunk_start = 0
 
-            while chunk_start < len(full_text):
-                chunk_end = min(chunk_start + max_length, len(full_text))
+            while chunk_start < len(ner_text):
+                chunk_end = min(chunk_start + max_length, len(ner_text))
 
-                if chunk_end < len(full_text):
-                    last_space = full_text.rfind(' ', chunk_start, chunk_end)
+                if chunk_end < len(ner_text):
+                    last_space = ner_text.rfind(' ', chunk_start, chunk_end)
                     if last_space > chunk_start:
                         chunk_end = last_space
 
-                chunk_text = full_text[chunk_start:chunk_end]
+                chunk_text = ner_text[chunk_start:chunk_end]
+                if not chunk_text.strip():
+                    # Nothing but blanked repeats
+                    chunk_start = chunk_end
+                    continue
+
                 text_chunks.append({
                     'text': chunk_text,
                     'start_offset': chunk_start,
@@ -162,54 +255,164 @@ class EnhancedAnonymizationApp:
 
             all_entities = []
 
-            # Run NER on each chunk
-            for i, chunk in enumerate(text_chunks):
-                try:
-                    results = self.ner_pipeline(chunk['text'])
+            # Run NER on all chunks (batched when the fast decoder is available)
+            chunk_results = self.ner_runner.run([chunk['text'] for chunk in text_chunks])
 
-                    for result in results:
-                        if result['score'] >= confidence_threshold:
-                            entity_start = chunk['start_offset'] + result['start']
-                            entity_end = chunk['start_offset'] + result['end']
+            for chunk, results in zip(text_chunks, chunk_results):
+                for result in results:
+                    entity_start = chunk['start_offset'] + result['start']
+                    entity_end = chunk['start_offset'] + result['end']
 
-                            text_block_info = self.extractor.find_text_block_for_position(
-                                entity_start, entity_end, text_blocks, full_text
-                            )
+                    text_block_info = self.extractor.find_text_block_for_position(
+                        entity_start, entity_end, text_blocks, full_text
+                    )
 
-                            entity_dict = {
-                                'entity': self.map_model_label_to_type(result['entity_group']),
-                                'word': result['word'],
-                                'start': entity_start,
-                                'end': entity_end,
-                                'score': result['score'],
-                                'method': 'custom_ner',
-                                'text_block_info': text_block_info
-                            }
-                            all_entities.append(entity_dict)
-
-                except Exception as e:
-                    self.logger.warning(f"Chunk {i} processing error: {e}")
-                    continue
+                    entity_dict = {
+                        'entity': self.map_model_label_to_type(result['entity_group']),
+                        'word': result['word'],
+                        'start': entity_start,
+                        'end': entity_end,
+                        'score': result['score'],
+                        'method': 'custom_ner',
+                        'text_block_info': text_block_info
+                    }
+                    all_entities.append(entity_dict)
+
+            all_entities.extend(self.extractor.replay_repeated_entities(all_entities, text_blocks, repeats))
 
             progress(0.3, desc="TC kimlik regex check...")
 
             # TC kimlik regex detection
             tc_entities = self.detect_tc_kimlik_with_blocks(full_text, text_blocks)
 
+            # Known names from gazetteer lists
+            gazetteer_entities = self.detect_gazetteer_with_blocks(full_text, text_blocks)
+
+            metrics = self.chunk_cache.get_metrics()
+            self.logger.info(f"Chunk cache: hit rate {metrics['hit_rate']:.1%}, "
+                             f"{metrics['entries']} entries, {metrics['memory_mb']:.2f} MB")
+
+            return all_entities + tc_entities + gazetteer_entities
+
+        except Exception as e:
+            self.logger.error(f"Custom NER analysis error: {e}")
+            return []
+
+    def select_entities(self, candidates: List[Dict], full_text: str, text_blocks: List[Dict],
+                        confidence_threshold: float) -> List[Dict]:
+        """Threshold, merge and propagate entity candidates"""
+        try:
             # Merge and clean
-            combined_entities = self.validators.merge_and_clean_entities(
-                all_entities + tc_entities, confidence_threshold
-            )
+            combined_entities = self.validators.merge_and_clean_entities(candidates, confidence_threshold)
+
+            # Tag remaining occurrences of accepted entities (no extra model passes)
+            propagated_entities = self.propagate_entities_with_blocks(full_text, text_blocks, combined_entities)
+            if propagated_entities:
+                combined_entities = self.validators.merge_and_clean_entities(
+                    combined_entities + propagated_entities, confidence_threshold
+                )
 
             self.logger.info(f"Total {len(combined_entities)} entities detected")
             return combined_entities
 
         except Exception as e:
-            self.logger.error(f"Custom NER analysis error: {e}")
+            self.logger.error(f"Entity selection error: {e}")
             return []
 
+    def select_document_entities(self, doc_hash: str, candidates: List[Dict], full_text: str,
+                                 text_blocks: List[Dict], confidence_threshold: float) -> List[Dict]:
+        """Entities of a document at a threshold, reusing a detect-only preview when there is one"""
+        previewed = self.detection_cache.get_preview(doc_hash, confidence_threshold)
+        if previewed is not None:
+            self.logger.info(f"Using previewed entities of document {doc_hash[:12]}")
+            return previewed
+        return self.select_entities(candidates, full_text, text_blocks, confidence_threshold)
+
+    def censor_entities(self, entities: List[Dict]) -> List[Dict]:
+        """Set the star replacements of all PDF censoring paths (file, in-memory, streaming, page range)"""
+        return self.replacer.apply_censoring(self.validators.apply_censoring_strategy(entities))
+
+    def get_document_candidates(self, input_path, progress,
+                                doc_hash: Optional[str] = None) -> Tuple[List[Dict], str, List[Dict]]:
+        """
+        Get text blocks, full text and entity candidates for a PDF, reusing the session cache
+
+        Args:
+            input_path: PDF path, PDF bytes or open fitz.Document
+            progress: Progress callback
+            doc_hash: Content hash (computed from input_path if None)
+
+        Returns:
+            (text_blocks, full_text, candidates)
+        """
+        if doc_hash is None:
+            doc_hash = compute_file_hash(input_path)
+        cached = self.detection_cache.get(doc_hash)
+        if cached is not None:
+            self.logger.info(f"Detection cache hit for document {doc_hash[:12]}, skipping extraction and NER")
+            return cached['text_blocks'], cached['full_text'], cached['candidates']
+
+        # Extract text and positions from PDF
+        text_blocks = self.extractor.extract_text_with_positions(input_path)
+        full_text = text_blocks.full_text
+
+        if not full_text.strip():
+            return text_blocks, full_text, []
+
+        progress(0.2, desc="Running NER analysis...")
+
+        # Custom NER model analysis (un-thresholded)
+        candidates = self.collect_entity_candidates(full_text, text_blocks, progress)
+        self.detection_cache.put(doc_hash, text_blocks, full_text, candidates)
+        return text_blocks, full_text, candidates
+
+    def get_threshold_entity_counts(self, pdf_file, confidence_threshold: Optional[float] = None
+                                    ) -> Tuple[Dict[float, int], Optional[int]]:
+        """
+        Entity counts per confidence threshold for an already analysed PDF
+
+        The counts are those select_entities gives for the cached candidates (merged
+        and propagated), computed once per document; the upload is hashed once per
+        (path, mtime, size), so moving the slider reads neither the file nor the model.
+
+        Args:
+            pdf_file: Uploaded PDF file
+            confidence_threshold: Threshold whose entity count is returned (None = skip)
+
+        Returns:
+            (dict mapping slider threshold to entity count, entity count at
+            confidence_threshold or None); ({}, None) if the PDF is not cached yet
+        """
+        if pdf_file is None:
+            return {}, None
+
+        try:
+            doc_hash = self.file_hashes.get(pdf_file.name if hasattr(pdf_file, "name") else str(pdf_file))
+        except OSError:
+            return {}, None
+
+        cached = self.detection_cache.get(doc_hash)
+        if cached is None:
+            return {}, None
+
+        def count_entities(threshold: float) -> int:
+            candidates = copy_entities(cached['candidates'])
+            return len(self.select_entities(candidates, cached['full_text'], cached['text_blocks'], threshold))
+
+        counts = self.detection_cache.entity_counts(doc_hash, self.THRESHOLD_STEPS, count_entities)
+
+        selected = None
+        if confidence_threshold is not None:
+            selected = counts.get(round(float(confidence_threshold), 4))
+            if selected is None:
+                selected = len(self.select_document_entities(
+                    doc_hash, cached['candidates'], cached['full_text'], cached['text_blocks'], confidence_threshold
+                ))
+        return counts, selected
+
     def detect_tc_kimlik_with_blocks(self, full_text: str, text_blocks: List[Dict]) -> List[Dict]:
         """Detect TC kimlik with regex validation"""
+        text_blocks = SpanTable.coerce(text_blocks)  # once, not per entity lookup
         tc_entities = []
         tc_pattern = r'\b[1-9][0-9]{9}[02468]\b'
         
@@ -232,6 +435,31 @@ class EnhancedAnonymizationApp:
 
         return tc_entities
 
+    def detect_gazetteer_with_blocks(self, full_text: str, text_blocks: List[Dict]) -> List[Dict]:
+        """Detect known organisations and names with the gazetteer automaton"""
+        text_blocks = SpanTable.coerce(text_blocks)  # once, not per entity lookup
+        gazetteer_entities = self.gazetteer.detect(full_text)
+
+        for entity in gazetteer_entities:
+            entity['text_block_info'] = self.extractor.find_text_block_for_position(
+                entity['start'], entity['end'], text_blocks, full_text
+            )
+
+        return gazetteer_entities
+
+    def propagate_entities_with_blocks(self, full_text: str, text_blocks: List[Dict],
+                                       entities: List[Dict]) -> List[Dict]:
+        """Propagate accepted entities to every other occurrence in the document"""
+        text_blocks = SpanTable.coerce(text_blocks)  # once, not per entity lookup
+        propagated_entities = self.propagator.propagate(full_text, entities)
+
+        for entity in propagated_entities:
+            entity['text_block_info'] = self.extractor.find_text_block_for_position(
+                entity['start'], entity['end'], text_blocks, full_text
+            )
+
+        return propagated_entities
+
     def map_model_label_to_type(self, model_label: str) -> str:
         """Map model labels to application types"""
         label_mapping = {
@@ -252,9 +480,50 @@ class EnhancedAnonymizationApp:
         }
         return label_mapping.get(model_label.upper(), model_label.lower())
 
+    def _clear_document_caches(self) -> None:
+        """Drop per-document page caches at the end of a job (documents are closed by then)"""
+        self.extractor.text_index_cache.clear()
+        self.redactor.raster_cache.clear()
+        self.replacer.redactor.raster_cache.clear()
+        self.replacer.font_metrics.clear()
+
+    def format_save_stats(self, save_stats: Optional[Dict]) -> str:
+        """Status suffix with output size and save time"""
+        if not save_stats:
+            return ""
+        return (f" Output: {save_stats['size_mb']:.2f} MB "
+                f"({save_stats['profile']} save, {save_stats['seconds']:.2f}s).")
+
+    def format_image_only_pages(self, image_only_pages: List[int], limit: int = 20) -> str:
+        """Status suffix listing scanned pages that were skipped (to be routed to OCR)"""
+        if not image_only_pages:
+            return ""
+        pages = ", ".join(str(page + 1) for page in image_only_pages[:limit])
+        more = ", ..." if len(image_only_pages) > limit else ""
+        return f" {len(image_only_pages)} image-only pages skipped (need OCR): {pages}{more}."
+
+    def format_leak_report(self, report: Optional[Dict], limit: int = 20) -> str:
+        """Status suffix with the result of the output leak check"""
+        if not report:
+            return ""
+        skipped = ""
+        if report.get('skipped_patterns'):
+            skipped = f", {report['skipped_patterns']} too short to check"
+        if report['passed']:
+            return f" Leak check passed ({report['patterns']} patterns{skipped}, {report['seconds']:.2f}s)."
+        pages = ", ".join(str(page + 1) for page in report['pages'][:limit])
+        more = ", ..." if len(report['pages']) > limit else ""
+        return (f" WARNING: leak check found {report['leak_count']} original strings still in the output "
+                f"on pages {pages}{more} ({report['patterns']} patterns{skipped}).")
+
+    def format_review_notice(self) -> str:
+        """Status suffix flagging a non-secure review copy"""
+        return (" REVIEW COPY - NOT REDACTED: the original text is still in the file under opaque "
+                "overlays. For internal review only; run the secure export before sharing.")
+
     def process_pdf_with_real_replacement(self, pdf_file, confidence_threshold: float, 
-                                        progress=gr.Progress()) -> Tuple[Optional[str], str]:
-        """Process PDF with real replacement using custom lists"""
+                                        progress=gr.Progress(), secure: bool = True) -> Tuple[Optional[str], str]:
+        """Process PDF with real replacement using custom lists (secure=False: overlay-only review copy)"""
         if pdf_file is None:
             return None, " Please upload a PDF file."
 
@@ -264,6 +533,9 @@ class EnhancedAnonymizationApp:
         # Clear cache for each new processing
         self.validators.replacement_cache.clear()
 
+        if self.in_memory_processing:
+            return self.process_pdf_in_memory(pdf_file, confidence_threshold, 'replace', progress, secure)
+
         try:
             progress(0.05, desc="Preparing file...")
 
@@ -271,7 +543,7 @@ class EnhancedAnonymizationApp:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             base_in = os.path.basename(pdf_file.name if hasattr(pdf_file, "name") else str(pdf_file))
             input_filename = f"input_{timestamp}_{base_in}"
-            output_filename = f"anonymized_{timestamp}_{base_in}"
+            output_filename = f"{'' if secure else 'review_'}anonymized_{timestamp}_{base_in}"
 
             input_path = os.path.join("uploads", input_filename)
             output_path = os.path.join("outputs", output_filename)
@@ -281,22 +553,19 @@ class EnhancedAnonymizationApp:
 
             progress(0.1, desc="Analyzing PDF...")
 
-            # Extract text and positions from PDF
-            text_blocks = self.extractor.extract_text_with_positions(input_path)
-            full_text = " ".join([block['text'] for block in text_blocks])
+            # Extract text and candidates (cached per document, so only a threshold change re-filters)
+            doc_hash = compute_file_hash(input_path)
+            text_blocks, full_text, candidates = self.get_document_candidates(input_path, progress, doc_hash)
 
             if not full_text.strip():
-                return None, " No text could be extracted from PDF."
+                return None, " No text could be extracted from PDF." + self.format_image_only_pages(text_blocks.image_only_pages)
 
-            progress(0.2, desc="Running NER analysis...")
-
-            # Custom NER model analysis
-            entities_detected = self.extract_entities_with_custom_model(
-                full_text, text_blocks, confidence_threshold, progress
-            )
+            # Apply confidence threshold, merge and propagate (or take the previewed result)
+            entities_detected = self.select_document_entities(doc_hash, candidates, full_text,
+                                                              text_blocks, confidence_threshold)
 
             if not entities_detected:
-                return None, " No personal information detected in PDF."
+                return None, " No personal information detected in PDF." + self.format_image_only_pages(text_blocks.image_only_pages)
 
             progress(0.4, desc="Applying replacement strategy...")
 
@@ -307,7 +576,7 @@ class EnhancedAnonymizationApp:
 
             # Font-preserving PDF replacement
             success = self.replacer.process_pdf_replacement(
-                input_path, processed_entities, output_path, self.extractor, progress
+                input_path, processed_entities, output_path, self.extractor, progress, secure=secure
             )
 
             if not success:
@@ -316,16 +585,24 @@ class EnhancedAnonymizationApp:
             progress(1.0, desc="Completed!")
 
             status_msg = f" Operation completed! {len(processed_entities)} replacements made."
+            status_msg += self.format_save_stats(self.replacer.last_save_stats)
+            status_msg += self.format_image_only_pages(text_blocks.image_only_pages)
+            if secure:
+                status_msg += self.format_leak_report(self.verifier.verify_file(output_path, processed_entities))
+            else:
+                status_msg += self.format_review_notice()
             
             return output_path, status_msg
 
         except Exception as e:
             self.logger.error(f"PDF processing error: {e}", exc_info=True)
             return None, f" Critical error: {str(e)}"
+        finally:
+            self._clear_document_caches()
 
     def process_pdf_with_censoring(self, pdf_file, confidence_threshold: float, 
-                                 progress=gr.Progress()) -> Tuple[Optional[str], str]:
-        """Process PDF with censoring (asterisk characters)"""
+                                 progress=gr.Progress(), secure: bool = True) -> Tuple[Optional[str], str]:
+        """Process PDF with censoring (asterisk characters; secure=False: overlay-only review copy)"""
         if pdf_file is None:
             return None, " Please upload a PDF file."
 
@@ -335,6 +612,9 @@ class EnhancedAnonymizationApp:
         # Clear cache for each new processing
         self.validators.replacement_cache.clear()
 
+        if self.in_memory_processing:
+            return self.process_pdf_in_memory(pdf_file, confidence_threshold, 'censor', progress, secure)
+
         try:
             progress(0.05, desc="Preparing file...")
 
@@ -342,7 +622,7 @@ class EnhancedAnonymizationApp:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             base_in = os.path.basename(pdf_file.name if hasattr(pdf_file, "name") else str(pdf_file))
             input_filename = f"input_{timestamp}_{base_in}"
-            output_filename = f"censored_{timestamp}_{base_in}"
+            output_filename = f"{'' if secure else 'review_'}censored_{timestamp}_{base_in}"
 
             input_path = os.path.join("uploads", input_filename)
             output_path = os.path.join("outputs", output_filename)
@@ -352,33 +632,30 @@ class EnhancedAnonymizationApp:
 
             progress(0.1, desc="Analyzing PDF...")
 
-            # Extract text and positions from PDF
-            text_blocks = self.extractor.extract_text_with_positions(input_path)
-            full_text = " ".join([block['text'] for block in text_blocks])
+            # Extract text and candidates (cached per document, so only a threshold change re-filters)
+            doc_hash = compute_file_hash(input_path)
+            text_blocks, full_text, candidates = self.get_document_candidates(input_path, progress, doc_hash)
 
             if not full_text.strip():
-                return None, "⚠No text could be extracted from PDF."
+                return None, "⚠No text could be extracted from PDF." + self.format_image_only_pages(text_blocks.image_only_pages)
 
-            progress(0.2, desc="Running NER analysis...")
-
-            # Custom NER model analysis
-            entities_detected = self.extract_entities_with_custom_model(
-                full_text, text_blocks, confidence_threshold, progress
-            )
+            # Apply confidence threshold, merge and propagate (or take the previewed result)
+            entities_detected = self.select_document_entities(doc_hash, candidates, full_text,
+                                                              text_blocks, confidence_threshold)
 
             if not entities_detected:
-                return None, " No personal information detected in PDF."
+                return None, " No personal information detected in PDF." + self.format_image_only_pages(text_blocks.image_only_pages)
 
             progress(0.4, desc="Applying censoring strategy...")
 
             # Apply censoring
-            processed_entities = self.validators.apply_censoring_strategy(entities_detected)
+            processed_entities = self.censor_entities(entities_detected)
 
             progress(0.5, desc="Applying censoring to PDF...")
 
             # Font-preserving PDF censoring
             success = self.replacer.process_pdf_censoring(
-                input_path, processed_entities, output_path, self.extractor, progress
+                input_path, processed_entities, output_path, self.extractor, progress, secure=secure
             )
 
             if not success:
@@ -387,12 +664,468 @@ class EnhancedAnonymizationApp:
             progress(1.0, desc="Completed!")
 
             status_msg = f" Censoring completed! {len(processed_entities)} personal information censored."
+            status_msg += self.format_save_stats(self.replacer.last_save_stats)
+            status_msg += self.format_image_only_pages(text_blocks.image_only_pages)
+            if secure:
+                status_msg += self.format_leak_report(self.verifier.verify_file(output_path, processed_entities))
+            else:
+                status_msg += self.format_review_notice()
             
             return output_path, status_msg
 
         except Exception as e:
             self.logger.error(f"PDF censoring error: {e}", exc_info=True)
             return None, f" Critical error: {str(e)}"
+        finally:
+            self._clear_document_caches()
+
+    def extraction_source(self, doc, pdf_bytes: bytes):
+        """
+        What to extract an in-memory PDF from
+
+        Args:
+            doc: fitz.Document opened from pdf_bytes
+            pdf_bytes: PDF file contents
+
+        Returns:
+            pdf_bytes when extraction runs in worker processes (they open the bytes
+            themselves), else the already open doc, so the PDF is parsed only once
+        """
+        min_pages = self.extractor.parallel_min_pages
+        if min_pages is not None and len(doc) >= min_pages:
+            return pdf_bytes
+        return doc
+
+    def anonymize_pdf_bytes(self, pdf_bytes: bytes, confidence_threshold: float, mode: str = 'replace',
+                            progress=None, secure: bool = True) -> Tuple[Optional[bytes], str]:
+        """
+        Detect and replace/censor personal data in a PDF held in memory
+
+        Nothing is written to disk. Long documents are extracted and (secure mode)
+        replaced in worker processes that open the same bytes, the replaced pages
+        are merged back into the one fitz.Document that is saved.
+
+        Args:
+            pdf_bytes: PDF file contents
+            confidence_threshold: Minimum model confidence
+            mode: 'replace' (realistic replacements) or 'censor' (asterisks)
+            progress: Progress callback
+            secure: Remove the original text; False only overlays it (flagged review copy,
+                much faster since apply_redactions is skipped)
+
+        Returns:
+            (output PDF bytes or None, status message)
+        """
+        if progress is None:
+            progress = lambda *args, **kwargs: None
+
+        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        try:
+            progress(0.1, desc="Analyzing PDF...")
+
+            # Extract text and candidates (cached per document, so only a threshold change re-filters)
+            doc_hash = compute_bytes_hash(pdf_bytes)
+            text_blocks, full_text, candidates = self.get_document_candidates(
+                self.extraction_source(doc, pdf_bytes), progress, doc_hash=doc_hash
+            )
+
+            if not full_text.strip():
+                return None, " No text could be extracted from PDF." + self.format_image_only_pages(text_blocks.image_only_pages)
+
+            # Apply confidence threshold, merge and propagate (or take the previewed result)
+            entities_detected = self.select_document_entities(doc_hash, candidates, full_text,
+                                                              text_blocks, confidence_threshold)
+
+            if not entities_detected:
+                return None, " No personal information detected in PDF." + self.format_image_only_pages(text_blocks.image_only_pages)
+
+            if mode == 'replace':
+                progress(0.4, desc="Applying replacement strategy...")
+                processed_entities = self.validators.apply_replacement_strategy_consistent(entities_detected)
+            else:
+                progress(0.4, desc="Applying censoring strategy...")
+                processed_entities = self.censor_entities(entities_detected)
+
+            progress(0.5, desc="Applying changes to PDF...")
+
+            changes = self.replacer.apply_replacements(doc, processed_entities, self.extractor, progress, secure,
+                                                       source=pdf_bytes)
+            if changes == 0:
+                return None, " PDF replacement operation failed."
+
+            if secure:
+                profile = self.replacer.saver.resolve_profile(secure=True)
+            else:
+                self.replacer.mark_review_copy(doc)
+                profile = self.replacer.saver.resolve_profile(self.replacer.review_save_profile, secure=False)
+            output_bytes, save_stats = self.replacer.saver.to_bytes(doc, profile)
+        finally:
+            doc.close()
+            self._clear_document_caches()
+
+        if mode == 'replace':
+            status_msg = f" Operation completed! {len(processed_entities)} replacements made."
+        else:
+            status_msg = f" Censoring completed! {len(processed_entities)} personal information censored."
+        status_msg += self.format_save_stats(save_stats) + self.format_image_only_pages(text_blocks.image_only_pages)
+        if secure:
+            status_msg += self.format_leak_report(self.verifier.verify_bytes(output_bytes, processed_entities))
+        else:
+            status_msg += self.format_review_notice()
+        return output_bytes, status_msg
+
+    def process_pdf_in_memory(self, pdf_file, confidence_threshold: float, mode: str = 'replace',
+                              progress=gr.Progress(), secure: bool = True) -> Tuple[Optional[str], str]:
+        """Process an uploaded PDF in memory and write only the result for download"""
+        try:
+            progress(0.05, desc="Reading file...")
+
+            source_path = pdf_file.name if hasattr(pdf_file, "name") else str(pdf_file)
+            with open(source_path, 'rb') as f:
+                pdf_bytes = f.read()
+
+            output_bytes, status_msg = self.anonymize_pdf_bytes(pdf_bytes, confidence_threshold, mode, progress, secure)
+            if output_bytes is None:
+                return None, status_msg
+
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            base_in = os.path.basename(source_path)
+            prefix = "anonymized" if mode == 'replace' else "censored"
+            if not secure:
+                prefix = f"review_{prefix}"
+
+            if self.archive_files:
+                with open(os.path.join("uploads", f"input_{timestamp}_{base_in}"), 'wb') as f:
+                    f.write(pdf_bytes)
+                output_path = os.path.join("outputs", f"{prefix}_{timestamp}_{base_in}")
+            else:
+                # The UI needs a file to offer for download
+                output_path = os.path.join(self.temp_output_dir, f"{prefix}_{timestamp}_{base_in}")
+
+            with open(output_path, 'wb') as f:
+                f.write(output_bytes)
+
+            progress(1.0, desc="Completed!")
+            return output_path, status_msg
+
+        except Exception as e:
+            self.logger.error(f"PDF in-memory processing error: {e}", exc_info=True)
+            return None, f" Critical error: {str(e)}"
+
+    def preview_pdf_bytes(self, pdf_bytes: bytes, confidence_threshold: float,
+                          progress=None) -> Tuple[Optional[Dict], List, str]:
+        """
+        Detect entities and their rectangles without modifying or writing the PDF
+
+        The located entities are cached with the document, so a later replace or
+        censor run on the same file and threshold applies exactly this result.
+
+        Args:
+            pdf_bytes: PDF file contents
+            confidence_threshold: Minimum model confidence
+            progress: Progress callback
+
+        Returns:
+            (preview dict or None, thumbnails as (image, caption) tuples, status message)
+        """
+        if progress is None:
+            progress = lambda *args, **kwargs: None
+
+        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        try:
+            progress(0.1, desc="Analyzing PDF...")
+
+            doc_hash = compute_bytes_hash(pdf_bytes)
+            text_blocks, full_text, candidates = self.get_document_candidates(
+                self.extraction_source(doc, pdf_bytes), progress, doc_hash=doc_hash
+            )
+
+            if not full_text.strip():
+                return None, [], " No text could be extracted from PDF." + self.format_image_only_pages(text_blocks.image_only_pages)
+
+            entities_detected = self.select_entities(candidates, full_text, text_blocks, confidence_threshold)
+
+            progress(0.6, desc="Locating entities...")
+            located = self.previewer.locate_entities(doc, entities_detected, self.extractor)
+            self.detection_cache.put_preview(doc_hash, confidence_threshold, entities_detected)
+
+            progress(0.8, desc="Rendering thumbnails...")
+            thumbnails = self.previewer.render_thumbnails(doc, entities_detected)
+            page_count = len(doc)
+        finally:
+            doc.close()
+            self._clear_document_caches()
+
+        records = self.previewer.entity_records(entities_detected)
+        preview = {
+            'document': doc_hash,
+            'confidence_threshold': confidence_threshold,
+            'page_count': page_count,
+            'entity_count': len(records),
+            'located_count': located,
+            'image_only_pages': list(text_blocks.image_only_pages),
+            'entities': records
+        }
+
+        status_msg = (f" Preview: {len(records)} entities detected, {located} located on "
+                      f"{len({record['page'] for record in records})} pages. Nothing was modified; "
+                      f"processing this file at threshold {confidence_threshold:.1f} applies this result.")
+        status_msg += self.format_image_only_pages(text_blocks.image_only_pages)
+        return preview, thumbnails, status_msg
+
+    def preview_pdf(self, pdf_file, confidence_threshold: float,
+                    progress=gr.Progress()) -> Tuple[Optional[Dict], List, str]:
+        """Detect-only preview of an uploaded PDF (entity JSON and page thumbnails)"""
+        if pdf_file is None:
+            return None, [], " Please upload a PDF file."
+
+        if self.ner_pipeline is None:
+            return None, [], " NER model could not be loaded. Check model path."
+
+        try:
+            progress(0.05, desc="Reading file...")
+            with open(pdf_file.name if hasattr(pdf_file, "name") else str(pdf_file), 'rb') as f:
+                pdf_bytes = f.read()
+
+            preview, thumbnails, status_msg = self.preview_pdf_bytes(pdf_bytes, confidence_threshold, progress)
+            progress(1.0, desc="Completed!")
+            return preview, thumbnails, status_msg
+
+        except Exception as e:
+            self.logger.error(f"PDF preview error: {e}", exc_info=True)
+            return None, [], f" Critical error: {str(e)}"
+
+    def process_pdf_streaming(self, pdf_file, confidence_threshold: float, mode: str = 'replace',
+                              progress=gr.Progress()) -> Tuple[Optional[str], str]:
+        """Process PDF with the pipelined extract -> NER -> allocate -> redact executor"""
+        if pdf_file is None:
+            return None, " Please upload a PDF file."
+
+        if self.ner_pipeline is None:
+            return None, " NER model could not be loaded. Check model path."
+
+        # Clear cache and usage tracking once, allocation then runs page by page
+        self.validators.clear_cache_and_usage()
+
+        try:
+            progress(0.05, desc="Preparing file...")
+
+            # File paths (uploads/ and outputs/ only when archiving, like the in-memory path)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            input_path = pdf_file.name if hasattr(pdf_file, "name") else str(pdf_file)
+            base_in = os.path.basename(input_path)
+            prefix = "anonymized" if mode == 'replace' else "censored"
+
+            if self.archive_files:
+                archived_path = os.path.join("uploads", f"input_{timestamp}_{base_in}")
+                shutil.copy2(input_path, archived_path)
+                input_path = archived_path
+                output_path = os.path.join("outputs", f"{prefix}_{timestamp}_{base_in}")
+            else:
+                # The UI needs a file to offer for download
+                output_path = os.path.join(self.temp_output_dir, f"{prefix}_{timestamp}_{base_in}")
+
+            def detect(page_text, page_blocks):
+                return self.extract_entities_with_custom_model(
+                    page_text, page_blocks, confidence_threshold, lambda *args, **kwargs: None
+                )
+
+            if mode == 'replace':
+                allocate = lambda entities: self.validators.apply_replacement_strategy_consistent(
+                    entities, reset_usage=False
+                )
+            else:
+                allocate = self.censor_entities
+
+            pipeline = StreamingPipeline(
+                self.extractor, detect, allocate,
+                lambda page, entities: self.replacer.replace_page_entities(page, entities, self.extractor),
+                saver=self.replacer.saver
+            )
+            stats = pipeline.run(input_path, output_path, progress)
+
+            if stats['entities'] == 0:
+                return None, " No personal information detected in PDF." + self.format_image_only_pages(stats['image_only_pages'])
+
+            if stats['changes'] == 0:
+                return None, " PDF replacement operation failed."
+
+            progress(1.0, desc="Completed!")
+
+            status_msg = f" Operation completed! {stats['changes']} changes made on {stats['pages']} pages (streaming)."
+            status_msg += self.format_save_stats(stats['save']) + self.format_image_only_pages(stats['image_only_pages'])
+            status_msg += self.format_leak_report(self.verifier.verify_file(output_path, stats['entity_list']))
+            return output_path, status_msg
+
+        except Exception as e:
+            self.logger.error(f"PDF streaming processing error: {e}", exc_info=True)
+            return None, f" Critical error: {str(e)}"
+        finally:
+            self._clear_document_caches()
+
+    def _commit_page_batches(self, work, checkpoint: ProcessingCheckpoint, pages: List[int],
+                             entities: List[Dict], changes_by_page: Dict[int, int]):
+        """
+        Persist processed pages: write the next work copy version, then save the checkpoint
+
+        The work copy is a full, garbage-collected save (an incremental save would keep
+        the original page content in an earlier revision). It goes to a new
+        'work.<n>.pdf' that nothing references until the checkpoint is saved, so a
+        crash at any point resumes from a consistent (pages, work copy) pair.
+
+        Returns:
+            Work document to continue with (reopened when a new version was written)
+        """
+        previous_version = checkpoint.work_version
+        new_version = None
+        if changes_by_page:
+            new_version = previous_version + 1
+            self.replacer.saver.save(work, checkpoint.work_path_for(new_version),
+                                     self.replacer.saver.resolve_profile('fast', secure=True))
+
+        checkpoint.record_pages(pages, entities, changes_by_page,
+                                self.validators.export_replacement_state(), work_version=new_version)
+        checkpoint.save()
+
+        if new_version is None:
+            return work
+        work.close()
+        checkpoint.remove_work_versions([previous_version])
+        return fitz.open(checkpoint.work_path)
+
+    def process_pdf_page_range(self, input_path: str, output_path: str, confidence_threshold: float,
+                               mode: str = 'replace', start_page: int = 0, end_page: Optional[int] = None,
+                               checkpoint_path: Optional[str] = None, batch_pages: int = 50,
+                               commit_batches: int = 4, progress=None) -> Tuple[Optional[str], str]:
+        """
+        Process pages [start_page, end_page) of a large PDF with a resumable checkpoint
+
+        Pages are detected and changed in batches. Every commit_batches batches, and at
+        the end of the range, the work copy is written as a new version (full save with
+        garbage collection, so the removed text of finished pages does not stay in the
+        file) and the checkpoint (entities, changes per page, replacement mappings,
+        work copy version) is rewritten atomically, so a crashed or timed-out job
+        continues after its last committed batch. Text is always extracted from the
+        unmodified input. The output is written only once every page of the document
+        is done; until then the work copy still holds the unprocessed pages.
+
+        Args:
+            input_path: Input PDF path
+            output_path: Output PDF path
+            confidence_threshold: Minimum model confidence
+            mode: 'replace' (realistic replacements) or 'censor' (asterisks)
+            start_page: First page (inclusive, 0-based)
+            end_page: Last page (exclusive, None for the end of the document)
+            checkpoint_path: Checkpoint JSON path (default: next to the output)
+            batch_pages: Pages per detection batch
+            commit_batches: Batches per work copy rewrite and checkpoint
+            progress: Progress callback
+
+        Returns:
+            (output path once the document is complete, otherwise None; status message)
+        """
+        if progress is None:
+            progress = lambda *args, **kwargs: None
+
+        if self.ner_pipeline is None:
+            return None, " NER model could not be loaded. Check model path."
+
+        checkpoint_path = checkpoint_path or f"{output_path}.checkpoint.json"
+
+        try:
+            input_hash = compute_file_hash(input_path)
+            with fitz.open(input_path) as src:
+                page_count = len(src)
+            end_page = page_count if end_page is None else min(end_page, page_count)
+
+            checkpoint = ProcessingCheckpoint.load(checkpoint_path)
+            if (checkpoint is not None and checkpoint.matches(input_hash, mode, confidence_threshold)
+                    and os.path.exists(checkpoint.work_path)):
+                self.logger.info(f"Resuming from checkpoint: {checkpoint.completed_pages}/{page_count} pages done")
+                self.validators.restore_replacement_state(checkpoint.replacement_state)
+            else:
+                checkpoint = ProcessingCheckpoint(checkpoint_path, input_hash, mode, confidence_threshold,
+                                                  page_count, f"{output_path}.work")
+                with fitz.open(input_path) as src:
+                    src.save(checkpoint.work_path)
+                self.validators.clear_cache_and_usage()
+                checkpoint.save()
+
+            noop = lambda *args, **kwargs: None
+            work = fitz.open(checkpoint.work_path)
+            # Pages processed since the last commit
+            batch_pages_done, batch_entities, batch_changes = [], [], {}
+            uncommitted_batches = 0
+            try:
+                for batch_start in range(start_page, end_page, batch_pages):
+                    batch_end = min(batch_start + batch_pages, end_page)
+                    pending = [p for p in range(batch_start, batch_end) if not checkpoint.is_done(p)]
+                    if not pending:
+                        continue
+
+                    progress(0.05 + 0.85 * (batch_start - start_page) / max(end_page - start_page, 1),
+                             desc=f"Pages {batch_start + 1}-{batch_end} of {page_count}...")
+
+                    # Detection sees the whole batch for context, results are kept for pending pages only
+                    spans = self.extractor.extract_page_range(input_path, batch_start, batch_end)
+                    entities = []
+                    if spans.full_text.strip():
+                        candidates = self.collect_entity_candidates(spans.full_text, spans, noop)
+                        entities = self.select_entities(candidates, spans.full_text, spans, confidence_threshold)
+                    pending_set = set(pending)
+                    entities = [e for e in entities if e['text_block_info'].get('page') in pending_set]
+
+                    if not entities:
+                        processed_entities = []
+                    elif mode == 'replace':
+                        processed_entities = self.validators.apply_replacement_strategy_consistent(
+                            entities, reset_usage=False
+                        )
+                    else:
+                        processed_entities = self.censor_entities(entities)
+
+                    for page_num, page_entities in PDFSharder.group_entities_by_page(processed_entities).items():
+                        batch_changes[page_num] = self.replacer.replace_page_entities(
+                            work.load_page(page_num), page_entities, self.extractor
+                        )
+                    batch_pages_done.extend(pending)
+                    batch_entities.extend(processed_entities)
+
+                    uncommitted_batches += 1
+                    if uncommitted_batches >= commit_batches:
+                        work = self._commit_page_batches(work, checkpoint, batch_pages_done,
+                                                         batch_entities, batch_changes)
+                        batch_pages_done, batch_entities, batch_changes = [], [], {}
+                        uncommitted_batches = 0
+
+                if batch_pages_done:
+                    work = self._commit_page_batches(work, checkpoint, batch_pages_done,
+                                                     batch_entities, batch_changes)
+
+                if not checkpoint.complete:
+                    return None, (f" Processed pages {start_page + 1}-{end_page}: {checkpoint.completed_pages}/"
+                                  f"{page_count} pages done, {checkpoint.total_changes()} changes so far. "
+                                  f"Run the remaining pages to finish (checkpoint: {checkpoint_path}).")
+
+                progress(0.95, desc="Writing output...")
+                save_stats = self.replacer.saver.save(work, output_path, self.replacer.saver.resolve_profile(secure=True))
+            finally:
+                work.close()
+                self._clear_document_caches()
+
+            all_entities = checkpoint.all_entities()
+            leak_report = self.verifier.verify_file(output_path, all_entities)
+            checkpoint.remove()
+
+            progress(1.0, desc="Completed!")
+            status_msg = (f" Operation completed! {checkpoint.total_changes()} changes made on "
+                          f"{page_count} pages (page ranges).")
+            status_msg += self.format_save_stats(save_stats) + self.format_leak_report(leak_report)
+            return output_path, status_msg
+
+        except Exception as e:
+            self.logger.error(f"PDF page range processing error: {e}", exc_info=True)
+            return None, f" Critical error: {str(e)} (progress is kept in {checkpoint_path})"
 
     # NEW METHODS FOR TEXT PROCESSING
     def process_manual_text_replacement(self, text: str, confidence_threshold: float) -> Tuple[str, str, str]:
@@ -468,6 +1201,18 @@ class EnhancedAnonymizationApp:
                                 label=" Confidence Threshold"
                             )
 
+                            threshold_info_replace = gr.Markdown("")
+
+                            streaming_replace = gr.Checkbox(
+                                value=False,
+                                label=" Streaming pipeline (overlap extraction, NER and redaction for long PDFs; not available for review copies)"
+                            )
+
+                            review_replace = gr.Checkbox(
+                                value=False,
+                                label=" Fast review copy (NOT REDACTED: original text stays under overlays, internal use only; runs without streaming)"
+                            )
+
                             process_btn_replace = gr.Button(
                                 " Start Replacement Process",
                                 variant="primary",
@@ -502,6 +1247,18 @@ class EnhancedAnonymizationApp:
                                 label=" Confidence Threshold"
                             )
 
+                            threshold_info_censor = gr.Markdown("")
+
+                            streaming_censor = gr.Checkbox(
+                                value=False,
+                                label=" Streaming pipeline (overlap extraction, NER and redaction for long PDFs; not available for review copies)"
+                            )
+
+                            review_censor = gr.Checkbox(
+                                value=False,
+                                label=" Fast review copy (NOT REDACTED: original text stays under overlays, internal use only; runs without streaming)"
+                            )
+
                             process_btn_censor = gr.Button(
                                 " Start Censoring Process",
                                 variant="secondary",
@@ -515,7 +1272,46 @@ class EnhancedAnonymizationApp:
                             output_pdf_censor = gr.File(label="📤 Censored PDF", file_count="single")
                             status_text_censor = gr.Markdown("")
 
-                # TAB 3: Text Processing (NEW)
+                # TAB 3: Preview (detect only, nothing is written)
+                with gr.Tab(" PDF Preview (Detect Only)", elem_classes="tab-nav"):
+                    gr.Markdown("""
+                    ### Review Detections Before Redacting
+                    Personal information is detected and located, but the PDF is not modified.
+                    Processing the same file with the same threshold in the replacement or
+                    censoring tab then applies exactly the previewed result.
+                    """)
+
+                    with gr.Row():
+                        with gr.Column(scale=1):
+                            pdf_input_preview = gr.File(
+                                label=" Upload PDF File",
+                                file_types=[".pdf"],
+                                type="filepath"
+                            )
+
+                            confidence_threshold_preview = gr.Slider(
+                                minimum=0.1, maximum=1.0, value=0.7, step=0.1,
+                                label=" Confidence Threshold"
+                            )
+
+                            preview_btn = gr.Button(
+                                " Detect Only",
+                                variant="secondary",
+                                interactive=bool(self.ner_pipeline)
+                            )
+
+                            if not self.ner_pipeline:
+                                gr.Markdown(" **Warning**: Preview cannot start because model could not be loaded.")
+
+                            status_text_preview = gr.Markdown("")
+
+                        with gr.Column(scale=1):
+                            preview_gallery = gr.Gallery(label="Pages with detections", columns=3)
+
+                    with gr.Row():
+                        preview_json = gr.JSON(label="Detected Entities")
+
+                # TAB 4: Text Processing (NEW)
                 with gr.Tab(" Text Processing", elem_classes="tab-nav"):
                     gr.Markdown("""
                     ### Manual Text Processing with AI
@@ -578,21 +1374,49 @@ class EnhancedAnonymizationApp:
 
             # EVENT HANDLERS
 
-            def _run_replacement(pdf, thr, progress=gr.Progress()):
+            def _streaming_note(streaming, review):
+                # Streaming and review copies are exclusive: a review copy never streams
+                if streaming and review:
+                    return " Streaming is not available for review copies, the standard path was used.  \n"
+                return ""
+
+            def _run_replacement(pdf, thr, streaming=False, review=False, progress=gr.Progress()):
+                if streaming and not review:
+                    out_path, status = self.process_pdf_streaming(pdf, thr, 'replace', progress)
+                    return out_path, (status or "")
+
                 out_path, status = self.process_pdf_with_real_replacement(
                     pdf_file=pdf,
                     confidence_threshold=thr,
-                    progress=progress
+                    progress=progress,
+                    secure=not review
                 )
-                return out_path, (status or "")
+                return out_path, _streaming_note(streaming, review) + (status or "")
+
+            def _run_censoring(pdf, thr, streaming=False, review=False, progress=gr.Progress()):
+                if streaming and not review:
+                    out_path, status = self.process_pdf_streaming(pdf, thr, 'censor', progress)
+                    return out_path, (status or "")
 
-            def _run_censoring(pdf, thr, progress=gr.Progress()):
                 out_path, status = self.process_pdf_with_censoring(
                     pdf_file=pdf,
                     confidence_threshold=thr,
-                    progress=progress
+                    progress=progress,
+                    secure=not review
                 )
-                return out_path, (status or "")
+                return out_path, _streaming_note(streaming, review) + (status or "")
+
+            def _run_preview(pdf, thr, progress=gr.Progress()):
+                preview, thumbnails, status = self.preview_pdf(pdf, thr, progress)
+                return preview, thumbnails, (status or "")
+
+            def _show_threshold_counts(pdf, thr):
+                counts, current = self.get_threshold_entity_counts(pdf, float(thr))
+                if not counts:
+                    return ""
+                overview = " · ".join(f"{t:.1f}: {n}" for t, n in counts.items())
+                return (f"**{current}** entities at threshold {float(thr):.1f}  \n"
+                        f"<small>Entities per threshold: {overview}</small>")
 
             def _run_text_replacement(text, thr):
                 processed, status, entities = self.process_manual_text_replacement(text, thr)
@@ -605,18 +1429,49 @@ class EnhancedAnonymizationApp:
             # PDF Event Handlers
             process_btn_replace.click(
                 _run_replacement,
-                inputs=[pdf_input_replace, confidence_threshold_replace],
+                inputs=[pdf_input_replace, confidence_threshold_replace, streaming_replace, review_replace],
                 outputs=[output_pdf_replace, status_text_replace],
                 api_name="process_pdf_replacement"
+            ).then(
+                _show_threshold_counts,
+                inputs=[pdf_input_replace, confidence_threshold_replace],
+                outputs=[threshold_info_replace]
             )
 
             process_btn_censor.click(
                 _run_censoring,
-                inputs=[pdf_input_censor, confidence_threshold_censor],
+                inputs=[pdf_input_censor, confidence_threshold_censor, streaming_censor, review_censor],
                 outputs=[output_pdf_censor, status_text_censor],
                 api_name="process_pdf_censoring"
+            ).then(
+                _show_threshold_counts,
+                inputs=[pdf_input_censor, confidence_threshold_censor],
+                outputs=[threshold_info_censor]
+            )
+
+            preview_btn.click(
+                _run_preview,
+                inputs=[pdf_input_preview, confidence_threshold_preview],
+                outputs=[preview_json, preview_gallery, status_text_preview],
+                api_name="preview_pdf"
             )
 
+            # Threshold preview for already analysed PDFs (no re-inference)
+            for pdf_input, threshold_slider, threshold_info in (
+                (pdf_input_replace, confidence_threshold_replace, threshold_info_replace),
+                (pdf_input_censor, confidence_threshold_censor, threshold_info_censor),
+            ):
+                threshold_slider.change(
+                    _show_threshold_counts,
+                    inputs=[pdf_input, threshold_slider],
+                    outputs=[threshold_info]
+                )
+                pdf_input.change(
+                    _show_threshold_counts,
+                    inputs=[pdf_input, threshold_slider],
+                    outputs=[threshold_info]
+                )
+
             # Text Processing Event Handlers
             text_replace_btn.click(
                 _run_text_replacement,
@@ -0,0 +1,201 @@
+"""
+PDF Checkpoint Module - Resumable per-page progress of long page-range jobs
+"""
+import os
+import json
+import logging
+import tempfile
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Entity keys kept in the checkpoint (block information is recomputed on demand)
+_ENTITY_KEYS = ('entity', 'word', 'replacement', 'score', 'method')
+
+
+def _json_default(value):
+    """Convert NumPy scalars (model scores) for json.dump"""
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class ProcessingCheckpoint:
+    """Progress of one job (input, mode, threshold) persisted after every batch of pages"""
+
+    VERSION = 2
+
+    def __init__(self, path: str, input_hash: str, mode: str, confidence_threshold: float,
+                 page_count: int, work_base: str, work_version: int = 0):
+        """
+        Initialize ProcessingCheckpoint
+
+        Args:
+            path: Checkpoint JSON path
+            input_hash: Content hash of the input PDF
+            mode: 'replace' or 'censor'
+            confidence_threshold: Model confidence threshold of the job
+            page_count: Number of pages in the input
+            work_base: Path prefix of the partially processed copies ('<base>.<version>.pdf')
+            work_version: Version of the work copy that belongs to the recorded pages
+        """
+        self.logger = logger
+        self.path = path
+        self.input_hash = input_hash
+        self.mode = mode
+        self.confidence_threshold = confidence_threshold
+        self.page_count = page_count
+        self.work_base = work_base
+        self.work_version = work_version
+        # page number -> {'entities': [...], 'changes': int}
+        self.pages: Dict[int, Dict] = {}
+        self.replacement_state: Dict = {}
+
+    @classmethod
+    def load(cls, path: str) -> Optional['ProcessingCheckpoint']:
+        """
+        Load a checkpoint file
+
+        Args:
+            path: Checkpoint JSON path
+
+        Returns:
+            ProcessingCheckpoint, or None if the file is missing or unreadable
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != cls.VERSION:
+                logger.warning(f"Ignoring checkpoint {path}: version {data.get('version')}")
+                return None
+
+            checkpoint = cls(path, data['input_hash'], data['mode'], data['confidence_threshold'],
+                             data['page_count'], data['work_base'], data['work_version'])
+            checkpoint.pages = {int(page): info for page, info in data.get('pages', {}).items()}
+            checkpoint.replacement_state = data.get('replacement_state', {})
+            return checkpoint
+        except Exception as e:
+            logger.error(f"Checkpoint load error ({path}): {e}")
+            return None
+
+    def work_path_for(self, version: int) -> str:
+        """Path of a work copy version"""
+        return f"{self.work_base}.{version}.pdf"
+
+    @property
+    def work_path(self) -> str:
+        """Work copy that holds exactly the recorded pages"""
+        return self.work_path_for(self.work_version)
+
+    @property
+    def next_work_path(self) -> str:
+        """Path for the next work copy (only referenced once the checkpoint is saved)"""
+        return self.work_path_for(self.work_version + 1)
+
+    def matches(self, input_hash: str, mode: str, confidence_threshold: float) -> bool:
+        """Whether the checkpoint belongs to the same input and settings"""
+        return (self.input_hash == input_hash and self.mode == mode
+                and self.confidence_threshold == confidence_threshold)
+
+    def is_done(self, page_num: int) -> bool:
+        """Whether a page has been processed and saved to the work file"""
+        return page_num in self.pages
+
+    @property
+    def completed_pages(self) -> int:
+        """Number of processed pages"""
+        return len(self.pages)
+
+    @property
+    def complete(self) -> bool:
+        """Whether every page of the document has been processed"""
+        return len(self.pages) >= self.page_count
+
+    def record_pages(self, page_nums: Iterable[int], entities: List[Dict],
+                     changes_by_page: Dict[int, int], replacement_state: Dict,
+                     work_version: Optional[int] = None) -> None:
+        """
+        Record processed pages (call save() afterwards)
+
+        Args:
+            page_nums: Pages processed in this batch (including pages without entities)
+            entities: Processed entities of these pages
+            changes_by_page: Number of applied changes per page
+            replacement_state: PDFValidators.export_replacement_state() after the batch
+            work_version: Work copy version that contains these pages (None: unchanged)
+        """
+        for page_num in page_nums:
+            self.pages[page_num] = {'entities': [], 'changes': changes_by_page.get(page_num, 0)}
+
+        for entity in entities:
+            page_num = (entity.get('text_block_info') or {}).get('page', 0)
+            if page_num in self.pages:
+                self.pages[page_num]['entities'].append({key: entity.get(key) for key in _ENTITY_KEYS})
+
+        self.replacement_state = replacement_state
+        if work_version is not None:
+            self.work_version = work_version
+
+    def all_entities(self) -> List[Dict]:
+        """Entity records of all processed pages, with their 'page'"""
+        return [dict(entity, page=page_num)
+                for page_num in sorted(self.pages) for entity in self.pages[page_num]['entities']]
+
+    def total_changes(self) -> int:
+        """Applied changes over all processed pages"""
+        return sum(info.get('changes', 0) for info in self.pages.values())
+
+    def save(self) -> None:
+        """
+        Write the checkpoint atomically (temporary file + rename)
+
+        This is the commit point of a batch: pages, replacement state and work copy
+        version change together, so a crash before the rename resumes from the
+        previous version with its pages still pending.
+        """
+        data = {
+            'version': self.VERSION,
+            'input_hash': self.input_hash,
+            'mode': self.mode,
+            'confidence_threshold': self.confidence_threshold,
+            'page_count': self.page_count,
+            'work_base': self.work_base,
+            'work_version': self.work_version,
+            'pages': {str(page): info for page, info in sorted(self.pages.items())},
+            'replacement_state': self.replacement_state
+        }
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".checkpoint_", suffix=".json", dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, default=_json_default)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def remove_work_versions(self, versions: Iterable[int]) -> None:
+        """Delete work copies that are no longer referenced by the saved checkpoint"""
+        for version in versions:
+            path = self.work_path_for(version)
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except OSError as e:
+                self.logger.warning(f"Could not remove {path}: {e}")
+
+    def remove(self) -> None:
+        """Delete the checkpoint and its work copies (after the final output is written)"""
+        # The next version may be left over from a write that crashed before its commit
+        self.remove_work_versions(range(self.work_version + 2))
+        try:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        except OSError as e:
+            self.logger.warning(f"Could not remove {self.path}: {e}")
@@ -1,19 +1,61 @@
 """
 PDF Text Extraction Module - pdfplumber/fitz based extraction
 """
+import os
 import fitz  # PyMuPDF
 import logging
+import numpy as np
 from typing import List, Dict, Optional
 import unicodedata
 import re
+from pdf.sharding import PDFSharder
+from pdf.spans import SpanTable, SpanTableBuilder
+from pdf.text_index import PageTextIndexCache, PageWordIndex, normalize_search_text
 
 logger = logging.getLogger(__name__)
 
+
+def _extract_page_range_worker(source, start_page: int, end_page: int,
+                               extractor_config: Optional[Dict] = None) -> SpanTable:
+    """Process pool entry point: extract spans of a page range"""
+    return PDFExtractor(**(extractor_config or {})).extract_page_range(source, start_page, end_page)
+
+
 class PDFExtractor:
     """PDF text extraction with position and font information"""
     
-    def __init__(self):
+    def __init__(self, parallel_min_pages: Optional[int] = None, image_page_min_coverage: float = 0.5,
+                 repeat_min_pages: int = 3, repeat_position_tolerance: float = 2.0, repeat_min_chars: int = 4):
+        """
+        Initialize PDFExtractor
+
+        Args:
+            parallel_min_pages: Page count from which extraction runs in worker processes
+                (None = only when extract_text_with_positions is called with parallel=True)
+            image_page_min_coverage: Fraction of a text-less page that images must cover
+                for it to count as a scanned (image-only) page
+            repeat_min_pages: Pages a span must repeat on to count as header/footer
+            repeat_position_tolerance: Grid size (points) for matching repeated span positions
+            repeat_min_chars: Minimum normalized length of a repeated span
+        """
         self.logger = logger
+        self.parallel_min_pages = parallel_min_pages
+        self.image_page_min_coverage = image_page_min_coverage
+        self.repeat_min_pages = repeat_min_pages
+        self.repeat_position_tolerance = repeat_position_tolerance
+        self.repeat_min_chars = repeat_min_chars
+        # Normalized page text with offsets to glyph boxes, shared by all entities of a page
+        self.text_index_cache = PageTextIndexCache()
+
+    def get_config(self) -> Dict:
+        """Constructor arguments reproducing this extractor's settings (e.g. in worker processes)"""
+        return {
+            'parallel_min_pages': self.parallel_min_pages,
+            'image_page_min_coverage': self.image_page_min_coverage,
+            'repeat_min_pages': self.repeat_min_pages,
+            'repeat_position_tolerance': self.repeat_position_tolerance,
+            'repeat_min_chars': self.repeat_min_chars
+        }
     
     def _normalize_for_pdf_search(self, s: str) -> str:
         """Normalize text for PDF search operations"""
@@ -22,128 +64,272 @@ class PDFExtractor:
         s = re.sub(r"[ \t]+", " ", s).strip()
         return s
     
-    def _candidate_queries(self, orig: str) -> List[str]:
-        """Generate candidate search queries for PDF text"""
-        base = self._normalize_for_pdf_search(orig or "")
-        cand = {base}
-
-        # Space/punctuation normalizations
-        cand.add(re.sub(r"\s*([./-])\s*", r"\1", base))
-        cand.add(re.sub(r"\s+", " ", base))
-        if len(base) <= 64:
-            cand.add(base.replace(" ", ""))
-
-        # Case variants
-        cand.add(base.upper())
-        cand.add(base.lower())
-        cand.add(base.title())
-
-        return [c for c in cand if c]
-    
-    def extract_text_with_positions(self, pdf_path: str) -> List[Dict]:
+    def _iter_page_spans(self, page, page_num: int):
+        """
+        Iterate over non-empty text spans of one page
+
+        Args:
+            page: PDF page object
+            page_num: Page number (0-based)
+
+        Yields:
+            (page, text, bbox, font, size, flags, color) tuples
+        """
+        blocks = page.get_text("dict")
+
+        for block in blocks.get("blocks", []):
+            if "lines" in block:
+                for line in block["lines"]:
+                    for span in line.get("spans", []):
+                        text = (span.get("text") or "").strip()
+                        if text:
+                            bbox_raw = span.get("bbox", (0, 0, 0, 0))
+                            if hasattr(bbox_raw, "__iter__"):
+                                bbox = tuple(float(x) for x in bbox_raw)
+                            else:
+                                try:
+                                    bbox = (float(bbox_raw.x0), float(bbox_raw.y0),
+                                            float(bbox_raw.x1), float(bbox_raw.y1))
+                                except Exception:
+                                    bbox = (0.0, 0.0, 0.0, 0.0)
+
+                            yield (
+                                int(page_num),
+                                text,
+                                bbox,
+                                str(span.get("font") or "Unknown"),
+                                float(span.get("size", 12)),
+                                int(span.get("flags", 0)),
+                                int(span.get("color", 0)) if isinstance(span.get("color", 0), (int, float)) else 0
+                            )
+
+    def image_coverage(self, page) -> float:
+        """
+        Fraction of the page area covered by images
+
+        Args:
+            page: PDF page object
+
+        Returns:
+            Coverage between 0 and 1 (overlapping images are counted once each)
+        """
+        page_rect = page.rect
+        page_area = abs(page_rect)
+        if not page_area:
+            return 0.0
+
+        covered = 0.0
+        for info in page.get_image_info():
+            covered += abs(fitz.Rect(info['bbox']) & page_rect)
+        return min(covered / page_area, 1.0)
+
+    def is_image_only_page(self, page, span_count: int = 0) -> bool:
+        """
+        Whether a page is a scan without a text layer
+
+        Args:
+            page: PDF page object
+            span_count: Number of text spans already extracted from the page
+
+        Returns:
+            True if the page has no text but is mostly covered by images
+        """
+        if span_count:
+            return False
+        return self.image_coverage(page) >= self.image_page_min_coverage
+
+    def _extract_table(self, doc, start_page: int, end_page: int) -> SpanTable:
+        """Extract spans of pages [start_page, end_page) of an open document into a SpanTable"""
+        builder = SpanTableBuilder()
+        for page_num in range(start_page, min(end_page, len(doc))):
+            page = doc.load_page(page_num)
+
+            # Text needs a font resource: pages without fonts skip the text pass entirely
+            span_count = 0
+            if page.get_fonts():
+                for span in self._iter_page_spans(page, page_num):
+                    builder.append(*span)
+                    span_count += 1
+
+            if self.is_image_only_page(page, span_count):
+                builder.mark_image_only(page_num)
+        return builder.build()
+
+    def extract_page_range(self, source, start_page: int, end_page: int) -> SpanTable:
+        """
+        Extract spans of pages [start_page, end_page) with their own document handle
+
+        Args:
+            source: Path to PDF file, PDF bytes, or None in a worker (see PDFSharder.open_source)
+            start_page: First page (inclusive)
+            end_page: Last page (exclusive)
+
+        Returns:
+            SpanTable of the range (offsets relative to the range's own text)
+        """
+        doc = PDFSharder.open_source(source)
+        try:
+            return self._extract_table(doc, start_page, end_page)
+        finally:
+            doc.close()
+
+    def _extract_parallel(self, source, page_count: int, max_workers: Optional[int]) -> SpanTable:
+        """Extract page ranges of a PDF path or PDF bytes in worker processes, merged in page order"""
+        workers = max_workers or PDFSharder.default_workers()
+        # A few ranges per worker keeps workers busy when pages differ in cost
+        range_size = max(1, -(-page_count // (workers * 4)))
+        ranges = [(start, min(start + range_size, page_count)) for start in range(0, page_count, range_size)]
+
+        with PDFSharder.make_executor(workers, source) as executor:
+            results = executor.map(
+                _extract_page_range_worker,
+                [PDFSharder.task_source(source)] * len(ranges),
+                [start for start, _ in ranges],
+                [end for _, end in ranges],
+                [self.get_config()] * len(ranges)
+            )
+            text_blocks = SpanTable.concat(list(results))
+
+        self.logger.info(f"Parallel extraction: {page_count} pages in {len(ranges)} ranges on {workers} workers")
+        return text_blocks
+
+    def extract_text_with_positions(self, pdf_source, parallel: Optional[bool] = None,
+                                    max_workers: Optional[int] = None) -> SpanTable:
         """
         Extract text from PDF with position and font information
         
         Args:
-            pdf_path: Path to PDF file
+            pdf_source: Path to PDF file, PDF bytes, or an open fitz.Document (left open)
+            parallel: Split pages across worker processes (None = from parallel_min_pages pages on,
+                if configured)
+            max_workers: Number of worker processes (defaults to PDFSharder.default_workers())
             
         Returns:
-            List of text blocks with position and formatting info
+            SpanTable of text spans with position and formatting info
+            (a sequence of dict-like span views, offsets into the space-joined full text)
         """
         try:
-            doc = fitz.open(pdf_path)
-            text_blocks = []
-            
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                blocks = page.get_text("dict")
-                
-                for block in blocks.get("blocks", []):
-                    if "lines" in block:
-                        for line in block["lines"]:
-                            for span in line.get("spans", []):
-                                text = (span.get("text") or "").strip()
-                                if text:
-                                    bbox_raw = span.get("bbox", (0, 0, 0, 0))
-                                    if hasattr(bbox_raw, "__iter__"):
-                                        bbox = tuple(float(x) for x in bbox_raw)
-                                    else:
-                                        try:
-                                            bbox = (float(bbox_raw.x0), float(bbox_raw.y0),
-                                                    float(bbox_raw.x1), float(bbox_raw.y1))
-                                        except Exception:
-                                            bbox = (0.0, 0.0, 0.0, 0.0)
-
-                                    text_blocks.append({
-                                        'page': int(page_num),
-                                        'text': text,
-                                        'bbox': bbox,
-                                        'font': str(span.get("font") or "Unknown"),
-                                        'size': float(span.get("size", 12)),
-                                        'flags': int(span.get("flags", 0)),
-                                        'color': int(span.get("color", 0)) if isinstance(span.get("color", 0), (int, float)) else 0,
-                                        'start_char': 0,
-                                        'end_char': 0
-                                    })
-            
-            doc.close()
+            owns_doc = not isinstance(pdf_source, fitz.Document)
+            is_bytes = isinstance(pdf_source, (bytes, bytearray))
+            if not owns_doc:
+                doc = pdf_source
+            elif is_bytes:
+                doc = fitz.open(stream=pdf_source, filetype="pdf")
+            else:
+                doc = fitz.open(pdf_source)
+            page_count = len(doc)
+
+            # Worker processes open the file or the bytes themselves; a passed-in document
+            # only when it is unmodified and backed by a file
+            if is_bytes:
+                worker_source = pdf_source
+            elif owns_doc:
+                worker_source = pdf_source if os.path.isfile(pdf_source) else None
+            else:
+                worker_source = doc.name if doc.name and not doc.is_dirty and os.path.isfile(doc.name) else None
+            if parallel is None:
+                parallel = self.parallel_min_pages is not None and page_count >= self.parallel_min_pages
 
-            # Calculate global positions
-            char_position = 0
-            for block in text_blocks:
-                block['start_char'] = int(char_position)
-                char_position += len(block['text']) + 1
-                block['end_char'] = int(char_position - 1)
+            text_blocks = None
+            if parallel and page_count > 1 and worker_source is not None:
+                try:
+                    text_blocks = self._extract_parallel(worker_source, page_count, max_workers)
+                except Exception as e:
+                    self.logger.warning(f"Parallel extraction failed, falling back to sequential: {e}")
 
+            if text_blocks is None:
+                text_blocks = self._extract_table(doc, 0, page_count)
+
+            if owns_doc:
+                doc.close()
+
+            if text_blocks.image_only_pages:
+                self.logger.info(f"{len(text_blocks.image_only_pages)} image-only pages without text layer "
+                                 f"(need OCR): {text_blocks.image_only_pages}")
             return text_blocks
             
         except Exception as e:
             self.logger.error(f"Text extraction error: {e}")
-            return []
+            return SpanTable.from_spans([])
     
+    def _span_block_info(self, spans: SpanTable, index: int, start_pos: int, end_pos: int) -> Dict:
+        """Block information for the part of [start_pos, end_pos) relative to one span"""
+        block_start = int(spans.start_char[index])
+        return {
+            'page': int(spans.page[index]),
+            'bbox': tuple(float(x) for x in spans.bbox[index]),
+            'font': spans.fonts[spans.font_id[index]],
+            'size': float(spans.size[index]),
+            'flags': int(spans.flags[index]),
+            'color': int(spans.color[index]),
+            'relative_start': start_pos - block_start,
+            'relative_end': end_pos - block_start,
+            'block_text': spans.text(index)
+        }
+
+    def find_text_fragments(self, start_pos: int, end_pos: int, text_blocks) -> List[Dict]:
+        """
+        Split a full-text range into the span fragments covering it
+
+        Args:
+            start_pos: Start position in full text
+            end_pos: End position in full text
+            text_blocks: SpanTable (a list of text blocks is converted on every call,
+                callers convert once with SpanTable.coerce)
+
+        Returns:
+            Block information dicts in text order, one per span; relative offsets are
+            clipped to the span, so each fragment holds only its part of the range
+        """
+        spans = SpanTable.coerce(text_blocks)
+
+        fragments = []
+        for index in spans.find_spans(start_pos, end_pos):
+            block_start = int(spans.start_char[index])
+            fragment_start = max(start_pos, block_start)
+            fragment_end = min(end_pos, int(spans.end_char[index]))
+            fragments.append(self._span_block_info(spans, int(index), fragment_start, fragment_end))
+        return fragments
+
     def find_text_block_for_position(self, start_pos: int, end_pos: int, 
                                    text_blocks: List[Dict], full_text: str) -> Dict:
         """
         Find text block information for given position
+
+        Entities that cross spans (wrapped lines, font changes) get the first
+        fragment's information plus 'fragments', the block information of every
+        span fragment. A range crossing a page break keeps the fragments of all
+        its pages; 'page' is the page it starts on.
         
         Args:
             start_pos: Start position in full text
             end_pos: End position in full text
-            text_blocks: List of text blocks
+            text_blocks: SpanTable (a list of text blocks is converted on every call,
+                callers convert once with SpanTable.coerce)
             full_text: Full extracted text
             
         Returns:
-            Dict with block information
+            Dict with block information ('bbox' is None if the range covers no span)
         """
-        current_pos = 0
-
-        for block in text_blocks:
-            block_text = block['text']
-            block_start = current_pos
-            block_end = current_pos + len(block_text)
-
-            if start_pos >= block_start and end_pos <= block_end + 1:
-                relative_start = start_pos - block_start
-                relative_end = end_pos - block_start
-
-                return {
-                    'page': block['page'],
-                    'bbox': block['bbox'],
-                    'font': block['font'],
-                    'size': block['size'],
-                    'flags': block['flags'],
-                    'color': block['color'],
-                    'relative_start': relative_start,
-                    'relative_end': relative_end,
-                    'block_text': block_text
-                }
-
-            current_pos = block_end + 1
-
-        # Fallback
+        # Lists of span dicts get the same offsets (space-joined texts) as a SpanTable
+        spans = SpanTable.coerce(text_blocks)
+
+        index = spans.find_span(start_pos, end_pos)
+        if index is not None:
+            return self._span_block_info(spans, index, start_pos, end_pos)
+
+        fragments = self.find_text_fragments(start_pos, end_pos, spans)
+        if fragments:
+            block_info = dict(fragments[0])
+            block_info['fragments'] = fragments
+            return block_info
+
+        # Range outside all spans: nothing to locate (page of the preceding span for sharding)
+        self.logger.debug(f"No text span covers range {start_pos}-{end_pos}")
+        preceding = int(np.searchsorted(spans.start_char, start_pos, side='right')) - 1
         return {
-            'page': 0,
-            'bbox': (0, 0, 100, 20),
+            'page': int(spans.page[preceding]) if preceding >= 0 else 0,
+            'bbox': None,
             'font': 'Arial',
             'size': 12,
             'flags': 0,
@@ -153,36 +339,108 @@ class PDFExtractor:
             'block_text': ''
         }
     
-    def search_quads_near(self, page, query: str, ref_bbox, max_hits=64):
-        """Search for text quads near reference bounding box"""
-        try:
-            tp = page.get_textpage()
+    def find_repeated_spans(self, spans: SpanTable) -> Dict[int, np.ndarray]:
+        """
+        Find headers, footers and other spans repeated across pages
 
-            flags = 0
-            for name in ("TEXT_SEARCH_IGNORE_CASE", "TEXT_IGNORECASE"):
-                if hasattr(fitz, name):
-                    flags |= getattr(fitz, name)
+        Spans are fingerprinted by normalized text, font size and position
+        (snapped to a grid of repeat_position_tolerance points).
 
-            try:
-                hits = tp.search(query, hit_max=max_hits, quads=True, flags=flags)
-            except TypeError:
-                hits = tp.search(query, hit_max=max_hits, quads=True)
+        Args:
+            spans: Extracted SpanTable
 
-            if not hits:
-                return None
+        Returns:
+            Dict mapping the first occurrence's span index to the indices of its
+            copies on later pages (only groups on at least repeat_min_pages pages)
+        """
+        groups: Dict[tuple, List[int]] = {}
+        tolerance = self.repeat_position_tolerance
+        for index in range(len(spans)):
+            text = normalize_search_text(spans.text(index))
+            if len(text) < self.repeat_min_chars:
+                continue
+            x0, y0 = spans.bbox[index, 0], spans.bbox[index, 1]
+            key = (text, round(float(spans.size[index]), 1), round(x0 / tolerance), round(y0 / tolerance))
+            groups.setdefault(key, []).append(index)
+
+        repeats = {}
+        for indices in groups.values():
+            # One occurrence per page (spans are in page order)
+            members, pages = [], set()
+            for index in indices:
+                page = int(spans.page[index])
+                if page not in pages:
+                    pages.add(page)
+                    members.append(index)
+            if len(members) >= self.repeat_min_pages:
+                repeats[members[0]] = np.asarray(members[1:], dtype=np.int64)
+
+        if repeats:
+            copies = sum(len(copies) for copies in repeats.values())
+            self.logger.info(f"Repeated spans: {len(repeats)} unique blocks, {copies} copies on other pages")
+        return repeats
+
+    def mask_repeated_text(self, spans: SpanTable, repeats: Dict[int, np.ndarray]) -> str:
+        """
+        Full text with every copy of a repeated span blanked out (offsets unchanged)
+
+        Args:
+            spans: Extracted SpanTable
+            repeats: Result of find_repeated_spans
+
+        Returns:
+            Text for detection in which only first occurrences remain
+        """
+        if not repeats:
+            return spans.full_text
+
+        copies = np.sort(np.concatenate(list(repeats.values())))
+        pieces, position = [], 0
+        for index in copies:
+            start, end = int(spans.start_char[index]), int(spans.end_char[index])
+            pieces.append(spans.full_text[position:start])
+            pieces.append(' ' * (end - start))
+            position = end
+        pieces.append(spans.full_text[position:])
+        return ''.join(pieces)
+
+    def replay_repeated_entities(self, entities: List[Dict], spans: SpanTable,
+                                 repeats: Dict[int, np.ndarray]) -> List[Dict]:
+        """
+        Copy entities found in a repeated span's first occurrence onto all its copies
+
+        The original and its copies share a 'repeat_group' in text_block_info, so
+        rectangles located on one page are reused on the others.
+
+        Args:
+            entities: Entities with 'start', 'end' and 'text_block_info' (found in masked text)
+            spans: Extracted SpanTable
+            repeats: Result of find_repeated_spans
+
+        Returns:
+            New entities for the copies
+        """
+        replayed = []
+        if not repeats:
+            return replayed
+
+        for entity in entities:
+            index = spans.find_span(entity['start'], entity['end'])
+            copies = repeats.get(index) if index is not None else None
+            if copies is None or not len(copies):
+                continue
+
+            group = {'rects': None}
+            entity['text_block_info']['repeat_group'] = group
+            for copy_index in copies:
+                delta = int(spans.start_char[copy_index]) - int(spans.start_char[index])
+                start, end = entity['start'] + delta, entity['end'] + delta
+                block_info = self._span_block_info(spans, int(copy_index), start, end)
+                block_info['repeat_group'] = group
+                replayed.append({**entity, 'start': start, 'end': end, 'text_block_info': block_info})
+
+        return replayed
 
-            rx0, ry0, rx1, ry1 = ref_bbox
-            best, best_dist = None, float("inf")
-            for h in hits:
-                q = h[0] if isinstance(h, (list, tuple)) else h
-                rect = fitz.Rect(q.rect) if hasattr(q, "rect") else fitz.Rect(q)
-                dist = abs(rect.x0 - rx0) + abs(rect.y0 - ry0)
-                if dist < best_dist:
-                    best, best_dist = h, dist
-            return best
-        except Exception:
-            return None
-    
     def rect_from_block_slice_chars(self, page, text_block_info) -> Optional[fitz.Rect]:
         """Get rectangle from character bboxes in block slice"""
         try:
@@ -238,24 +496,100 @@ class PDFExtractor:
         except Exception:
             return None
     
-    def rects_from_hit(self, hit) -> List[fitz.Rect]:
-        """Extract rectangles from search hit"""
-        rects = []
-        def to_rect(obj):
-            if isinstance(obj, fitz.Rect):
-                return obj
-            if hasattr(obj, "rect"):
-                try: return fitz.Rect(obj.rect)
-                except Exception: pass
-            if isinstance(obj, (list, tuple)) and len(obj) == 4 and all(hasattr(p, "x") and hasattr(p, "y") for p in obj):
-                xs = [p.x for p in obj]; ys = [p.y for p in obj]
-                return fitz.Rect(min(xs), min(ys), max(xs), max(ys))
-            return None
-        def walk(o):
-            r = to_rect(o)
-            if r is not None:
-                rects.append(r); return
-            if isinstance(o, (list, tuple)):
-                for it in o: walk(it)
-        walk(hit)
-        return [fitz.Rect(r) for r in rects if r is not None]
\ No newline at end of file
+    def locate_entity_rects(self, page, entity: Dict) -> List[fitz.Rect]:
+        """
+        Locate the rectangles covering an entity on a page
+
+        Args:
+            page: PDF page object (the entity's page, or a later page it continues on)
+            entity: Entity information dict with text_block_info
+
+        Returns:
+            List of rectangles (empty if the entity could not be found)
+        """
+        original_text = (entity.get('word') or '').strip()
+        if not original_text:
+            return []
+
+        text_block_info = entity.get('text_block_info') or {}
+        # Already located by a preview of the same (unmodified) document
+        if page.number == text_block_info.get('page', page.number):
+            if text_block_info.get('rects') is not None:
+                return [fitz.Rect(rect) for rect in text_block_info['rects']]
+        elif page.number in (text_block_info.get('continued_rects') or {}):
+            return [fitz.Rect(rect) for rect in text_block_info['continued_rects'][page.number]]
+
+        fragments = text_block_info.get('fragments')
+        if fragments:
+            # Entity crosses spans: every fragment on this page is located inside its own span
+            rects = []
+            for fragment in fragments:
+                if fragment.get('page', page.number) == page.number:
+                    rects.extend(self._locate_in_span(page, fragment, ''))
+            return rects
+
+        group = text_block_info.get('repeat_group')
+        if group is not None and group['rects'] is not None:
+            # Same text at the same place as on another page: shift the rectangles found there
+            x0, y0 = text_block_info['bbox'][:2]
+            return [fitz.Rect(r[0] + x0, r[1] + y0, r[2] + x0, r[3] + y0) for r in group['rects']]
+
+        rects = self._locate_in_span(page, text_block_info, original_text)
+        if group is not None and rects:
+            x0, y0 = text_block_info['bbox'][:2]
+            group['rects'] = [(r.x0 - x0, r.y0 - y0, r.x1 - x0, r.y1 - y0) for r in rects]
+        return rects
+
+    @staticmethod
+    def _is_whole_word_slice(block_text: str, start: int, end: int) -> bool:
+        """Whether block_text[start:end] begins and ends at word boundaries"""
+        return ((start == 0 or block_text[start - 1].isspace())
+                and (end == len(block_text) or block_text[end].isspace()))
+
+    def _locate_in_span(self, page, text_block_info: Dict, fallback_text: str) -> List[fitz.Rect]:
+        """
+        Locate the slice of one span described by text_block_info
+
+        Args:
+            page: PDF page object
+            text_block_info: Block information (bbox, block_text, relative offsets)
+            fallback_text: Text searched when the block slice is unusable
+
+        Returns:
+            List of rectangles (empty if not found)
+        """
+        bbox = text_block_info.get('bbox')
+        if not bbox:
+            return []
+
+        block_text = text_block_info.get('block_text', '')
+        rel_s = int(text_block_info.get('relative_start', 0))
+        rel_e = int(text_block_info.get('relative_end', 0))
+        block_slice = block_text[rel_s:rel_e] if (0 <= rel_s <= len(block_text) and 0 <= rel_e <= len(block_text)) else ''
+        search_text = (block_slice or fallback_text).strip()
+        if not search_text:
+            return []
+
+        # Whole-word slices are matched as token sequences in the page's word index
+        if block_slice and self._is_whole_word_slice(block_text, rel_s, rel_e):
+            tokens = [normalize_search_text(word) for word in search_text.split()]
+            prefix = [normalize_search_text(word) for word in block_text[:rel_s].split()]
+            occurrence = sum(1 for i in range(len(prefix) - len(tokens) + 1)
+                             if prefix[i:i + len(tokens)] == tokens)
+            rects = self.text_index_cache.get(page, PageWordIndex).find(tokens, bbox, occurrence=occurrence)
+            if rects:
+                return rects
+
+        # Partial words: one lookup in the page's normalized character text;
+        # the occurrence index picks the right hit when the text repeats inside the span
+        occurrence = 0
+        if block_slice:
+            occurrence = normalize_search_text(block_text[:rel_s]).count(normalize_search_text(search_text))
+
+        rects = self.text_index_cache.get(page).find(search_text, bbox, occurrence=occurrence)
+        if rects:
+            return rects
+
+        # Fallback to character-based rectangle
+        char_rect = self.rect_from_block_slice_chars(page, text_block_info)
+        return [char_rect] if char_rect else []
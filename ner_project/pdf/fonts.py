@@ -0,0 +1,237 @@
+"""
+PDF Fonts Module - Cached glyph-advance tables for replacement text fitting
+"""
+import logging
+import fitz  # PyMuPDF
+import numpy as np
+from collections import OrderedDict
+from typing import Dict
+
+from pdf.utils import document_token
+
+logger = logging.getLogger(__name__)
+
+# Span flags reported by PyMuPDF
+FLAG_ITALIC = 2
+FLAG_SERIFED = 4
+FLAG_MONOSPACED = 8
+FLAG_BOLD = 16
+
+# Base-14 short names per family: (regular, italic, bold, bold italic)
+_BASE14_FAMILIES = {
+    'helv': ('helv', 'heit', 'hebo', 'hebi'),
+    'times': ('tiro', 'tiit', 'tibo', 'tibi'),
+    'courier': ('cour', 'coit', 'cobo', 'cobi'),
+}
+
+_SERIF_HINTS = ('times', 'serif', 'roman', 'georgia', 'garamond', 'cambria', 'book antiqua', 'palatino')
+_MONO_HINTS = ('courier', 'mono', 'consolas')
+_REGULAR_SUFFIXES = ('regular', 'book', 'normal')
+
+
+def strip_subset_prefix(font_name: str) -> str:
+    """Remove a subset tag such as 'ABCDEF+' from a font name"""
+    if len(font_name) > 7 and font_name[6] == '+' and font_name[:6].isupper():
+        return font_name[7:]
+    return font_name
+
+
+def font_key(font_name: str) -> str:
+    """
+    Normalize a font name for matching span fonts against embedded fonts
+
+    'ABCDEF+DejaVuSerif', 'DejaVu Serif Book' and 'DejaVuSerif' share one key.
+    """
+    key = ''.join(ch for ch in strip_subset_prefix(font_name or '').lower() if ch.isalnum())
+    for suffix in _REGULAR_SUFFIXES:
+        if key.endswith(suffix) and len(key) > len(suffix):
+            return key[:-len(suffix)]
+    return key
+
+
+def base14_fallback(font_name: str, flags: int = 0) -> str:
+    """
+    Pick the base-14 font closest to a source font
+
+    Args:
+        font_name: Source font name from text extraction
+        flags: Span flags from text extraction
+
+    Returns:
+        Base-14 short font name (e.g. 'tibo')
+    """
+    name = strip_subset_prefix(font_name or '').lower()
+
+    if (flags & FLAG_MONOSPACED) or any(hint in name for hint in _MONO_HINTS):
+        family = 'courier'
+    elif 'sans' not in name and ((flags & FLAG_SERIFED) or any(hint in name for hint in _SERIF_HINTS)):
+        family = 'times'
+    else:
+        family = 'helv'
+
+    bold = bool(flags & FLAG_BOLD) or 'bold' in name or 'black' in name
+    italic = bool(flags & FLAG_ITALIC) or 'italic' in name or 'oblique' in name
+    return _BASE14_FAMILIES[family][(2 if bold else 0) + (1 if italic else 0)]
+
+
+class FontMetrics:
+    """Glyph advances of one font with vectorised text width computation"""
+
+    def __init__(self, font: fitz.Font, name: str, table_size: int = 0x250):
+        """
+        Initialize FontMetrics
+
+        Args:
+            font: fitz.Font to measure and write with
+            name: Font name used as cache key
+            table_size: Number of leading code points kept in the advance table
+                (covers Latin-1 and Latin Extended-A/B, i.e. all Turkish letters)
+        """
+        self.font = font
+        self.name = name
+        self.advances = np.zeros(table_size, dtype=np.float64)
+        self.has_glyph = np.zeros(table_size, dtype=bool)
+
+        for code in range(32, table_size):
+            if font.has_glyph(code):
+                self.has_glyph[code] = True
+                self.advances[code] = font.glyph_advance(code)
+
+        # Code points beyond the table, filled lazily
+        self._extra: Dict[int, float] = {}
+
+    def _codes(self, text: str) -> np.ndarray:
+        """Unicode code points of a string as an array"""
+        return np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+
+    def _extra_advance(self, code: int) -> float:
+        advance = self._extra.get(code)
+        if advance is None:
+            advance = self._extra[code] = self.font.glyph_advance(code) if self.font.has_glyph(code) else 0.0
+        return advance
+
+    def covers(self, text: str) -> bool:
+        """Whether the font has a glyph for every non-space character of text"""
+        codes = self._codes(text)
+        codes = codes[codes > 32]
+        in_table = codes < self.has_glyph.size
+        if not self.has_glyph[codes[in_table]].all():
+            return False
+        return all(self.font.has_glyph(int(code)) for code in codes[~in_table])
+
+    def text_width(self, text: str, fontsize: float) -> float:
+        """
+        Width of text when written with this font
+
+        Args:
+            text: Text to measure
+            fontsize: Font size
+
+        Returns:
+            Width in points
+        """
+        if not text:
+            return 0.0
+
+        codes = self._codes(text)
+        in_table = codes < self.advances.size
+        width = self.advances[codes[in_table]].sum()
+        if not in_table.all():
+            width += sum(self._extra_advance(int(code)) for code in codes[~in_table])
+        return float(width) * fontsize
+
+
+class FontMetricsCache:
+    """Font metrics per font name, from a document's embedded fonts or base-14 fallbacks"""
+
+    def __init__(self, max_documents: int = 8):
+        """
+        Initialize FontMetricsCache
+
+        Args:
+            max_documents: Number of documents whose embedded fonts are kept
+        """
+        self.logger = logger
+        self.max_documents = max_documents
+        self._base14: Dict[str, FontMetrics] = {}
+        # document token -> {'xrefs': loaded font xrefs, 'fonts': font_key -> FontMetrics}
+        self._documents: "OrderedDict[int, Dict]" = OrderedDict()
+
+    def get_base14(self, fontname: str = 'helv') -> FontMetrics:
+        """
+        Get metrics of a base-14 font
+
+        Args:
+            fontname: Base-14 short font name
+
+        Returns:
+            FontMetrics instance
+        """
+        metrics = self._base14.get(fontname)
+        if metrics is None:
+            metrics = self._base14[fontname] = FontMetrics(fitz.Font(fontname), fontname)
+        return metrics
+
+    def _document_fonts(self, page) -> Dict[str, FontMetrics]:
+        """Load the embedded fonts used on a page (once per font xref and document), by font_key"""
+        doc = page.parent
+        # Not id(doc)/doc.name: ids are reused and stream-opened documents have no name
+        doc_key = document_token(doc)
+        entry = self._documents.get(doc_key)
+        if entry is None:
+            entry = self._documents[doc_key] = {'xrefs': set(), 'fonts': {}}
+            while len(self._documents) > self.max_documents:
+                self._documents.popitem(last=False)
+        else:
+            self._documents.move_to_end(doc_key)
+
+        for xref, ext, font_type, basefont, _, _ in page.get_fonts():
+            if xref in entry['xrefs']:
+                continue
+            entry['xrefs'].add(xref)
+
+            # Not embedded or not loadable as a standalone font
+            if ext == 'n/a' or font_type == 'Type3':
+                continue
+            try:
+                key = font_key(basefont)
+                if key in entry['fonts']:
+                    continue
+                _, _, _, buffer = doc.extract_font(xref)
+                if buffer:
+                    entry['fonts'][key] = FontMetrics(fitz.Font(fontbuffer=buffer), strip_subset_prefix(basefont))
+            except Exception as e:
+                self.logger.debug(f"Embedded font {basefont} (xref {xref}) not usable: {e}")
+
+        return entry['fonts']
+
+    def resolve(self, page, font_name: str, flags: int = 0, text: str = '') -> FontMetrics:
+        """
+        Get metrics for writing text in place of a span's font
+
+        The document's embedded font is used when it has glyphs for the whole
+        text (subset fonts often do not); otherwise the closest base-14 font.
+
+        Args:
+            page: PDF page the text is written on
+            font_name: Source span font name
+            flags: Source span flags
+            text: Text that will be written
+
+        Returns:
+            FontMetrics instance
+        """
+        name = strip_subset_prefix(font_name or '')
+        if page is not None and name:
+            try:
+                metrics = self._document_fonts(page).get(font_key(name))
+                if metrics is not None and metrics.covers(text):
+                    return metrics
+            except Exception as e:
+                self.logger.debug(f"Embedded font lookup error: {e}")
+
+        return self.get_base14(base14_fallback(name, flags))
+
+    def clear(self) -> None:
+        """Drop cached document fonts (base-14 tables are kept)"""
+        self._documents.clear()
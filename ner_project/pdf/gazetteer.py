@@ -0,0 +1,349 @@
+"""
+Gazetteer Module - Aho-Corasick based detection of known entity names
+"""
+import os
+import logging
+from collections import defaultdict, deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Dotted/dotless I must be mapped before str.lower() (Python lowers 'I' to 'i'
+# and 'İ' to two code points)
+_TURKISH_CASE_MAP = str.maketrans({'I': 'ı', 'İ': 'i'})
+
+# Sample lists are ASCII-fied ("Yilmaz", "Arcelik"), so diacritics are folded too
+_TURKISH_ASCII_MAP = str.maketrans({
+    'ı': 'i', 'ç': 'c', 'ş': 's', 'ğ': 'g', 'ö': 'o', 'ü': 'u',
+    'â': 'a', 'î': 'i', 'û': 'u'
+})
+
+
+# Single-word list entries that are also ordinary Turkish words or common first names
+# ("getir" = bring, "vatan" = homeland, "mavi" = blue); normalized form. Terms up to
+# exact_case_max_length characters ("Eti", "Tat") are handled by the casing rule instead.
+COMMON_WORD_STOPLIST = frozenset({
+    'getir', 'dogan', 'vatan', 'fakir', 'zorlu', 'metro', 'pinar', 'mavi', 'dogus', 'cengiz',
+    'garanti', 'gratis', 'ziraat', 'kale', 'damat', 'eren', 'real', 'network', 'sarar',
+    'korkmaz', 'arzum', 'sabiha', 'mango'
+})
+
+
+def turkish_casefold(text: str, ascii_fold: bool = True) -> str:
+    """
+    Turkish-aware, length-preserving case folding
+
+    Args:
+        text: Input text
+        ascii_fold: Also fold Turkish diacritics to ASCII
+
+    Returns:
+        Folded text with the same length as the input
+    """
+    folded = text.translate(_TURKISH_CASE_MAP).lower()
+    if len(folded) != len(text):
+        folded = ''.join(c.translate(_TURKISH_CASE_MAP).lower()[:1] or c for c in text)
+    if ascii_fold:
+        folded = folded.translate(_TURKISH_ASCII_MAP)
+    return folded
+
+
+def normalize_with_offsets(text: str) -> Tuple[str, List[int]]:
+    """
+    Fold text and collapse whitespace runs, keeping an offset map
+
+    Args:
+        text: Original text
+
+    Returns:
+        Tuple of (normalized text, original index for every normalized character)
+    """
+    folded = turkish_casefold(text)
+    chars = []
+    offsets = []
+    prev_space = True
+    for i, ch in enumerate(folded):
+        if ch.isspace():
+            if prev_space:
+                continue
+            ch = ' '
+            prev_space = True
+        else:
+            prev_space = False
+        chars.append(ch)
+        offsets.append(i)
+
+    # Drop trailing space so normalized terms and text agree
+    if chars and chars[-1] == ' ':
+        chars.pop()
+        offsets.pop()
+
+    return ''.join(chars), offsets
+
+
+def normalize_term(term: str) -> str:
+    """Normalize a gazetteer term the same way document text is normalized"""
+    return normalize_with_offsets(term or '')[0]
+
+
+class AhoCorasickAutomaton:
+    """Multi-pattern matcher that scans text in a single linear pass"""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, object]]] = [[]]
+        self._pattern_count = 0
+        self._built = True
+
+    def __len__(self) -> int:
+        return self._pattern_count
+
+    def add(self, pattern: str, payload=None) -> None:
+        """
+        Add pattern to the automaton
+
+        Args:
+            pattern: Pattern string (already normalized)
+            payload: Value reported with every match of this pattern
+        """
+        if not pattern:
+            return
+
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+
+        self._output[state].append((len(pattern), payload))
+        self._pattern_count += 1
+        self._built = False
+
+    def build(self) -> None:
+        """Compute failure links (breadth-first over the trie)"""
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+        self._built = True
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, object]]:
+        """
+        Scan text and yield every pattern occurrence
+
+        Args:
+            text: Text to scan (normalized the same way as patterns)
+
+        Yields:
+            (start, end, payload) tuples, end exclusive
+        """
+        if not self._built:
+            self.build()
+
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                for length, payload in output[state]:
+                    yield i - length + 1, i + 1, payload
+
+
+def is_word_boundary(text: str, start: int, end: int) -> bool:
+    """Check that [start, end) is not embedded inside a longer word"""
+    if start > 0 and text[start - 1].isalnum():
+        return False
+    if end < len(text) and text[end].isalnum():
+        return False
+    return True
+
+
+class GazetteerDetector:
+    """Detect known organisations and names from gazetteer lists"""
+
+    def __init__(self, min_length: int = 3, exact_case_max_length: int = 4, score: float = 0.6,
+                 stopwords: Optional[Iterable[str]] = None):
+        """
+        Initialize GazetteerDetector
+
+        Args:
+            min_length: Terms shorter than this are ignored
+            exact_case_max_length: Terms up to this length only match with their original casing
+                                   (short acronyms like "BIM" collide with ordinary words otherwise)
+            score: Confidence score assigned to gazetteer hits; it only decides overlaps with
+                   model hits, list hits themselves are kept at any model threshold
+                   (PDFValidators.THRESHOLD_EXEMPT_METHODS)
+            stopwords: Single-word terms never added (normalized; COMMON_WORD_STOPLIST if None)
+        """
+        self.logger = logger
+        self.min_length = min_length
+        self.exact_case_max_length = exact_case_max_length
+        self.score = score
+        self.stopwords = frozenset(COMMON_WORD_STOPLIST if stopwords is None
+                                   else (normalize_term(word) for word in stopwords))
+        self.terms: Dict[str, Dict[str, str]] = defaultdict(dict)  # entity_type -> normalized -> raw
+        self._automaton: Optional[AhoCorasickAutomaton] = None
+
+    def __len__(self) -> int:
+        return sum(len(terms) for terms in self.terms.values())
+
+    def add_terms(self, entity_type: str, terms: Iterable[str]) -> int:
+        """
+        Add terms for an entity type
+
+        Args:
+            entity_type: Application entity type (e.g. 'sirket', 'ad_soyad')
+            terms: Surface forms to detect
+
+        Returns:
+            Number of newly added terms
+        """
+        added = 0
+        for raw in terms:
+            raw = (raw or '').strip()
+            normalized = normalize_term(raw)
+            if len(normalized) < self.min_length or normalized in self.terms[entity_type]:
+                continue
+            if ' ' not in normalized and normalized in self.stopwords:
+                self.logger.debug(f"Gazetteer term '{raw}' skipped: common word")
+                continue
+            self.terms[entity_type][normalized] = raw
+            added += 1
+
+        if added:
+            self._automaton = None
+        return added
+
+    def load_terms_file(self, path: str, entity_type: str) -> int:
+        """
+        Load customer-supplied terms from a text file (one term per line)
+
+        Args:
+            path: Path to the terms file
+            entity_type: Entity type assigned to the terms
+
+        Returns:
+            Number of newly added terms
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                terms = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+            added = self.add_terms(entity_type, terms)
+            self.logger.info(f"Loaded {added} gazetteer terms for '{entity_type}' from {path}")
+            return added
+        except Exception as e:
+            self.logger.error(f"Gazetteer file loading error ({path}): {e}")
+            return 0
+
+    def load_terms_directory(self, directory: str) -> int:
+        """
+        Load every <entity_type>.txt file in a directory
+
+        Args:
+            directory: Directory containing term files
+
+        Returns:
+            Number of newly added terms
+        """
+        if not os.path.isdir(directory):
+            return 0
+
+        added = 0
+        for filename in sorted(os.listdir(directory)):
+            entity_type, ext = os.path.splitext(filename)
+            if ext.lower() == '.txt':
+                added += self.load_terms_file(os.path.join(directory, filename), entity_type)
+        return added
+
+    def _get_automaton(self) -> AhoCorasickAutomaton:
+        """Compile terms into the automaton on first use"""
+        if self._automaton is None:
+            automaton = AhoCorasickAutomaton()
+            for entity_type, terms in self.terms.items():
+                for normalized, raw in terms.items():
+                    automaton.add(normalized, (entity_type, raw))
+            automaton.build()
+            self._automaton = automaton
+            self.logger.info(f"Gazetteer automaton compiled with {len(automaton)} terms")
+        return self._automaton
+
+    def case_matches(self, raw: str, word: str) -> bool:
+        """
+        Casing rule for a matched term
+
+        Short terms must match exactly (or in capitals); other single-word
+        terms need at least an initial capital; multi-word terms match in
+        any casing.
+
+        Args:
+            raw: Term as listed
+            word: Matched document text
+
+        Returns:
+            True if the match is accepted
+        """
+        if len(raw) <= self.exact_case_max_length:
+            # Acronyms also match in capitals with the other dotted/dotless I ("BIM" / "BİM")
+            return word in (raw, raw.upper()) or (raw.isupper() and word.isupper())
+        if ' ' not in raw:
+            return word[:1].isupper()
+        return True
+
+    def detect(self, text: str) -> List[Dict]:
+        """
+        Detect gazetteer terms in text
+
+        Args:
+            text: Input text
+
+        Returns:
+            List of entity dicts (same shape as model entities)
+        """
+        if not text or not self.terms:
+            return []
+
+        normalized, offsets = normalize_with_offsets(text)
+        entities = []
+
+        for n_start, n_end, (entity_type, raw) in self._get_automaton().iter_matches(normalized):
+            if not is_word_boundary(normalized, n_start, n_end):
+                continue
+
+            start = offsets[n_start]
+            end = offsets[n_end - 1] + 1
+            word = text[start:end]
+
+            if not self.case_matches(raw, word):
+                continue
+
+            entities.append({
+                'entity': entity_type,
+                'word': word,
+                'start': start,
+                'end': end,
+                'score': self.score,
+                'method': 'gazetteer',
+                # Propagation keeps the casing rule of short and single-word terms
+                'case_sensitive': len(raw) <= self.exact_case_max_length or ' ' not in raw
+            })
+
+        return entities
@@ -0,0 +1,74 @@
+"""
+PDF Geometry Module - Rectangle helpers for redaction areas
+"""
+import logging
+import fitz  # PyMuPDF
+import numpy as np
+from typing import Iterable, List
+
+logger = logging.getLogger(__name__)
+
+
+def coalesce_rects(rects: Iterable, max_gap: float = 0.5, baseline_tolerance: float = 1.0) -> List[fitz.Rect]:
+    """
+    Merge rectangles that overlap or touch on the same text line
+
+    Rectangles whose bottom edges (baselines) lie within baseline_tolerance
+    of each other form a line; inside a line, rectangles separated by at
+    most max_gap horizontally are replaced by their union. The gap is kept
+    small so no glyph between two separate entities gets covered. Rectangles
+    lying inside another one are dropped.
+
+    Args:
+        rects: Rectangles (fitz.Rect or 4-sequences)
+        max_gap: Largest horizontal gap (points) that still counts as touching
+        baseline_tolerance: Largest baseline difference (points) within one line
+
+    Returns:
+        Merged rectangles, line by line from top to bottom
+    """
+    boxes = sorted((fitz.Rect(rect) for rect in rects if rect is not None), key=lambda r: (r.y1, r.x0))
+    boxes = [box for box in boxes if not box.is_empty]
+    if len(boxes) < 2:
+        return boxes
+
+    # Split into lines by baseline
+    lines, line = [], [boxes[0]]
+    for box in boxes[1:]:
+        if box.y1 - line[0].y1 <= baseline_tolerance:
+            line.append(box)
+        else:
+            lines.append(line)
+            line = [box]
+    lines.append(line)
+
+    merged = []
+    for line in lines:
+        line.sort(key=lambda r: r.x0)
+        current = fitz.Rect(line[0])
+        for box in line[1:]:
+            if box.x0 <= current.x1 + max_gap:
+                current |= box
+            else:
+                merged.append(current)
+                current = fitz.Rect(box)
+        merged.append(current)
+    return _drop_contained(merged)
+
+
+def _drop_contained(rects: List[fitz.Rect]) -> List[fitz.Rect]:
+    """Remove rectangles that lie inside another rectangle of the list"""
+    if len(rects) < 2:
+        return rects
+
+    boxes = np.array([tuple(rect) for rect in rects], dtype=np.float64)
+    x0, y0, x1, y1 = (boxes[:, i] for i in range(4))
+    # inside[i, j]: rect i lies within rect j
+    inside = ((x0[:, None] >= x0[None, :]) & (y0[:, None] >= y0[None, :])
+              & (x1[:, None] <= x1[None, :]) & (y1[:, None] <= y1[None, :]))
+    np.fill_diagonal(inside, False)
+    # Of identical rectangles only the first is kept
+    identical = inside & inside.T
+    inside &= ~np.triu(identical)
+    keep = ~inside.any(axis=1)
+    return [rect for rect, kept in zip(rects, keep) if kept]
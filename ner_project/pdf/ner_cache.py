@@ -0,0 +1,390 @@
+"""
+NER Cache Module - Session caches for detection results
+"""
+import os
+import sys
+import copy
+import json
+import hashlib
+import logging
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def compute_file_hash(file_path: str, block_size: int = 1 << 20) -> str:
+    """
+    Compute SHA-256 hash of a file
+
+    Args:
+        file_path: Path to file
+        block_size: Read block size in bytes
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def compute_bytes_hash(data: bytes) -> str:
+    """
+    Compute SHA-256 hash of in-memory file contents (same digest as compute_file_hash)
+
+    Args:
+        data: File contents
+
+    Returns:
+        Hex digest
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def copy_entities(entities: List[Dict]) -> List[Dict]:
+    """
+    Copy entity dicts so callers can annotate them freely
+
+    Nested data (text_block_info with its fragments and rects, repeat_group)
+    is copied as well: rectangles written while applying or previewing must
+    not end up in cached entries. The list is copied in one deepcopy, so a
+    repeat_group shared by a header and its copies is still shared (and
+    still fills in for all of them) in the copy.
+    """
+    return copy.deepcopy(entities)
+
+
+class FileHashCache:
+    """Content hashes of files, memoised per (path, modification time, size)"""
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Initialize FileHashCache
+
+        Args:
+            max_entries: Number of files remembered (least recently used are evicted)
+        """
+        self.max_entries = max_entries
+        # (absolute path, mtime_ns, size) -> hex digest
+        self._entries: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, file_path: str) -> str:
+        """
+        Hash of a file, re-read only when its modification time or size changed
+
+        Args:
+            file_path: Path to file
+
+        Returns:
+            Hex digest (same as compute_file_hash)
+        """
+        stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            digest = self._entries.get(key)
+            if digest is not None:
+                self._entries.move_to_end(key)
+                return digest
+
+        digest = compute_file_hash(file_path)
+        with self._lock:
+            self._entries[key] = digest
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return digest
+
+
+class DetectionCache:
+    """Per-document cache of extraction output and un-thresholded entity candidates"""
+
+    def __init__(self, max_documents: int = 16):
+        """
+        Initialize DetectionCache
+
+        Args:
+            max_documents: Number of documents kept (least recently used are evicted)
+        """
+        self.logger = logger
+        self.max_documents = max_documents
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+
+    def __contains__(self, doc_hash: str) -> bool:
+        return doc_hash in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, doc_hash: str) -> Optional[Dict]:
+        """
+        Get cached detection data
+
+        Args:
+            doc_hash: Document hash
+
+        Returns:
+            Dict with 'text_blocks', 'full_text' and a copy of 'candidates', or None
+        """
+        entry = self._entries.get(doc_hash)
+        if entry is None:
+            return None
+
+        self._entries.move_to_end(doc_hash)
+        return {
+            'text_blocks': entry['text_blocks'],
+            'full_text': entry['full_text'],
+            'candidates': copy_entities(entry['candidates'])
+        }
+
+    def put(self, doc_hash: str, text_blocks: List[Dict], full_text: str, candidates: List[Dict]) -> None:
+        """
+        Store detection data for a document
+
+        Args:
+            doc_hash: Document hash
+            text_blocks: Extracted text blocks
+            full_text: Joined full text
+            candidates: Entity candidates before thresholding
+        """
+        self._entries[doc_hash] = {
+            'text_blocks': text_blocks,
+            'full_text': full_text,
+            'candidates': copy_entities(candidates),
+            'previews': {}
+        }
+        self._entries.move_to_end(doc_hash)
+
+        while len(self._entries) > self.max_documents:
+            evicted, _ = self._entries.popitem(last=False)
+            self.logger.debug(f"Detection cache evicted document {evicted[:12]}")
+
+    def put_preview(self, doc_hash: str, confidence_threshold: float, entities: List[Dict]) -> None:
+        """
+        Store the selected and located entities of a detect-only preview
+
+        Args:
+            doc_hash: Document hash (must already be cached by put())
+            confidence_threshold: Threshold the entities were selected with
+            entities: Selected entities with text_block_info['rects']
+        """
+        entry = self._entries.get(doc_hash)
+        if entry is not None:
+            entry['previews'][round(float(confidence_threshold), 4)] = copy_entities(entities)
+
+    def get_preview(self, doc_hash: str, confidence_threshold: float) -> Optional[List[Dict]]:
+        """
+        Get the previewed entities of a document at a threshold
+
+        Args:
+            doc_hash: Document hash
+            confidence_threshold: Confidence threshold
+
+        Returns:
+            Copy of the previewed entities, or None if no preview was made
+        """
+        entry = self._entries.get(doc_hash)
+        if entry is None:
+            return None
+        entities = entry['previews'].get(round(float(confidence_threshold), 4))
+        return copy_entities(entities) if entities is not None else None
+
+    def entity_counts(self, doc_hash: str, thresholds: List[float],
+                      count_entities: Callable[[float], int]) -> Dict[float, int]:
+        """
+        Final entity counts of a document per threshold, computed once per document
+
+        Args:
+            doc_hash: Document hash
+            thresholds: Thresholds to report
+            count_entities: Callback returning the entity count at a threshold
+                (runs merging and propagation on the cached candidates)
+
+        Returns:
+            Dict mapping threshold to entity count (empty if not cached)
+        """
+        entry = self._entries.get(doc_hash)
+        if entry is None:
+            return {}
+
+        counts = entry.setdefault('entity_counts', {})
+        for threshold in thresholds:
+            key = round(float(threshold), 4)
+            if key not in counts:
+                counts[key] = count_entities(key)
+        return {round(float(threshold), 4): counts[round(float(threshold), 4)] for threshold in thresholds}
+
+    def clear(self) -> None:
+        """Drop all cached documents"""
+        self._entries.clear()
+
+
+class ChunkResultCache:
+    """LRU cache of NER results per chunk text, optionally backed by SQLite"""
+
+    def __init__(self, model_version: str = "", max_entries: int = 20000, disk_path: Optional[str] = None):
+        """
+        Initialize ChunkResultCache
+
+        Args:
+            model_version: Identifier of the model producing the results (part of the key)
+            max_entries: Number of chunks kept in memory
+            disk_path: Optional SQLite file for a persistent second level
+        """
+        self.logger = logger
+        self.model_version = model_version
+        self.max_entries = max_entries
+        # key -> (chunk text length, results)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._entry_sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_bytes = 0
+
+        self._db = None
+        if disk_path:
+            self._open_disk(disk_path)
+
+    def _open_disk(self, disk_path: str) -> None:
+        """Open (or create) the SQLite store"""
+        try:
+            directory = os.path.dirname(disk_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS chunks (key TEXT PRIMARY KEY, value TEXT)")
+            self._db.commit()
+        except Exception as e:
+            self.logger.error(f"Chunk cache disk store error ({disk_path}): {e}")
+            self._db = None
+
+    def make_key(self, text: str) -> str:
+        """Hash of the normalized chunk text plus model version"""
+        normalized = unicodedata.normalize("NFC", text)
+        return hashlib.sha256(f"{self.model_version}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, text_length: int, results: List[Dict]) -> None:
+        """Insert into (or replace in) the in-memory LRU (lock held by caller)"""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            if self._entries[key][0] == text_length:
+                return
+            # Same key, different text length (NFC-equivalent text): the new results replace the old
+            self.memory_bytes -= self._entry_sizes.pop(key, 0)
+
+        self._entries[key] = (text_length, results)
+        size = sys.getsizeof(json.dumps(results, ensure_ascii=False))
+        self._entry_sizes[key] = size
+        self.memory_bytes += size
+
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self.memory_bytes -= self._entry_sizes.pop(evicted, 0)
+
+    def get(self, text: str) -> Optional[List[Dict]]:
+        """
+        Look up cached results for a chunk
+
+        Args:
+            text: Chunk text
+
+        Returns:
+            Results with offsets relative to the chunk (and words re-sliced from it), or None
+            (a stored entry of a different text length counts as a miss)
+        """
+        key = self.make_key(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            from_disk = False
+            if entry is not None:
+                self._entries.move_to_end(key)
+            elif self._db is not None:
+                row = self._db.execute("SELECT value FROM chunks WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    stored = json.loads(row[0])
+                    entry = (stored['length'], stored['results'])
+                    from_disk = True
+
+            # NFC-equivalent text with a different length would shift offsets
+            if entry is None or entry[0] != len(text):
+                self.misses += 1
+                return None
+
+            if from_disk:
+                self._remember(key, *entry)
+                self.disk_hits += 1
+            self.hits += 1
+
+        results = entry[1]
+        return [dict(result, word=text[result['start']:result['end']]) for result in results]
+
+    def put(self, text: str, results: List[Dict]) -> None:
+        """
+        Store results for a chunk
+
+        Args:
+            text: Chunk text
+            results: Pipeline-style results with chunk-relative offsets
+        """
+        key = self.make_key(text)
+        stored = [
+            {
+                'entity_group': result['entity_group'],
+                'score': float(result['score']),
+                'start': int(result['start']),
+                'end': int(result['end'])
+            }
+            for result in results
+        ]
+
+        with self._lock:
+            self._remember(key, len(text), stored)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO chunks (key, value) VALUES (?, ?)",
+                        (key, json.dumps({'length': len(text), 'results': stored}, ensure_ascii=False))
+                    )
+                    self._db.commit()
+                except Exception as e:
+                    self.logger.warning(f"Chunk cache disk write error: {e}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Cache metrics
+
+        Returns:
+            Dict with hit/miss counts, hit rate, entry count and approximate memory usage
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            disk_entries = 0
+            if self._db is not None:
+                disk_entries = self._db.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'memory_mb': self.memory_bytes / (1024 * 1024),
+                'disk_entries': disk_entries,
+                'model_version': self.model_version
+            }
+
+    def clear(self) -> None:
+        """Drop in-memory entries and reset metrics (the disk store is kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._entry_sizes.clear()
+            self.hits = self.disk_hits = self.misses = 0
+            self.memory_bytes = 0
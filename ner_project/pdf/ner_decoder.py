@@ -0,0 +1,247 @@
+"""
+NER Decoder Module - Batched token classification with vectorised BIO decoding
+"""
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+
+logger = logging.getLogger(__name__)
+
+# Tag prefixes, encoded as small integers for vectorised grouping
+TAG_OUTSIDE = 0
+TAG_BEGIN = 1
+TAG_INSIDE = 2
+
+
+class FastNERDecoder:
+    """Token classification that bypasses the transformers pipeline post-processing"""
+
+    def __init__(self, tokenizer, model, batch_size: int = 8, max_length: int = 512):
+        """
+        Initialize FastNERDecoder
+
+        Args:
+            tokenizer: Fast (Rust) tokenizer with offset mapping support
+            model: Token classification model (already on its target device)
+            batch_size: Number of texts per forward pass
+            max_length: Maximum token sequence length
+        """
+        if not getattr(tokenizer, "is_fast", False):
+            raise ValueError("FastNERDecoder requires a fast tokenizer (offset mapping)")
+
+        self.logger = logger
+        self.tokenizer = tokenizer
+        self.model = model
+        self.batch_size = batch_size
+        self.max_length = min(max_length, getattr(tokenizer, "model_max_length", max_length) or max_length)
+        self.device = next(model.parameters()).device
+        self.model.eval()
+
+        self._build_label_tables(model.config.id2label)
+
+    def _build_label_tables(self, id2label: Dict) -> None:
+        """Precompute per-label prefix and entity type arrays"""
+        num_labels = len(id2label)
+        self.label_prefix = np.zeros(num_labels, dtype=np.int8)
+        self.label_type = np.full(num_labels, -1, dtype=np.int32)
+        type_names: List[str] = []
+
+        for label_id, label in id2label.items():
+            label_id = int(label_id)
+            label = str(label)
+            if label.upper() == "O":
+                continue
+
+            # Same convention as the pipeline: labels without a prefix continue a group
+            if label.startswith("B-"):
+                prefix, type_name = TAG_BEGIN, label[2:]
+            elif label.startswith("I-"):
+                prefix, type_name = TAG_INSIDE, label[2:]
+            else:
+                prefix, type_name = TAG_INSIDE, label
+
+            if type_name not in type_names:
+                type_names.append(type_name)
+            self.label_prefix[label_id] = prefix
+            self.label_type[label_id] = type_names.index(type_name)
+
+        self.type_names = np.array(type_names, dtype=object)
+
+    def _forward(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Run tokenizer and model on a batch
+
+        Returns:
+            (probabilities [B, T, L], offsets [B, T, 2], valid token mask [B, T])
+        """
+        encoding = self.tokenizer(
+            texts,
+            return_offsets_mapping=True,
+            return_special_tokens_mask=True,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="pt"
+        )
+        offsets = encoding.pop("offset_mapping").numpy()
+        special = encoding.pop("special_tokens_mask").numpy().astype(bool)
+        attention = encoding["attention_mask"].numpy().astype(bool)
+
+        with torch.no_grad():
+            logits = self.model(**encoding.to(self.device)).logits
+        logits = logits.float().cpu().numpy()
+
+        # Numerically stable softmax over the label axis
+        logits -= logits.max(axis=-1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=-1, keepdims=True)
+
+        valid = attention & ~special & (offsets[:, :, 1] > offsets[:, :, 0])
+        return probs, offsets, valid
+
+    def _group_spans(self, probs: np.ndarray, offsets: np.ndarray,
+                     valid: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Group token predictions of one sequence into entity spans ("simple" aggregation)
+
+        Returns:
+            (starts, ends, labels, scores) arrays
+        """
+        token_idx = np.flatnonzero(valid)
+        if token_idx.size == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0, dtype=object), np.zeros(0, dtype=np.float32)
+
+        label_ids = probs[token_idx].argmax(axis=-1)
+        token_scores = probs[token_idx, label_ids]
+        prefix = self.label_prefix[label_ids]
+        types = self.label_type[label_ids]
+
+        # A group starts on every B- tag and whenever the entity type changes
+        new_group = np.ones(token_idx.size, dtype=bool)
+        new_group[1:] = (prefix[1:] == TAG_BEGIN) | (types[1:] != types[:-1])
+
+        group_ids = np.cumsum(new_group) - 1
+        first = np.flatnonzero(new_group)
+        last = np.append(first[1:] - 1, token_idx.size - 1)
+
+        scores = np.bincount(group_ids, weights=token_scores) / np.bincount(group_ids)
+        group_types = types[first]
+        keep = group_types >= 0
+
+        starts = offsets[token_idx[first[keep]], 0].astype(np.int64)
+        ends = offsets[token_idx[last[keep]], 1].astype(np.int64)
+        labels = self.type_names[group_types[keep]]
+        return starts, ends, labels, scores[keep].astype(np.float32)
+
+    def decode_batch(self, texts: List[str]) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Decode entity spans for a list of texts
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            One (starts, ends, labels, scores) tuple of arrays per text
+        """
+        results = []
+        for batch_start in range(0, len(texts), self.batch_size):
+            batch = texts[batch_start:batch_start + self.batch_size]
+            probs, offsets, valid = self._forward(batch)
+            for i in range(len(batch)):
+                results.append(self._group_spans(probs[i], offsets[i], valid[i]))
+        return results
+
+    def predict(self, texts: List[str]) -> List[List[Dict]]:
+        """
+        Decode entity spans in the pipeline's output format
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            One list of {'entity_group', 'score', 'word', 'start', 'end'} dicts per text
+        """
+        outputs = []
+        for text, (starts, ends, labels, scores) in zip(texts, self.decode_batch(texts)):
+            outputs.append([
+                {
+                    'entity_group': str(label),
+                    'score': float(score),
+                    'word': text[start:end],
+                    'start': int(start),
+                    'end': int(end)
+                }
+                for start, end, label, score in zip(starts.tolist(), ends.tolist(), labels, scores)
+            ])
+        return outputs
+
+
+class NERRunner:
+    """Run NER over text chunks with the fast decoder, falling back to the pipeline"""
+
+    def __init__(self, ner_pipeline, fast_decoder: Optional[FastNERDecoder] = None, chunk_cache=None):
+        """
+        Initialize NERRunner
+
+        Args:
+            ner_pipeline: transformers NER pipeline (aggregation_strategy="simple")
+            fast_decoder: Optional FastNERDecoder sharing the pipeline's model
+            chunk_cache: Optional ChunkResultCache consulted before inference
+        """
+        self.logger = logger
+        self.ner_pipeline = ner_pipeline
+        self.fast_decoder = fast_decoder
+        self.chunk_cache = chunk_cache
+
+    def run(self, texts: List[str]) -> List[List[Dict]]:
+        """
+        Run NER on chunk texts, reusing cached results for repeated chunks
+
+        Args:
+            texts: Chunk texts
+
+        Returns:
+            Pipeline-style results per chunk (empty list for failed chunks)
+        """
+        if self.chunk_cache is None:
+            return [chunk_results or [] for chunk_results in self._infer(texts)]
+
+        results: List[Optional[List[Dict]]] = [self.chunk_cache.get(text) for text in texts]
+        missing = [i for i, result in enumerate(results) if result is None]
+
+        # Identical chunks within one document are inferred once
+        unique_missing = list(dict.fromkeys(texts[i] for i in missing))
+        inferred = dict(zip(unique_missing, self._infer(unique_missing)))
+
+        for text, chunk_results in inferred.items():
+            # Failed chunks are not cached
+            if chunk_results is not None:
+                self.chunk_cache.put(text, chunk_results)
+
+        for i in missing:
+            results[i] = inferred[texts[i]] or []
+
+        return results
+
+    def _infer(self, texts: List[str]) -> List[Optional[List[Dict]]]:
+        """Run the model on chunk texts (None for chunks that failed)"""
+        if not texts:
+            return []
+
+        if self.fast_decoder is not None:
+            try:
+                return self.fast_decoder.predict(texts)
+            except Exception as e:
+                self.logger.warning(f"Fast NER decoding failed, falling back to pipeline: {e}")
+
+        results = []
+        for i, text in enumerate(texts):
+            try:
+                results.append(self.ner_pipeline(text))
+            except Exception as e:
+                self.logger.warning(f"Chunk {i} processing error: {e}")
+                results.append(None)
+        return results
@@ -0,0 +1,251 @@
+"""
+PDF Pipeline Module - Streaming extract -> NER -> allocate -> redact stage executor
+"""
+import queue
+import logging
+import threading
+import fitz  # PyMuPDF
+from typing import Callable, Dict, List, Optional, Tuple
+from pdf.save import PDFSaver
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's output
+_END = object()
+
+
+class _PipelineCancelled(Exception):
+    """Raised inside stages when another stage has failed"""
+
+
+class OrderedAllocator:
+    """Allocate replacements page by page in document order with consistent mappings"""
+
+    def __init__(self, allocate_fn: Callable[[List[Dict]], List[Dict]]):
+        """
+        Initialize OrderedAllocator
+
+        Args:
+            allocate_fn: Callable that sets 'replacement' on a list of entities
+        """
+        self.allocate_fn = allocate_fn
+        self.mappings: Dict[Tuple[str, str], str] = {}
+
+    def allocate(self, entities: List[Dict]) -> List[Dict]:
+        """
+        Allocate replacements, reusing earlier pages' replacement for the same original
+
+        Args:
+            entities: Entities of one page
+
+        Returns:
+            Entities with 'replacement' set
+        """
+        def key(entity):
+            return entity.get('entity', ''), (entity.get('word') or '').strip()
+
+        new_entities, seen = [], set()
+        for entity in entities:
+            entity_key = key(entity)
+            if entity_key not in self.mappings and entity_key not in seen:
+                seen.add(entity_key)
+                new_entities.append(entity)
+
+        if new_entities:
+            for entity in self.allocate_fn(new_entities):
+                self.mappings[key(entity)] = entity.get('replacement', entity.get('word', ''))
+
+        for entity in entities:
+            entity['replacement'] = self.mappings.get(key(entity), entity.get('word', ''))
+        return entities
+
+
+class StreamingPipeline:
+    """Overlap extraction, NER and redaction of consecutive pages with bounded queues"""
+
+    def __init__(self, extractor, detect_fn: Callable, allocate_fn: Callable, apply_fn: Callable,
+                 queue_size: int = 4, saver: Optional[PDFSaver] = None):
+        """
+        Initialize StreamingPipeline
+
+        Args:
+            extractor: PDFExtractor instance
+            detect_fn: Callable (page_text, page_blocks) -> entities with text_block_info
+            allocate_fn: Callable (entities) -> entities with 'replacement' (called in page order)
+            apply_fn: Callable (page, entities) -> number of applied changes
+            queue_size: Maximum pages buffered between two stages
+            saver: PDFSaver for the output (default profile if None)
+        """
+        self.logger = logger
+        self.extractor = extractor
+        self.detect_fn = detect_fn
+        self.allocator = OrderedAllocator(allocate_fn)
+        self.apply_fn = apply_fn
+        self.queue_size = queue_size
+        self.saver = saver or PDFSaver()
+
+        # MuPDF is not thread-safe: extraction and redaction never touch it concurrently,
+        # the overlap comes from model inference running while they work
+        self._mupdf_lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._errors: List[BaseException] = []
+        self._image_only_pages: List[int] = []
+
+    def _put(self, q: queue.Queue, item) -> None:
+        """Put with cancellation checks so a failed stage cannot block the others"""
+        while True:
+            if self._cancel.is_set():
+                raise _PipelineCancelled()
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, q: queue.Queue):
+        """Get with cancellation checks"""
+        while True:
+            if self._cancel.is_set():
+                raise _PipelineCancelled()
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+    def _run_stage(self, target: Callable, *args) -> None:
+        """Thread body: record failures and cancel the pipeline"""
+        try:
+            target(*args)
+        except _PipelineCancelled:
+            pass
+        except BaseException as e:
+            self._errors.append(e)
+            self._cancel.set()
+
+    def _extract_stage(self, input_path: str, out_q: queue.Queue) -> None:
+        """Extract spans page by page with page-local offsets"""
+        with self._mupdf_lock:
+            doc = fitz.open(input_path)
+        try:
+            for page_num in range(len(doc)):
+                with self._mupdf_lock:
+                    spans = self.extractor._extract_table(doc, page_num, page_num + 1)
+                # Scanned pages have no spans, so NER and redaction skip them
+                self._image_only_pages.extend(spans.image_only_pages)
+                self._put(out_q, (page_num, spans))
+        finally:
+            with self._mupdf_lock:
+                doc.close()
+            self._put(out_q, _END)
+
+    def _ner_stage(self, in_q: queue.Queue, out_q: queue.Queue) -> None:
+        """Run detection on each page's text"""
+        while True:
+            item = self._get(in_q)
+            if item is _END:
+                self._put(out_q, _END)
+                return
+
+            page_num, spans = item
+            entities = []
+            if len(spans):
+                entities = self.detect_fn(spans.full_text, spans)
+            self._put(out_q, (page_num, entities))
+
+    def _allocate_stage(self, in_q: queue.Queue, out_q: queue.Queue) -> None:
+        """Allocate replacements strictly in page order (reorder buffer for out-of-order input)"""
+        pending: Dict[int, List[Dict]] = {}
+        next_page = 0
+        while True:
+            item = self._get(in_q)
+            if item is _END:
+                for page_num in sorted(pending):
+                    self._put(out_q, (page_num, self.allocator.allocate(pending[page_num])))
+                self._put(out_q, _END)
+                return
+
+            page_num, entities = item
+            pending[page_num] = entities
+            while next_page in pending:
+                self._put(out_q, (next_page, self.allocator.allocate(pending.pop(next_page))))
+                next_page += 1
+
+    def run(self, input_path: str, output_path: str, progress_callback=None) -> Dict:
+        """
+        Run the pipeline on a PDF
+
+        Args:
+            input_path: Input PDF path
+            output_path: Output PDF path
+            progress_callback: Progress callback function
+
+        Returns:
+            Dict with 'pages', 'entities', 'changes', the processed 'entity_list', 'save' stats
+            and 'image_only_pages' (scans without text layer, for OCR)
+        """
+        self._cancel.clear()
+        self._errors = []
+        self._image_only_pages = []
+
+        extracted_q = queue.Queue(maxsize=self.queue_size)
+        detected_q = queue.Queue(maxsize=self.queue_size)
+        allocated_q = queue.Queue(maxsize=self.queue_size)
+
+        threads = [
+            threading.Thread(target=self._run_stage, args=(self._extract_stage, input_path, extracted_q),
+                             name="pipeline-extract", daemon=True),
+            threading.Thread(target=self._run_stage, args=(self._ner_stage, extracted_q, detected_q),
+                             name="pipeline-ner", daemon=True),
+            threading.Thread(target=self._run_stage, args=(self._allocate_stage, detected_q, allocated_q),
+                             name="pipeline-allocate", daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+
+        stats = {'pages': 0, 'entities': 0, 'changes': 0, 'entity_list': [], 'save': None,
+                 'image_only_pages': self._image_only_pages}
+
+        with self._mupdf_lock:
+            doc = fitz.open(input_path)
+            page_count = len(doc)
+
+        try:
+            # Redaction stage runs on the calling thread
+            while True:
+                try:
+                    item = self._get(allocated_q)
+                except _PipelineCancelled:
+                    break
+                if item is _END:
+                    break
+
+                page_num, entities = item
+                stats['pages'] += 1
+                if entities:
+                    with self._mupdf_lock:
+                        stats['changes'] += self.apply_fn(doc.load_page(page_num), entities)
+                    stats['entities'] += len(entities)
+                    stats['entity_list'].extend(entities)
+
+                if progress_callback:
+                    progress_callback(0.1 + (stats['pages'] / max(page_count, 1)) * 0.8,
+                                      desc=f"Pipeline: page {stats['pages']}/{page_count}...")
+        except BaseException:
+            self._cancel.set()
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+
+        try:
+            if self._errors:
+                raise self._errors[0]
+
+            with self._mupdf_lock:
+                stats['save'] = self.saver.save(doc, output_path, self.saver.resolve_profile(secure=True))
+        finally:
+            doc.close()
+
+        self.logger.info(f"Streaming pipeline: {stats['pages']} pages, {stats['entities']} entities, "
+                         f"{stats['changes']} changes applied")
+        return stats
@@ -0,0 +1,160 @@
+"""
+PDF Preview Module - Detect-only entity geometry and page thumbnails for review
+"""
+import logging
+import fitz  # PyMuPDF
+import numpy as np
+from collections import defaultdict
+from typing import Dict, List, Tuple
+from pdf.sharding import PDFSharder
+
+logger = logging.getLogger(__name__)
+
+
+class PDFPreviewer:
+    """Locate detected entities on their pages and render low-resolution review thumbnails"""
+
+    def __init__(self, thumbnail_dpi: int = 36, max_thumbnails: int = 100,
+                 outline_color: Tuple[int, int, int] = (220, 0, 0)):
+        """
+        Initialize PDFPreviewer
+
+        Args:
+            thumbnail_dpi: Resolution of the page thumbnails
+            max_thumbnails: Maximum number of pages rendered (pages with entities first)
+            outline_color: RGB colour of the entity outlines drawn on thumbnails
+        """
+        self.logger = logger
+        self.thumbnail_dpi = thumbnail_dpi
+        self.max_thumbnails = max_thumbnails
+        self.outline_color = outline_color
+
+    def locate_entities(self, doc, entities: List[Dict], extractor) -> int:
+        """
+        Locate every entity and store its rectangles in text_block_info['rects']
+
+        Entities crossing a page break keep the rectangles of their later pages
+        in text_block_info['continued_rects'] (page -> rects). The stored
+        rectangles are reused by the extractor when the same document is
+        redacted later, so apply does not search the pages again.
+
+        Args:
+            doc: Open fitz.Document the entities were detected in (unmodified)
+            entities: Selected entities with text_block_info
+            extractor: PDFExtractor instance
+
+        Returns:
+            Number of entities that could be located
+        """
+        by_page = defaultdict(list)
+        for entity in entities:
+            info = entity.get('text_block_info')
+            if isinstance(info, dict):
+                info.pop('rects', None)
+                info.pop('continued_rects', None)
+                for page_num in PDFSharder.entity_pages(entity):
+                    by_page[page_num].append(entity)
+
+        located = 0
+        try:
+            for page_num in sorted(by_page):
+                if not 0 <= page_num < len(doc):
+                    continue
+                page = doc.load_page(page_num)
+                for entity in by_page[page_num]:
+                    info = entity['text_block_info']
+                    rects = [tuple(rect) for rect in extractor.locate_entity_rects(page, entity)]
+                    if page_num == info.get('page', 0):
+                        info['rects'] = rects
+                        located += 1 if rects else 0
+                    else:
+                        info.setdefault('continued_rects', {})[page_num] = rects
+        except Exception as e:
+            self.logger.error(f"Preview location error: {e}")
+        finally:
+            # The document is closed after the preview; its page indexes must not be reused
+            extractor.text_index_cache.clear()
+        return located
+
+    def entity_records(self, entities: List[Dict]) -> List[Dict]:
+        """
+        JSON-friendly description of located entities
+
+        Args:
+            entities: Entities after locate_entities
+
+        Returns:
+            List of dicts with 'id', 'entity', 'word', 'score', 'method', 'page' and 'rects'
+            ('continued_rects' by page as well for entities crossing a page break)
+        """
+        records = []
+        for index, entity in enumerate(entities):
+            info = entity.get('text_block_info') or {}
+            record = {
+                'id': index,
+                'entity': entity.get('entity'),
+                'word': entity.get('word'),
+                'score': round(float(entity.get('score', 0.0)), 4),
+                'method': entity.get('method'),
+                'page': info.get('page', 0),
+                'rects': self._round_rects(info.get('rects'))
+            }
+            if info.get('continued_rects'):
+                record['continued_rects'] = {str(page_num): self._round_rects(rects)
+                                             for page_num, rects in info['continued_rects'].items()}
+            records.append(record)
+        return records
+
+    @staticmethod
+    def _round_rects(rects) -> List[List[float]]:
+        """Rectangles as JSON-friendly lists rounded to 0.01 pt"""
+        return [[round(float(value), 2) for value in rect] for rect in rects or []]
+
+    def render_thumbnails(self, doc, entities: List[Dict]) -> List[Tuple[np.ndarray, str]]:
+        """
+        Render pages with entities at low resolution, entity rectangles outlined
+
+        Args:
+            doc: Open fitz.Document
+            entities: Entities after locate_entities
+
+        Returns:
+            List of (RGB image array, caption) in page order
+        """
+        rects_by_page = defaultdict(list)
+        for entity in entities:
+            info = entity.get('text_block_info') or {}
+            rects_by_page[info.get('page', 0)].extend(info.get('rects') or [])
+            for page_num, rects in (info.get('continued_rects') or {}).items():
+                rects_by_page[page_num].extend(rects)
+
+        thumbnails = []
+        zoom = self.thumbnail_dpi / 72.0
+        for page_num in sorted(rects_by_page)[:self.max_thumbnails]:
+            try:
+                page = doc.load_page(page_num)
+                matrix = page.rotation_matrix * fitz.Matrix(zoom, zoom)
+                pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False, colorspace=fitz.csRGB)
+                image = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n).copy()
+                for rect in rects_by_page[page_num]:
+                    self._outline(image, fitz.Rect(rect) * matrix)
+                count = len(rects_by_page[page_num])
+                thumbnails.append((image, f"Page {page_num + 1}: {count} areas"))
+            except Exception as e:
+                self.logger.error(f"Thumbnail error on page {page_num + 1}: {e}")
+
+        if len(rects_by_page) > self.max_thumbnails:
+            self.logger.info(f"Preview limited to {self.max_thumbnails} of {len(rects_by_page)} pages")
+        return thumbnails
+
+    def _outline(self, image: np.ndarray, rect: fitz.Rect) -> None:
+        """Draw a one-pixel rectangle outline into an image array"""
+        height, width = image.shape[:2]
+        x0 = min(max(int(rect.x0), 0), width - 1)
+        y0 = min(max(int(rect.y0), 0), height - 1)
+        x1 = min(max(int(np.ceil(rect.x1)), x0 + 1), width)
+        y1 = min(max(int(np.ceil(rect.y1)), y0 + 1), height)
+        image[y0, x0:x1] = self.outline_color
+        image[y1 - 1, x0:x1] = self.outline_color
+        image[y0:y1, x0] = self.outline_color
+        image[y0:y1, x1 - 1] = self.outline_color
@@ -0,0 +1,129 @@
+"""
+Entity Propagation Module - Tag every occurrence of already detected entities
+"""
+import bisect
+import logging
+from typing import Dict, List, Set, Tuple
+
+from pdf.gazetteer import AhoCorasickAutomaton, is_word_boundary, normalize_term, normalize_with_offsets
+
+logger = logging.getLogger(__name__)
+
+
+class EntityPropagator:
+    """Propagate accepted entities to all remaining occurrences in a document"""
+
+    def __init__(self, min_length: int = 3):
+        """
+        Initialize EntityPropagator
+
+        Args:
+            min_length: Surface forms shorter than this (normalized) are not propagated
+        """
+        self.logger = logger
+        self.min_length = min_length
+
+    @staticmethod
+    def is_case_sensitive(entity: Dict) -> bool:
+        """
+        Whether an entity only propagates to occurrences with the same casing
+
+        Uses the entity's 'case_sensitive' flag (set by the gazetteer for short
+        and single-word terms); without it, single words are case-sensitive,
+        since lowercase forms of names ("Eti" / "eti") are often ordinary words.
+        """
+        flag = entity.get('case_sensitive')
+        if flag is not None:
+            return bool(flag)
+        return ' ' not in (entity.get('word') or '').strip()
+
+    def _build_automaton(self, entities: List[Dict]) -> AhoCorasickAutomaton:
+        """
+        Compile accepted entity surface forms, keeping the best-scored source per form
+
+        The payload is (source entity, accepted surface forms or None); the
+        surface forms are set for case-sensitive forms only.
+        """
+        sources: Dict[str, Dict] = {}
+        surfaces: Dict[str, Set[str]] = {}
+        case_sensitive: Dict[str, bool] = {}
+        for entity in entities:
+            word = (entity.get('word') or '').strip()
+            normalized = normalize_term(word)
+            if len(normalized) < self.min_length:
+                continue
+            existing = sources.get(normalized)
+            if existing is None or entity.get('score', 0) > existing.get('score', 0):
+                sources[normalized] = entity
+            surfaces.setdefault(normalized, set()).add(word)
+            # One case-insensitive source (e.g. a model hit) lifts the restriction
+            case_sensitive[normalized] = case_sensitive.get(normalized, True) and self.is_case_sensitive(entity)
+
+        automaton = AhoCorasickAutomaton()
+        for normalized, entity in sources.items():
+            automaton.add(normalized, (entity, surfaces[normalized] if case_sensitive[normalized] else None))
+        automaton.build()
+        return automaton
+
+    def propagate(self, text: str, entities: List[Dict]) -> List[Dict]:
+        """
+        Find uncovered occurrences of accepted entities
+
+        Args:
+            text: Full text the entities were detected in
+            entities: Accepted, non-overlapping entities (after thresholding and merging)
+
+        Returns:
+            New entities tagged with method 'propagated' (existing ones are not included)
+        """
+        if not text or not entities:
+            return []
+
+        automaton = self._build_automaton(entities)
+        if not len(automaton):
+            return []
+
+        normalized, offsets = normalize_with_offsets(text)
+
+        candidates: List[Tuple[int, int, Dict]] = []
+        for n_start, n_end, (source, surfaces) in automaton.iter_matches(normalized):
+            if not is_word_boundary(normalized, n_start, n_end):
+                continue
+            start, end = offsets[n_start], offsets[n_end - 1] + 1
+            # Case-sensitive forms: an accepted spelling, or the same word in capitals
+            if surfaces is not None:
+                word = text[start:end]
+                if word not in surfaces and not word.isupper():
+                    continue
+            candidates.append((start, end, source))
+
+        # Longest occurrences first so "Ahmet Yılmaz" wins over a nested "Ahmet"
+        candidates.sort(key=lambda c: (-(c[1] - c[0]), c[0]))
+
+        # Accepted entities are merged, so covered intervals are disjoint and
+        # only the closest interval starting before `end` can overlap
+        covered = sorted((e['start'], e['end']) for e in entities)
+        covered_starts = [s for s, _ in covered]
+        covered_ends = [e for _, e in covered]
+        propagated = []
+
+        for start, end, source in candidates:
+            idx = bisect.bisect_left(covered_starts, end)
+            if idx > 0 and covered_ends[idx - 1] > start:
+                continue
+
+            propagated.append({
+                'entity': source.get('entity'),
+                'word': text[start:end],
+                'start': start,
+                'end': end,
+                'score': source.get('score', 0),
+                'method': 'propagated',
+                'case_sensitive': self.is_case_sensitive(source)
+            })
+            covered_starts.insert(idx, start)
+            covered_ends.insert(idx, end)
+
+        propagated.sort(key=lambda e: e['start'])
+        self.logger.info(f"Entity propagation: {len(propagated)} additional occurrences tagged")
+        return propagated
@@ -4,16 +4,219 @@ PDF Redaction Module - Real deletion/censoring operations
 import fitz  # PyMuPDF
 import logging
 import numpy as np
-from typing import List, Dict
+from functools import partial
+from typing import List, Dict, Optional, Tuple
+from pdf.geometry import coalesce_rects
+from pdf.save import PDFSaver
+from pdf.sharding import PDFSharder
+from pdf.utils import document_token
 
 logger = logging.getLogger(__name__)
 
+
+def _redact_page_range_worker(source, start_page: int, end_page: int,
+                              entities_by_page: Dict[int, List[Dict]],
+                              redactor_config: Optional[Dict] = None,
+                              extractor_config: Optional[Dict] = None) -> Tuple[bytes, int, Dict[int, List[int]]]:
+    """Process pool entry point: redact entities of a page range on a private document copy"""
+    from pdf.extractor import PDFExtractor
+
+    # Built from the parent's settings (see get_config)
+    redactor = PDFRedactor(**(redactor_config or {}))
+    extractor = PDFExtractor(**(extractor_config or {}))
+    return PDFSharder.process_page_range(
+        source, start_page, end_page, entities_by_page,
+        lambda page, page_entities: redactor.redact_page_entities(page, page_entities, extractor)
+    )
+
+
+class PageRasterCache:
+    """Render-once, low-DPI page rasters for background color sampling"""
+
+    def __init__(self, dpi: int = 72):
+        """
+        Initialize PageRasterCache
+
+        Args:
+            dpi: Render resolution (72 matches the previous per-rect clip rendering)
+        """
+        self.dpi = dpi
+        self._rasters: Dict[Tuple[int, int], Tuple[np.ndarray, fitz.Matrix]] = {}
+
+    def get(self, page) -> Tuple[np.ndarray, fitz.Matrix]:
+        """
+        Get (and render on first use) the RGB raster of a page
+
+        Args:
+            page: PDF page object
+
+        Returns:
+            (RGB array of shape (H, W, 3), matrix from page coordinates to raster pixels)
+        """
+        key = (document_token(page.parent), page.number)
+        cached = self._rasters.get(key)
+        if cached is not None:
+            return cached
+
+        scale = fitz.Matrix(self.dpi / 72.0, self.dpi / 72.0)
+        pm = page.get_pixmap(matrix=scale, alpha=False)
+        arr = np.frombuffer(pm.samples, dtype=np.uint8).reshape(pm.height, pm.width, pm.n)
+        rgb = arr[:, :, :3] if pm.n >= 3 else np.repeat(arr[:, :, :1], 3, axis=2)
+
+        cached = (rgb, page.rotation_matrix * scale)
+        self._rasters[key] = cached
+        return cached
+
+    def discard(self, page) -> None:
+        """Drop the raster of a page once its processing is finished"""
+        self._rasters.pop((document_token(page.parent), page.number), None)
+
+    def clear(self) -> None:
+        """Drop all rasters"""
+        self._rasters.clear()
+
+
 class PDFRedactor:
     """PDF redaction operations - real deletion and censoring"""
     
-    def __init__(self):
+    def __init__(self, shard_min_pages: int = 32, raster_dpi: int = 72, save_profile: str = 'balanced',
+                 coalesce_gap: float = 0.5):
+        """
+        Initialize PDFRedactor
+
+        Args:
+            shard_min_pages: Number of affected pages from which redaction is sharded across processes
+            raster_dpi: Resolution of the page raster used for background color sampling
+            save_profile: Save profile for output documents (see pdf.save.SAVE_PROFILES)
+            coalesce_gap: Largest gap (points) between same-line rects merged into one annotation
+        """
         self.logger = logger
+        self.shard_min_pages = shard_min_pages
+        self.coalesce_gap = coalesce_gap
+        self.raster_cache = PageRasterCache(raster_dpi)
+        self.saver = PDFSaver(save_profile)
+        self.last_save_stats: Optional[Dict] = None
+
+    def get_config(self) -> Dict:
+        """Constructor arguments reproducing this redactor's settings (e.g. in worker processes)"""
+        return {
+            'shard_min_pages': self.shard_min_pages,
+            'raster_dpi': self.raster_cache.dpi,
+            'save_profile': self.saver.default_profile,
+            'coalesce_gap': self.coalesce_gap
+        }
     
+    def _pixel_boxes(self, boxes: np.ndarray, to_pixels, pad: float, shape: Tuple[int, int]) -> np.ndarray:
+        """
+        Padded rectangles as integer raster boxes
+
+        Args:
+            boxes: Rectangles in page coordinates, shape (n, 4)
+            to_pixels: Matrix from page coordinates to raster pixels
+            pad: Padding added on every side (page units)
+            shape: Raster (height, width)
+
+        Returns:
+            Array (n, 4) of x0, y0, x1, y1 pixel bounds, clipped to the raster
+        """
+        boxes = boxes + np.array([-pad, -pad, pad, pad])
+
+        # Transform all four corners, so rotated pages map correctly
+        xs, ys = boxes[:, [0, 2, 0, 2]], boxes[:, [1, 1, 3, 3]]
+        px = to_pixels.a * xs + to_pixels.c * ys + to_pixels.e
+        py = to_pixels.b * xs + to_pixels.d * ys + to_pixels.f
+
+        h, w = shape
+        x0 = np.clip(np.floor(px.min(axis=1)), 0, w)
+        y0 = np.clip(np.floor(py.min(axis=1)), 0, h)
+        x1 = np.clip(np.ceil(px.max(axis=1)), x0, w)
+        y1 = np.clip(np.ceil(py.max(axis=1)), y0, h)
+        return np.column_stack((x0, y0, x1, y1)).astype(np.int64)
+
+    def sample_background_colors(self, page, rects: List[fitz.Rect], margin=1.5, ring=4) -> List[tuple]:
+        """
+        Sample the background color around every rectangle of a page at once
+
+        Ring pixels of all rectangles are gathered from the page raster in one
+        pass; dark (text) pixels are dropped where enough light ones remain and
+        the per-rectangle medians come from one grouped histogram per channel.
+
+        Args:
+            page: PDF page object
+            rects: Rectangles to sample around
+            margin: Inner margin
+            ring: Outer ring width
+
+        Returns:
+            RGB color tuples (0-1 range), one per rectangle
+        """
+        default = (0.96, 0.96, 0.96)
+        if not rects:
+            return []
+
+        try:
+            rgb, to_pixels = self.raster_cache.get(page)
+            count = len(rects)
+            boxes = np.array([tuple(rect) for rect in rects], dtype=np.float64).reshape(-1, 4)
+            outer = self._pixel_boxes(boxes, to_pixels, margin + ring, rgb.shape[:2])
+            inner = self._pixel_boxes(boxes, to_pixels, margin, rgb.shape[:2])
+
+            # One entry per raster row of every outer box
+            heights = outer[:, 3] - outer[:, 1]
+            row_group = np.repeat(np.arange(count), heights)
+            row_y = outer[row_group, 1] + np.arange(len(row_group)) - np.repeat(np.cumsum(heights) - heights, heights)
+            ox0, ox1 = outer[row_group, 0], outer[row_group, 2]
+
+            # Each row is a left run [ox0, cut_start) and a right run [cut_end, ox1) around the inner box
+            in_inner = (row_y >= inner[row_group, 1]) & (row_y < inner[row_group, 3])
+            cut_start = np.where(in_inner, np.clip(inner[row_group, 0], ox0, ox1), ox1)
+            cut_end = np.where(in_inner, np.clip(inner[row_group, 2], cut_start, ox1), ox1)
+
+            # Rectangles whose ring is clipped away sample their whole box
+            ring_sizes = np.bincount(row_group, weights=(cut_start - ox0) + (ox1 - cut_end), minlength=count)
+            no_ring = (ring_sizes == 0)[row_group]
+            cut_start[no_ring] = ox1[no_ring]
+            cut_end[no_ring] = ox1[no_ring]
+
+            # Expand runs into flat raster indices
+            width = rgb.shape[1]
+            run_starts = np.concatenate((row_y * width + ox0, row_y * width + cut_end))
+            run_lengths = np.concatenate((cut_start - ox0, ox1 - cut_end))
+            group = np.concatenate((row_group, row_group)).repeat(run_lengths)
+            total = int(run_lengths.sum())
+            if total == 0:
+                return [default] * count
+            flat = np.repeat(run_starts - (np.cumsum(run_lengths) - run_lengths), run_lengths) + np.arange(total)
+            samples = rgb.reshape(-1, 3)[flat]
+
+            # Filter very dark pixels where at least 50 light ones remain
+            lum = samples @ np.array([0.2126, 0.7152, 0.0722], dtype=np.float32)
+            light = lum > 60
+            light_counts = np.bincount(group, weights=light, minlength=count)
+            use = light | (light_counts[group] < 50)
+            group, samples = group[use], samples[use]
+
+            counts = np.bincount(group, minlength=count)
+            if not counts.any():
+                return [default] * count
+
+            # Medians from per-rectangle 256-bin histograms (pixels are 8 bit)
+            lower_rank = ((counts - 1) // 2)[:, None]
+            upper_rank = (counts // 2)[:, None]
+            medians = np.empty((count, 3))
+            for channel in range(3):
+                histogram = np.bincount(group * 256 + samples[:, channel], minlength=count * 256)
+                cumulative = histogram.reshape(count, 256).cumsum(axis=1)
+                lower = (cumulative <= lower_rank).sum(axis=1)
+                upper = (cumulative <= upper_rank).sum(axis=1)
+                medians[:, channel] = (lower + upper) / 2
+
+            colors = medians / 255.0
+            return [tuple(float(v) for v in color) if n else default for color, n in zip(colors, counts)]
+        except Exception as e:
+            self.logger.debug(f"Background sampling error: {e}")
+            return [default] * len(rects)
+
     def sample_background_color(self, page, rect, margin=1.5, ring=4) -> tuple:
         """
         Sample background color around rectangle
@@ -27,42 +230,104 @@ class PDFRedactor:
         Returns:
             RGB color tuple (0-1 range)
         """
-        try:
-            r = fitz.Rect(rect)
-            outer = fitz.Rect(r).inflate(margin + ring)
-            inner = fitz.Rect(r).inflate(margin)
-
-            pm = page.get_pixmap(clip=outer, alpha=False)
-            w, h, n = pm.width, pm.height, pm.n
-
-            arr = np.frombuffer(pm.samples, dtype=np.uint8).reshape(h, w, n)
-            rgb = arr[:, :, :3] if n >= 3 else np.repeat(arr, 3, axis=2)
-
-            sx = w / max(outer.width, 1e-6)
-            sy = h / max(outer.height, 1e-6)
-            ix0 = max(0, min(w, int((inner.x0 - outer.x0) * sx)))
-            iy0 = max(0, min(h, int((inner.y0 - outer.y0) * sy)))
-            ix1 = max(0, min(w, int((inner.x1 - outer.x1) * sx)))
-            iy1 = max(0, min(h, int((inner.y1 - outer.y0) * sy)))
-
-            mask = np.ones((h, w), dtype=bool)
-            mask[iy0:iy1, ix0:ix1] = False
-
-            samples = rgb[mask]
-            if samples.size == 0:
-                samples = rgb.reshape(-1, 3)
-
-            # Filter very dark pixels
-            lum = 0.2126 * samples[:, 0] + 0.7152 * samples[:, 1] + 0.0722 * samples[:, 2]
-            use = lum > 60
-            if np.sum(use) >= 50:
-                samples = samples[use]
-
-            med = np.median(samples, axis=0)
-            return (float(med[0] / 255.0), float(med[1] / 255.0), float(med[2] / 255.0))
-        except Exception:
-            return (0.96, 0.96, 0.96)
+        return self.sample_background_colors(page, [rect], margin, ring)[0]
     
+    def add_redaction_annots(self, page, rects: List[fitz.Rect],
+                             background_color: tuple = None) -> bool:
+        """
+        Add redaction annotations without applying them
+
+        Args:
+            page: PDF page object
+            rects: List of rectangles to redact
+            background_color: Background color (auto-sampled if None)
+
+        Returns:
+            True if annotations were added
+        """
+        return self.add_page_redaction_annots(page, [rects], background_color) > 0
+
+    def page_fills(self, page, rect_groups: List[List[fitz.Rect]],
+                   background_color: tuple = None) -> List[Tuple[fitz.Rect, tuple]]:
+        """
+        Areas to cover on a page, each with its fill color
+
+        Every rectangle gets the background color sampled around it (one batched
+        pass over the page raster); rectangles sharing a fill color are coalesced
+        (same line, overlapping or touching).
+
+        Args:
+            page: PDF page object
+            rect_groups: Rectangles of each entity
+            background_color: Background color for all entities (auto-sampled if None)
+
+        Returns:
+            List of (rectangle, fill color)
+        """
+        rects = [rect for group in rect_groups if group for rect in group]
+        if not rects:
+            return []
+
+        if background_color is None:
+            colors = self.sample_background_colors(page, rects)
+        else:
+            colors = [tuple(background_color)] * len(rects)
+
+        rects_by_color: Dict[tuple, List[fitz.Rect]] = {}
+        for rect, color in zip(rects, colors):
+            rects_by_color.setdefault(color, []).append(rect)
+
+        return [(rect, color) for color, rects in rects_by_color.items()
+                for rect in coalesce_rects(rects, self.coalesce_gap)]
+
+    def add_page_redaction_annots(self, page, rect_groups: List[List[fitz.Rect]],
+                                  background_color: tuple = None) -> int:
+        """
+        Add redaction annotations for several entities of a page at once
+
+        Coalesced areas (see page_fills) keep the number of annotations that
+        apply_redactions has to process low.
+
+        Args:
+            page: PDF page object
+            rect_groups: Rectangles of each entity
+            background_color: Background color for all entities (auto-sampled if None)
+
+        Returns:
+            Number of annotations added
+        """
+        fills = self.page_fills(page, rect_groups, background_color)
+        for rect, color in fills:
+            page.add_redact_annot(rect, fill=color)
+        return len(fills)
+
+    def draw_page_overlays(self, page, rect_groups: List[List[fitz.Rect]],
+                           background_color: tuple = None) -> int:
+        """
+        Cover entity areas with opaque rectangles drawn on top of the page content
+
+        NOT a redaction: the original text stays in the content stream and can
+        be extracted. Only for internal review copies.
+
+        Args:
+            page: PDF page object
+            rect_groups: Rectangles of each entity
+            background_color: Background color for all entities (auto-sampled if None)
+
+        Returns:
+            Number of rectangles drawn
+        """
+        fills = self.page_fills(page, rect_groups, background_color)
+        if not fills:
+            return 0
+
+        shape = page.new_shape()
+        for rect, color in fills:
+            shape.draw_rect(rect)
+            shape.finish(color=None, fill=color, width=0)
+        shape.commit(overlay=True)
+        return len(fills)
+
     def apply_redaction_to_rects(self, page, rects: List[fitz.Rect], 
                                 background_color: tuple = None) -> bool:
         """
@@ -77,17 +342,9 @@ class PDFRedactor:
             True if successful
         """
         try:
-            if not rects:
+            if not self.add_redaction_annots(page, rects, background_color):
                 return False
             
-            # Sample background color if not provided
-            if background_color is None:
-                background_color = self.sample_background_color(page, rects[0])
-            
-            # Add redaction annotations
-            for rect in rects:
-                page.add_redact_annot(rect, fill=background_color)
-            
             # Apply redactions (permanently removes text)
             page.apply_redactions()
             return True
@@ -121,53 +378,57 @@ class PDFRedactor:
             True if successful
         """
         try:
-            original_text = (entity.get('word') or '').strip()
-            if not original_text:
-                return False
-
-            text_block_info = entity.get('text_block_info') or {}
-            bbox = text_block_info.get('bbox')
-            if not bbox:
-                return False
-
-            block_text = text_block_info.get('block_text', '')
-            rel_s = int(text_block_info.get('relative_start', 0))
-            rel_e = int(text_block_info.get('relative_end', 0))
-            block_slice = block_text[rel_s:rel_e] if (0 <= rel_s <= len(block_text) and 0 <= rel_e <= len(block_text)) else ''
-            search_text = (block_slice or original_text).strip()
-
-            # Generate candidate search queries
-            candidates = extractor._candidate_queries(search_text) or [search_text]
-
-            # Search for text quads
-            hit_quads = None
-            for q in candidates:
-                hit_quads = extractor.search_quads_near(page, q, bbox)
-                if hit_quads:
-                    break
-
-            # Fallback to character-based rectangle
-            if not hit_quads:
-                char_rect = extractor.rect_from_block_slice_chars(page, text_block_info)
-                if char_rect:
-                    rects = [char_rect]
-                else:
-                    return False
-            else:
-                rects = extractor.rects_from_hit(hit_quads)
-
+            rects = extractor.locate_entity_rects(page, entity)
             if not rects:
                 return False
 
-            # Apply redaction
-            return self.apply_redaction_to_rects(page, rects)
+            # Apply redaction (the page text changes, so its index is stale)
+            redacted = self.apply_redaction_to_rects(page, rects)
+            extractor.text_index_cache.discard(page)
+            return redacted
 
         except Exception as e:
             self.logger.error(f"Entity redaction error: {e}")
             return False
     
+    def redact_page_entities(self, page, page_entities: List[Dict], extractor) -> int:
+        """
+        Redact all entities of one page
+
+        Args:
+            page: PDF page object
+            page_entities: Entities located on this page
+            extractor: PDFExtractor instance
+
+        Returns:
+            Number of successful redactions (counted on each entity's start page)
+        """
+        redactions = 0
+
+        try:
+            # Locate everything on the unmodified page, then apply all redactions at once
+            rect_groups = []
+            for entity in page_entities:
+                try:
+                    rects = extractor.locate_entity_rects(page, entity)
+                    if rects:
+                        rect_groups.append(rects)
+                        if page.number == (entity.get('text_block_info') or {}).get('page', page.number):
+                            redactions += 1
+                except Exception as e:
+                    self.logger.error(f"Entity redaction error: {e}")
+
+            if rect_groups and self.add_page_redaction_annots(page, rect_groups):
+                page.apply_redactions()
+        finally:
+            self.raster_cache.discard(page)
+            extractor.text_index_cache.discard(page)
+
+        return redactions
+
     def process_pdf_redaction(self, input_path: str, entities: List[Dict], 
-                             output_path: str, extractor, progress_callback=None) -> bool:
+                             output_path: str, extractor, progress_callback=None,
+                             sharded: Optional[bool] = None, max_workers: Optional[int] = None) -> bool:
         """
         Process PDF with redaction (complete removal)
         
@@ -177,46 +438,55 @@ class PDFRedactor:
             output_path: Output PDF path
             extractor: PDFExtractor instance
             progress_callback: Progress callback function
+            sharded: Process page ranges in worker processes (None = only for many affected pages)
+            max_workers: Number of worker processes for sharded mode
             
         Returns:
             True if successful
         """
+        self.last_save_stats = None
         try:
+            # Group entities by page
+            entities_by_page = PDFSharder.group_entities_by_page(entities)
+
+            if sharded is None:
+                sharded = len(entities_by_page) >= self.shard_min_pages
+
+            if sharded and len(entities_by_page) > 1:
+                if progress_callback:
+                    progress_callback(0.6, desc="Applying redactions (sharded)...")
+
+                sharder = PDFSharder(max_workers)
+                worker = partial(_redact_page_range_worker, redactor_config=self.get_config(),
+                                 extractor_config=extractor.get_config())
+                total_redactions = sharder.run(
+                    input_path, output_path, entities_by_page, worker,
+                    progress_callback=progress_callback, saver=self.saver
+                )
+                self.last_save_stats = sharder.last_save_stats
+                self.logger.info(f"Redaction complete: {total_redactions} items redacted (sharded)")
+                return total_redactions > 0
+
             doc = fitz.open(input_path)
             total_redactions = 0
 
             if progress_callback:
                 progress_callback(0.6, desc="Applying redactions...")
 
-            # Group entities by page
-            entities_by_page = {}
-            for entity in entities:
-                page_num = entity.get('text_block_info', {}).get('page', 0)
-                if page_num not in entities_by_page:
-                    entities_by_page[page_num] = []
-                entities_by_page[page_num].append(entity)
-
             # Process each page
             for page_num in range(len(doc)):
                 if page_num not in entities_by_page:
                     continue
 
                 page = doc.load_page(page_num)
-                page_entities = entities_by_page[page_num]
 
                 if progress_callback:
                     progress_callback(0.6 + (page_num / len(doc)) * 0.3, 
                                     desc=f"Redacting page {page_num + 1}/{len(doc)}...")
 
-                # Sort entities by position (reverse order for proper processing)
-                page_entities.sort(key=lambda x: x.get('start', 0), reverse=True)
-
-                for entity in page_entities:
-                    success = self.redact_entity_locations(page, entity, extractor)
-                    if success:
-                        total_redactions += 1
+                total_redactions += self.redact_page_entities(page, entities_by_page[page_num], extractor)
 
-            doc.save(output_path)
+            self.last_save_stats = self.saver.save(doc, output_path, self.saver.resolve_profile(secure=True))
             doc.close()
 
             self.logger.info(f"Redaction complete: {total_redactions} items redacted")
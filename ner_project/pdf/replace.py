@@ -4,20 +4,65 @@ PDF Replacement Module - Font-preserving text replacement
 import fitz  # PyMuPDF
 import logging
 import random
-from typing import List, Dict, Optional
+from functools import partial
+from typing import List, Dict, Optional, Tuple
+from pdf.fonts import FontMetrics, FontMetricsCache
 from pdf.redact import PDFRedactor
+from pdf.save import PDFSaver
+from pdf.sharding import PDFSharder
 
 logger = logging.getLogger(__name__)
 
+
+def _replace_page_range_worker(source, start_page: int, end_page: int,
+                               entities_by_page: Dict[int, List[Dict]],
+                               replacer_config: Optional[Dict] = None,
+                               extractor_config: Optional[Dict] = None) -> Tuple[bytes, int, Dict[int, List[int]]]:
+    """Process pool entry point: replace entities of a page range on a private document copy"""
+    from pdf.extractor import PDFExtractor
+
+    # Built from the parent's settings (see get_config)
+    replacer = PDFReplacer(**(replacer_config or {}))
+    extractor = PDFExtractor(**(extractor_config or {}))
+    return PDFSharder.process_page_range(
+        source, start_page, end_page, entities_by_page,
+        lambda page, page_entities: replacer.replace_page_entities(page, page_entities, extractor)
+    )
+
+
 class PDFReplacer:
     """PDF text replacement with font preservation"""
     
-    def __init__(self):
+    def __init__(self, shard_min_pages: int = 32, save_profile: str = 'balanced',
+                 review_save_profile: str = 'incremental', redactor_config: Optional[Dict] = None):
+        """
+        Initialize PDFReplacer
+
+        Args:
+            shard_min_pages: Number of affected pages from which replacement is sharded across processes
+            save_profile: Save profile for output documents (see pdf.save.SAVE_PROFILES)
+            review_save_profile: Save profile for non-secure review copies
+            redactor_config: PDFRedactor arguments (raster DPI, rect coalescing) for removing originals
+        """
         self.logger = logger
-        self.redactor = PDFRedactor()
+        self.redactor = PDFRedactor(**(redactor_config or {}))
+        self.shard_min_pages = shard_min_pages
+        self.font_metrics = FontMetricsCache()
+        self.saver = PDFSaver(save_profile)
+        self.review_save_profile = review_save_profile
+        self.last_save_stats: Optional[Dict] = None
+
+    def get_config(self) -> Dict:
+        """Constructor arguments reproducing this replacer's settings (e.g. in worker processes)"""
+        return {
+            'shard_min_pages': self.shard_min_pages,
+            'save_profile': self.saver.default_profile,
+            'review_save_profile': self.review_save_profile,
+            'redactor_config': self.redactor.get_config()
+        }
     
     def calculate_optimal_font_size(self, replacement_text: str, target_rect: fitz.Rect, 
-                                  original_font_size: float) -> float:
+                                  original_font_size: float, metrics: Optional[FontMetrics] = None) -> float:
         """
         Calculate optimal font size to fit replacement text in target rectangle
         
@@ -25,14 +70,17 @@ class PDFReplacer:
             replacement_text: Text to fit
             target_rect: Target rectangle
             original_font_size: Original font size
+            metrics: Metrics of the font the text is written with (Helvetica if None)
             
         Returns:
             Optimal font size
         """
         try:
+            if metrics is None:
+                metrics = self.font_metrics.get_base14('helv')
+
             rect_width = target_rect.width
-            text_width = fitz.get_text_length(replacement_text, fontname='helv', 
-                                            fontsize=original_font_size)
+            text_width = metrics.text_width(replacement_text, original_font_size)
             
             if text_width > rect_width * 1.1:
                 optimal_size = max(original_font_size * (rect_width / max(text_width, 1e-6)) * 0.9, 6)
@@ -67,6 +115,71 @@ class PDFReplacer:
         except Exception:
             return (0, 0, 0)
     
+    def prepare_replacement(self, page, entity: Dict, extractor) -> Optional[Dict]:
+        """
+        Locate an entity and compute how its replacement text is written
+
+        Args:
+            page: PDF page object (not yet redacted)
+            entity: Entity information dict
+            extractor: PDFExtractor instance
+
+        Returns:
+            Dict with 'rects', 'text', 'point', 'font', 'fontsize' and 'color', or None if nothing to replace;
+            on a page the entity only continues on, just 'rects' and an empty 'text'
+        """
+        original_text = (entity.get('word') or '').strip()
+        replacement_text = (entity.get('replacement') or original_text).strip()
+
+        if not original_text or replacement_text == original_text:
+            return None
+
+        rects = extractor.locate_entity_rects(page, entity)
+        if not rects:
+            return None
+
+        text_block_info = entity.get('text_block_info') or {}
+        if page.number != text_block_info.get('page', page.number):
+            # Entity crossing a page break: the replacement is written on its start page only
+            return {'rects': rects, 'text': ''}
+
+        first_rect = rects[0]
+        font_size = float(text_block_info.get('size', 12.0))
+
+        # Write with the source font when the document embeds a usable copy
+        metrics = self.font_metrics.resolve(page, text_block_info.get('font', ''),
+                                            int(text_block_info.get('flags', 0)), replacement_text)
+
+        return {
+            'rects': rects,
+            'text': replacement_text,
+            'point': fitz.Point(first_rect.x0, first_rect.y1 - 2),
+            'font': metrics.font,
+            'fontsize': self.calculate_optimal_font_size(replacement_text, first_rect, font_size, metrics),
+            'color': self.convert_color_to_rgb(text_block_info.get('color', 0))
+        }
+
+    def write_replacements(self, page, replacements: List[Dict]) -> None:
+        """
+        Write replacement strings onto a redacted page (one TextWriter per text color)
+
+        Args:
+            page: PDF page object
+            replacements: Dicts returned by prepare_replacement
+        """
+        writers = {}
+
+        for item in replacements:
+            if not item['text']:
+                continue
+            writer = writers.get(item['color'])
+            if writer is None:
+                writer = writers[item['color']] = fitz.TextWriter(page.rect)
+            writer.append(item['point'], item['text'], font=item['font'], fontsize=item['fontsize'])
+
+        for color, writer in writers.items():
+            writer.write_text(page, color=color)
+
     def replace_entity_with_font_preservation(self, page, entity: Dict, extractor) -> bool:
         """
         Replace entity while preserving font characteristics
@@ -80,81 +193,168 @@ class PDFReplacer:
             True if successful
         """
         try:
-            original_text = (entity.get('word') or '').strip()
-            replacement_text = (entity.get('replacement') or original_text).strip()
-            
-            if not original_text or replacement_text == original_text:
+            item = self.prepare_replacement(page, entity, extractor)
+            if item is None:
                 return False
 
-            text_block_info = entity.get('text_block_info') or {}
-            bbox = text_block_info.get('bbox')
-            if not bbox:
+            # Step 1: Redact original text
+            redacted = self.redactor.apply_redaction_to_rects(page, item['rects'])
+            extractor.text_index_cache.discard(page)
+            if not redacted:
                 return False
 
-            block_text = text_block_info.get('block_text', '')
-            rel_s = int(text_block_info.get('relative_start', 0))
-            rel_e = int(text_block_info.get('relative_end', 0))
-            block_slice = block_text[rel_s:rel_e] if (0 <= rel_s <= len(block_text) and 0 <= rel_e <= len(block_text)) else ''
-            search_text = (block_slice or original_text).strip()
-
-            # Generate candidate search queries
-            candidates = extractor._candidate_queries(search_text) or [search_text]
-
-            # Search for text quads
-            hit_quads = None
-            for q in candidates:
-                hit_quads = extractor.search_quads_near(page, q, bbox)
-                if hit_quads:
-                    break
-
-            # Fallback to character-based rectangle
-            if not hit_quads:
-                char_rect = extractor.rect_from_block_slice_chars(page, text_block_info)
-                if char_rect:
-                    rects = [char_rect]
-                else:
-                    return False
-            else:
-                rects = extractor.rects_from_hit(hit_quads)
+            # Step 2: Insert replacement text
+            self.write_replacements(page, [item])
+            return True
 
-            if not rects:
-                return False
+        except Exception as e:
+            self.logger.error(f"Entity replacement error: {e}")
+            return False
+    
+    def replace_page_entities(self, page, page_entities: List[Dict], extractor, secure: bool = True) -> int:
+        """
+        Replace all entities of one page
 
-            # Step 1: Redact original text
-            success = self.redactor.apply_redaction_to_rects(page, rects)
-            if not success:
-                return False
+        All entities are located on the unmodified page, redacted with a single
+        apply_redactions call and their replacements written in one pass.
+        With secure=False the original text is only covered by opaque
+        rectangles (no apply_redactions) - for internal review copies.
+
+        Args:
+            page: PDF page object
+            page_entities: Entities located on this page
+            extractor: PDFExtractor instance
+            secure: Remove the original text (False: overlay only)
 
-            # Step 2: Insert replacement text with font preservation
-            first_rect = rects[0]
-            font_size = float(text_block_info.get('size', 12.0))
-            font_color = text_block_info.get('color', 0)
+        Returns:
+            Number of successful replacements (continuation pages of entities
+            crossing a page break are not counted)
+        """
+        replacements = []
 
-            # Convert color
-            rgb_color = self.convert_color_to_rgb(font_color)
+        try:
+            for entity in page_entities:
+                try:
+                    item = self.prepare_replacement(page, entity, extractor)
+                    if item is not None:
+                        replacements.append(item)
+                except Exception as e:
+                    self.logger.error(f"Entity replacement error: {e}")
 
-            # Calculate optimal font size
-            font_size = self.calculate_optimal_font_size(replacement_text, first_rect, font_size)
+            rect_groups = [item['rects'] for item in replacements]
+            if not secure:
+                # Review copy: cover the original text instead of removing it
+                if replacements and self.redactor.draw_page_overlays(page, rect_groups):
+                    self.write_replacements(page, replacements)
+            # Touching rects of neighbouring entities share one annotation
+            elif replacements and self.redactor.add_page_redaction_annots(page, rect_groups):
+                page.apply_redactions()
+                self.write_replacements(page, replacements)
+        finally:
+            self.redactor.raster_cache.discard(page)
+            extractor.text_index_cache.discard(page)
 
-            # Insert replacement text
-            insert_point = (first_rect.x0, first_rect.y1 - 2)
-            page.insert_text(
-                insert_point,
-                replacement_text,
-                fontsize=font_size,
-                fontname='helv',
-                color=rgb_color,
-                render_mode=0
-            )
+        return sum(1 for item in replacements if item['text'])
 
-            return True
+    def make_shard_worker(self, extractor):
+        """Page-range worker carrying this replacer's and the extractor's settings"""
+        return partial(_replace_page_range_worker, replacer_config=self.get_config(),
+                       extractor_config=extractor.get_config())
+
+    def apply_replacements(self, doc, entities: List[Dict], extractor, progress_callback=None,
+                           secure: bool = True, source: Optional[bytes] = None,
+                           max_workers: Optional[int] = None) -> int:
+        """
+        Replace entities in an open document (in place, nothing is saved)
+
+        With source (the bytes doc was opened from, doc still unmodified) and at
+        least shard_min_pages affected pages, secure replacement runs sharded in
+        worker processes and the results are merged back into doc.
+
+        Args:
+            doc: Open fitz.Document
+            entities: List of entities to replace
+            extractor: PDFExtractor instance
+            progress_callback: Progress callback function
+            secure: Remove the original text (False: overlay only, see replace_page_entities)
+            source: PDF bytes of the unmodified doc, enables sharding
+            max_workers: Number of worker processes for sharding (defaults to PDFSharder.default_workers())
+
+        Returns:
+            Number of successful replacements
+        """
+        entities_by_page = PDFSharder.group_entities_by_page(entities)
+        total_replacements = 0
+
+        if (source is not None and secure and not doc.is_dirty
+                and len(entities_by_page) > 1 and len(entities_by_page) >= self.shard_min_pages):
+            try:
+                if progress_callback:
+                    progress_callback(0.6, desc="Applying font-preserving replacements (sharded)...")
+                sharder = PDFSharder(max_workers)
+                shards, total_replacements = sharder.process_shards(
+                    source, entities_by_page, self.make_shard_worker(extractor), progress_callback
+                )
+                sharder.apply_shards(doc, shards, entities_by_page)
+                self.logger.info(f"Sharded in-memory replacement: {total_replacements} replacements")
+                return total_replacements
+            except Exception as e:
+                if doc.is_dirty:
+                    raise
+                self.logger.warning(f"Sharded replacement failed, falling back to sequential: {e}")
+
+        if progress_callback:
+            progress_callback(0.6, desc="Applying font-preserving replacements...")
+
+        # Process each page
+        for page_num in range(len(doc)):
+            if page_num not in entities_by_page:
+                continue
+
+            page = doc.load_page(page_num)
+
+            if progress_callback:
+                progress_callback(0.6 + (page_num / len(doc)) * 0.3, 
+                                desc=f"Replacing page {page_num + 1}/{len(doc)}...")
+
+            total_replacements += self.replace_page_entities(page, entities_by_page[page_num], extractor, secure)
+
+        return total_replacements
+
+    def mark_review_copy(self, doc) -> None:
+        """
+        Flag a non-secure review copy in the document metadata
+
+        Args:
+            doc: Open fitz.Document (overlays applied with secure=False)
+        """
+        metadata = {key: value for key, value in (doc.metadata or {}).items()
+                    if key not in ('format', 'encryption')}
+        subject = metadata.get('subject') or ''
+        metadata['subject'] = f"REVIEW COPY - NOT REDACTED (original text remains under overlays) {subject}".strip()
+        keywords = [metadata.get('keywords') or '', 'review-copy', 'not-redacted']
+        metadata['keywords'] = ', '.join(keyword for keyword in keywords if keyword)
+        doc.set_metadata(metadata)
+
+    def apply_censoring(self, entities: List[Dict]) -> List[Dict]:
+        """
+        Set star replacements on entities
+
+        Args:
+            entities: List of entities to censor
+
+        Returns:
+            The same entities with 'replacement' set
+        """
+        for entity in entities:
+            original = entity.get('word', '').strip()
+            entity['replacement'] = self.redactor.censor_text_with_stars(original)
+        return entities
 
-        except Exception as e:
-            self.logger.error(f"Entity replacement error: {e}")
-            return False
-    
     def process_pdf_replacement(self, input_path: str, entities: List[Dict], 
-                               output_path: str, extractor, progress_callback=None) -> bool:
+                               output_path: str, extractor, progress_callback=None,
+                               sharded: Optional[bool] = None, max_workers: Optional[int] = None,
+                               secure: bool = True) -> bool:
         """
         Process PDF with font-preserving replacement
         
@@ -164,46 +364,46 @@ class PDFReplacer:
             output_path: Output PDF path
             extractor: PDFExtractor instance
             progress_callback: Progress callback function
+            sharded: Process page ranges in worker processes (None = only for many affected pages)
+            max_workers: Number of worker processes for sharded mode
+            secure: Remove the original text; False writes a flagged review copy
+                (overlays only, never sharded, saved with review_save_profile)
             
         Returns:
             True if successful
         """
+        self.last_save_stats = None
         try:
-            doc = fitz.open(input_path)
-            total_replacements = 0
-
-            if progress_callback:
-                progress_callback(0.6, desc="Applying font-preserving replacements...")
-
             # Group entities by page
-            entities_by_page = {}
-            for entity in entities:
-                page_num = entity.get('text_block_info', {}).get('page', 0)
-                if page_num not in entities_by_page:
-                    entities_by_page[page_num] = []
-                entities_by_page[page_num].append(entity)
-
-            # Process each page
-            for page_num in range(len(doc)):
-                if page_num not in entities_by_page:
-                    continue
+            entities_by_page = PDFSharder.group_entities_by_page(entities)
 
-                page = doc.load_page(page_num)
-                page_entities = entities_by_page[page_num]
+            if sharded is None:
+                sharded = len(entities_by_page) >= self.shard_min_pages
 
+            if sharded and secure and len(entities_by_page) > 1:
                 if progress_callback:
-                    progress_callback(0.6 + (page_num / len(doc)) * 0.3, 
-                                    desc=f"Replacing page {page_num + 1}/{len(doc)}...")
+                    progress_callback(0.6, desc="Applying font-preserving replacements (sharded)...")
 
-                # Sort entities by position (reverse order for proper processing)
-                page_entities.sort(key=lambda x: x.get('start', 0), reverse=True)
+                sharder = PDFSharder(max_workers)
+                total_replacements = sharder.run(
+                    input_path, output_path, entities_by_page, self.make_shard_worker(extractor),
+                    progress_callback=progress_callback, saver=self.saver
+                )
+                self.last_save_stats = sharder.last_save_stats
+                self.logger.info(f"Font-preserving replacement complete: {total_replacements} replacements (sharded)")
+                return total_replacements > 0
+
+            if secure:
+                profile = self.saver.resolve_profile(secure=True)
+            else:
+                profile = self.saver.resolve_profile(self.review_save_profile, secure=False)
 
-                for entity in page_entities:
-                    success = self.replace_entity_with_font_preservation(page, entity, extractor)
-                    if success:
-                        total_replacements += 1
+            doc = self.saver.open_document(input_path, output_path, profile)
+            total_replacements = self.apply_replacements(doc, entities, extractor, progress_callback, secure)
+            if not secure:
+                self.mark_review_copy(doc)
 
-            doc.save(output_path)
+            self.last_save_stats = self.saver.save(doc, output_path, profile)
             doc.close()
 
             self.logger.info(f"Font-preserving replacement complete: {total_replacements} replacements")
@@ -214,7 +414,8 @@ class PDFReplacer:
             return False
     
     def process_pdf_censoring(self, input_path: str, entities: List[Dict], 
-                             output_path: str, extractor, progress_callback=None) -> bool:
+                             output_path: str, extractor, progress_callback=None,
+                             sharded: Optional[bool] = None, secure: bool = True) -> bool:
         """
         Process PDF with censoring (star replacement)
         
@@ -224,19 +425,19 @@ class PDFReplacer:
             output_path: Output PDF path
             extractor: PDFExtractor instance
             progress_callback: Progress callback function
+            sharded: Process page ranges in worker processes (None = automatic)
+            secure: Remove the original text; False writes a flagged review copy
             
         Returns:
             True if successful
         """
         try:
             # Apply censoring strategy to entities
-            for entity in entities:
-                original = entity.get('word', '').strip()
-                entity['replacement'] = self.redactor.censor_text_with_stars(original)
+            self.apply_censoring(entities)
             
             # Use regular replacement process with star text
             return self.process_pdf_replacement(input_path, entities, output_path, 
-                                              extractor, progress_callback)
+                                              extractor, progress_callback, sharded=sharded, secure=secure)
             
         except Exception as e:
             self.logger.error(f"PDF censoring processing error: {e}")
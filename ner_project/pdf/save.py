@@ -0,0 +1,185 @@
+"""
+PDF Save Module - Save profiles for output documents
+"""
+import os
+import time
+import shutil
+import logging
+import fitz  # PyMuPDF
+from dataclasses import dataclass, replace
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SaveProfile:
+    """Options passed to Document.save / Document.tobytes"""
+    name: str
+    garbage: int = 0
+    deflate: bool = False
+    deflate_images: bool = False
+    deflate_fonts: bool = False
+    use_objstms: bool = False
+    clean: bool = False
+    incremental: bool = False
+
+    def save_options(self) -> Dict:
+        """Keyword arguments for a full (non-incremental) save"""
+        options = {
+            'garbage': self.garbage,
+            'deflate': self.deflate,
+            'deflate_images': self.deflate_images,
+            'deflate_fonts': self.deflate_fonts,
+            'clean': self.clean
+        }
+        if self.use_objstms:
+            options['use_objstms'] = 1
+        return options
+
+
+SAVE_PROFILES = {
+    # Drop unreferenced objects only
+    'fast': SaveProfile('fast', garbage=1),
+    # Also merge duplicate objects and streams (e.g. fonts embedded once per page) and compress
+    'balanced': SaveProfile('balanced', garbage=4, deflate=True, deflate_images=True, deflate_fonts=True),
+    # Additionally pack objects into object streams and sanitize content streams
+    'compact': SaveProfile('compact', garbage=4, deflate=True, deflate_images=True, deflate_fonts=True,
+                           use_objstms=True, clean=True),
+    # Append changes to a copy of the input (original revision stays in the file)
+    'incremental': SaveProfile('incremental', incremental=True),
+}
+
+
+class PDFSaver:
+    """Save output documents with a configurable profile and report size and time"""
+
+    def __init__(self, default_profile: str = 'balanced', incremental_max_ratio: float = 0.1):
+        """
+        Initialize PDFSaver
+
+        Args:
+            default_profile: Profile name used when none is given ('auto' picks per job)
+            incremental_max_ratio: Changed-page ratio up to which 'auto' saves incrementally
+        """
+        self.logger = logger
+        self.default_profile = default_profile
+        self.incremental_max_ratio = incremental_max_ratio
+
+    def resolve_profile(self, profile: Optional[str] = None, secure: bool = True,
+                        changed_pages: Optional[int] = None, page_count: Optional[int] = None) -> SaveProfile:
+        """
+        Pick the profile for one job
+
+        Incremental saves keep the original revision (and therefore the
+        removed text) inside the file, so they are never used for secure outputs.
+
+        Args:
+            profile: Profile name, 'auto' or None for the default
+            secure: Output must not contain the original content
+            changed_pages: Number of modified pages (for 'auto')
+            page_count: Number of pages in the document (for 'auto')
+
+        Returns:
+            SaveProfile instance
+        """
+        name = profile or self.default_profile
+
+        if name == 'auto':
+            few_changes = (changed_pages is not None and page_count
+                           and changed_pages / page_count <= self.incremental_max_ratio)
+            name = 'incremental' if (few_changes and not secure) else 'balanced'
+
+        resolved = SAVE_PROFILES.get(name)
+        if resolved is None:
+            self.logger.warning(f"Unknown save profile '{name}', using 'balanced'")
+            resolved = SAVE_PROFILES['balanced']
+
+        if secure and resolved.incremental:
+            self.logger.warning("Incremental save would keep the original content, using a full rewrite")
+            resolved = SAVE_PROFILES['balanced']
+
+        # A full rewrite of a secure output never carries unreferenced (removed) objects along
+        if secure and resolved.garbage < 1:
+            resolved = replace(resolved, garbage=1)
+
+        return resolved
+
+    def open_document(self, input_path: str, output_path: str, profile: SaveProfile):
+        """
+        Open the document a job modifies
+
+        Incremental saves must write to the file the document was opened from,
+        so for them the input is copied to output_path first (unless MuPDF
+        cannot save that file incrementally).
+
+        Args:
+            input_path: Input PDF path
+            output_path: Output PDF path
+            profile: Resolved save profile
+
+        Returns:
+            Open fitz.Document
+        """
+        if profile.incremental:
+            shutil.copyfile(input_path, output_path)
+            doc = fitz.open(output_path)
+            if doc.can_save_incrementally():
+                return doc
+            # e.g. a repaired file: save() then falls back to a full rewrite
+            doc.close()
+            os.remove(output_path)
+        return fitz.open(input_path)
+
+    def _report(self, profile: SaveProfile, size: int, seconds: float) -> Dict:
+        stats = {
+            'profile': profile.name,
+            'incremental': profile.incremental,
+            'bytes': size,
+            'size_mb': size / (1024 * 1024),
+            'seconds': seconds
+        }
+        self.logger.info(f"Saved output ({profile.name}): {stats['size_mb']:.2f} MB in {seconds:.2f}s")
+        return stats
+
+    def save(self, doc, output_path: str, profile: SaveProfile) -> Dict:
+        """
+        Save a document
+
+        Args:
+            doc: Open fitz.Document
+            output_path: Output PDF path (for incremental saves, the file doc was opened from)
+            profile: Resolved save profile
+
+        Returns:
+            Dict with 'profile', 'incremental', 'bytes', 'size_mb' and 'seconds'
+        """
+        start = time.perf_counter()
+
+        if profile.incremental and doc.name and os.path.abspath(doc.name) == os.path.abspath(output_path):
+            doc.saveIncr()
+        else:
+            if profile.incremental:
+                # Not opened via open_document: fall back to a plain full save
+                profile = SAVE_PROFILES['fast']
+            doc.save(output_path, **profile.save_options())
+
+        return self._report(profile, os.path.getsize(output_path), time.perf_counter() - start)
+
+    def to_bytes(self, doc, profile: SaveProfile) -> Tuple[bytes, Dict]:
+        """
+        Serialize a document in memory (always a full rewrite)
+
+        Args:
+            doc: Open fitz.Document
+            profile: Resolved save profile
+
+        Returns:
+            (PDF bytes, stats dict as returned by save)
+        """
+        if profile.incremental:
+            profile = SAVE_PROFILES['fast']
+
+        start = time.perf_counter()
+        data = doc.tobytes(**profile.save_options())
+        return data, self._report(profile, len(data), time.perf_counter() - start)
@@ -0,0 +1,331 @@
+"""
+PDF Sharding Module - Page-range parallel processing merged back into the document
+"""
+import os
+import logging
+import multiprocessing
+import fitz  # PyMuPDF
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from pdf.save import PDFSaver, SaveProfile
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on worker processes per job; the app process also holds the model
+MAX_DEFAULT_WORKERS = 4
+
+# PDF bytes of the current job inside a worker process (set once per worker by make_executor)
+_worker_source = None
+
+
+def _set_worker_source(source) -> None:
+    """Process pool initializer: keep the job's PDF bytes in the worker"""
+    global _worker_source
+    _worker_source = source
+
+
+class PDFSharder:
+    """Split page-wise PDF modifications across processes and merge the results"""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Initialize PDFSharder
+
+        Args:
+            max_workers: Number of worker processes (defaults to default_workers())
+        """
+        self.logger = logger
+        self.max_workers = max_workers or self.default_workers()
+        self.last_save_stats: Optional[Dict] = None
+
+    @staticmethod
+    def default_workers() -> int:
+        """Default number of worker processes (CPU count, at most MAX_DEFAULT_WORKERS)"""
+        return max(1, min(os.cpu_count() or 1, MAX_DEFAULT_WORKERS))
+
+    @staticmethod
+    def make_executor(max_workers: int, source) -> ProcessPoolExecutor:
+        """
+        Process pool for a job on a PDF path or on PDF bytes
+
+        PDF bytes are sent once per worker (pool initializer) instead of with
+        every task; tasks then receive task_source(source), i.e. None.
+        Workers are spawned, not forked: forking the server process would copy
+        its model, CUDA state and the locks held by its other threads.
+
+        Args:
+            max_workers: Number of worker processes
+            source: Input PDF path or PDF bytes
+
+        Returns:
+            ProcessPoolExecutor
+        """
+        context = multiprocessing.get_context("spawn")
+        if isinstance(source, (bytes, bytearray)):
+            return ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                                       initializer=_set_worker_source, initargs=(bytes(source),))
+        return ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+
+    @staticmethod
+    def task_source(source):
+        """Source argument submitted with each task (None for PDF bytes, see make_executor)"""
+        return None if isinstance(source, (bytes, bytearray)) else source
+
+    @staticmethod
+    def open_source(source):
+        """
+        Open a private document copy inside a worker
+
+        Args:
+            source: PDF path, PDF bytes, or None for the bytes set by make_executor
+
+        Returns:
+            Open fitz.Document
+        """
+        if source is None:
+            source = _worker_source
+        if isinstance(source, (bytes, bytearray)):
+            return fitz.open(stream=source, filetype="pdf")
+        return fitz.open(source)
+
+    @staticmethod
+    def group_entities_by_page(entities: List[Dict]) -> Dict[int, List[Dict]]:
+        """
+        Group entities by their page number
+
+        An entity crossing a page break is listed under every page it covers.
+
+        Args:
+            entities: Entities with text_block_info
+
+        Returns:
+            Dict mapping page number to its entities
+        """
+        entities_by_page = {}
+        for entity in entities:
+            for page_num in PDFSharder.entity_pages(entity):
+                entities_by_page.setdefault(page_num, []).append(entity)
+        return entities_by_page
+
+    @staticmethod
+    def entity_pages(entity: Dict) -> List[int]:
+        """
+        Pages an entity covers
+
+        Args:
+            entity: Entity with text_block_info
+
+        Returns:
+            Its start page, followed by the pages it continues on when it crosses a page break
+        """
+        text_block_info = entity.get('text_block_info') or {}
+        pages = [text_block_info.get('page', 0)]
+        for fragment in text_block_info.get('fragments') or []:
+            if fragment.get('page', pages[0]) not in pages:
+                pages.append(fragment['page'])
+        return pages
+
+    def partition_pages(self, entities_by_page: Dict[int, List[Dict]]) -> List[Tuple[int, int]]:
+        """
+        Partition affected pages into contiguous ranges of similar entity counts
+
+        Args:
+            entities_by_page: Dict mapping page number to its entities
+
+        Returns:
+            List of (start_page, end_page) ranges, end exclusive
+        """
+        pages = sorted(entities_by_page)
+        if not pages:
+            return []
+
+        # Two shards per worker balances uneven pages without too many document copies
+        shard_count = min(len(pages), self.max_workers * 2)
+        total = sum(len(entities_by_page[p]) for p in pages)
+        target = total / shard_count
+
+        ranges = []
+        shard_start, shard_load = pages[0], 0
+        for i, page_num in enumerate(pages):
+            shard_load += len(entities_by_page[page_num])
+            is_last = i == len(pages) - 1
+            if is_last or (shard_load >= target and len(ranges) < shard_count - 1):
+                ranges.append((shard_start, page_num + 1))
+                if not is_last:
+                    shard_start, shard_load = pages[i + 1], 0
+
+        return ranges
+
+    @staticmethod
+    def process_page_range(source, start_page: int, end_page: int,
+                           entities_by_page: Dict[int, List[Dict]],
+                           page_fn: Callable) -> Tuple[bytes, int, Dict[int, List[int]]]:
+        """
+        Apply page_fn to pages [start_page, end_page) of a private document copy
+
+        Args:
+            source: Input PDF path, PDF bytes, or None (see open_source)
+            start_page: First page (inclusive)
+            end_page: Last page (exclusive)
+            entities_by_page: Entities of the pages in this range
+            page_fn: Callable (page, page_entities) -> number of applied changes
+
+        Returns:
+            (PDF bytes containing only the range's pages, number of applied changes,
+            dict mapping page number to xrefs of the annotations page_fn removed)
+        """
+        doc = PDFSharder.open_source(source)
+        try:
+            changes = 0
+            removed_annots: Dict[int, List[int]] = {}
+            for page_num in range(start_page, end_page):
+                if page_num in entities_by_page:
+                    page = doc.load_page(page_num)
+                    # apply_redactions drops links over the redacted text; the copy still has the
+                    # source's xrefs here, so the removals can be repeated on the original page
+                    before = {xref for xref, _, _ in page.annot_xrefs()}
+                    changes += page_fn(page, entities_by_page[page_num])
+                    removed = before - {xref for xref, _, _ in page.annot_xrefs()}
+                    if removed:
+                        removed_annots[page_num] = sorted(removed)
+
+            doc.select(list(range(start_page, end_page)))
+            return doc.tobytes(garbage=1), changes, removed_annots
+        finally:
+            doc.close()
+
+    def process_shards(self, source, entities_by_page: Dict[int, List[Dict]], worker: Callable,
+                       progress_callback=None) -> Tuple[Dict[Tuple[int, int], Tuple[bytes, Dict]], int]:
+        """
+        Process page ranges in worker processes
+
+        Args:
+            source: Input PDF path or PDF bytes (each worker opens its own copy)
+            entities_by_page: Dict mapping page number to its entities
+            worker: Module-level callable (source, start, end, entities_by_page) -> process_page_range
+                result; source is the path, or None for PDF bytes (see open_source)
+            progress_callback: Progress callback function
+
+        Returns:
+            ((shard PDF bytes, removed annotation xrefs by page) by (start, end) range,
+            total number of applied changes)
+        """
+        ranges = self.partition_pages(entities_by_page)
+        shards: Dict[Tuple[int, int], Tuple[bytes, Dict]] = {}
+        total_changes = 0
+
+        with self.make_executor(min(self.max_workers, len(ranges)), source) as executor:
+            futures = {
+                executor.submit(
+                    worker, self.task_source(source), start, end,
+                    {p: entities_by_page[p] for p in range(start, end) if p in entities_by_page}
+                ): (start, end)
+                for start, end in ranges
+            }
+
+            for done, future in enumerate(as_completed(futures), start=1):
+                shard_bytes, changes, removed_annots = future.result()
+                shards[futures[future]] = (shard_bytes, removed_annots)
+                total_changes += changes
+
+                if progress_callback:
+                    progress_callback(0.6 + (done / len(ranges)) * 0.3,
+                                      desc=f"Processed shard {done}/{len(ranges)}...")
+
+        self.logger.info(f"Sharded processing: {len(ranges)} page ranges on {self.max_workers} workers")
+        return shards, total_changes
+
+    @staticmethod
+    def remove_annots(doc, page_num: int, xrefs: Iterable[int]) -> None:
+        """
+        Drop annotations (links, widgets, ...) from a page's /Annots array
+
+        Args:
+            doc: Open fitz.Document
+            page_num: Page number
+            xrefs: Annotation xrefs to drop
+        """
+        xrefs = set(xrefs)
+        page = doc.load_page(page_num)
+        keep = [xref for xref, _, _ in page.annot_xrefs() if xref not in xrefs]
+        if keep:
+            doc.xref_set_key(page.xref, 'Annots', '[' + ' '.join(f'{xref} 0 R' for xref in keep) + ']')
+        else:
+            doc.xref_set_key(page.xref, 'Annots', 'null')
+
+    def apply_shards(self, doc, shards: Dict[Tuple[int, int], Tuple[bytes, Dict]],
+                     changed_pages: Iterable[int]) -> None:
+        """
+        Put the processed pages of shard documents into doc, in place
+
+        Only /Contents and /Resources of every changed page are taken over from
+        the shard; the page objects themselves stay. Outline and link
+        destinations, form widgets, annotations and structure-tree references
+        of those pages are therefore kept (replacing whole pages would drop them),
+        except the annotations the workers removed (e.g. links over redacted text),
+        which are dropped here as well, like in the sequential path.
+
+        Args:
+            doc: Open fitz.Document the shards were made from (unmodified)
+            shards: Shard results by (start, end) range, as returned by process_shards
+            changed_pages: Pages that were modified in the shards
+        """
+        changed_pages = set(changed_pages)
+        for (start, end), (shard_bytes, removed_annots) in sorted(shards.items()):
+            pages = [page_num for page_num in range(start, end) if page_num in changed_pages]
+            if not pages:
+                continue
+
+            shard_doc = fitz.open("pdf", shard_bytes)
+            try:
+                # Copy the shard pages into doc (appended), point the original pages at
+                # their content and resources, then drop the copies again
+                base = len(doc)
+                doc.insert_pdf(shard_doc, links=False, annots=False, widgets=False)
+            finally:
+                shard_doc.close()
+
+            try:
+                for page_num in pages:
+                    source_xref = doc.page_xref(base + page_num - start)
+                    target_xref = doc.page_xref(page_num)
+                    for key in ('Contents', 'Resources'):
+                        value_type, value = doc.xref_get_key(source_xref, key)
+                        if value_type != 'null':
+                            doc.xref_set_key(target_xref, key, value)
+            finally:
+                doc.delete_pages(base, len(doc) - 1)
+
+            for page_num, xrefs in removed_annots.items():
+                self.remove_annots(doc, page_num, xrefs)
+
+    def run(self, input_path: str, output_path: str, entities_by_page: Dict[int, List[Dict]],
+            worker: Callable, progress_callback=None, saver: Optional[PDFSaver] = None,
+            save_profile: Optional[SaveProfile] = None) -> int:
+        """
+        Process page ranges in worker processes and save the merged output
+
+        Args:
+            input_path: Input PDF path
+            output_path: Output PDF path
+            entities_by_page: Dict mapping page number to its entities
+            worker: Module-level callable (source, start, end, entities_by_page), see process_shards
+            progress_callback: Progress callback function
+            saver: PDFSaver for the merged output (default profile if None)
+            save_profile: Resolved save profile (a secure full rewrite is required to drop the
+                original page contents)
+
+        Returns:
+            Total number of applied changes
+        """
+        shards, total_changes = self.process_shards(input_path, entities_by_page, worker, progress_callback)
+
+        doc = fitz.open(input_path)
+        try:
+            self.apply_shards(doc, shards, entities_by_page)
+            saver = saver or PDFSaver()
+            self.last_save_stats = saver.save(doc, output_path, save_profile or saver.resolve_profile(secure=True))
+        finally:
+            doc.close()
+
+        return total_changes
@@ -0,0 +1,294 @@
+"""
+PDF Spans Module - Columnar storage of extracted text spans
+"""
+import logging
+import numpy as np
+from collections.abc import Mapping, Sequence
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Keys of the span dicts produced by the extractor, in their original order
+SPAN_KEYS = ('page', 'text', 'bbox', 'font', 'size', 'flags', 'color', 'start_char', 'end_char')
+
+
+class SpanView(Mapping):
+    """Read-only dict-like view of one row of a SpanTable"""
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table: 'SpanTable', index: int):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key: str):
+        table, i = self._table, self._index
+        if key == 'text':
+            return table.full_text[table.start_char[i]:table.end_char[i]]
+        if key == 'page':
+            return int(table.page[i])
+        if key == 'bbox':
+            return tuple(float(x) for x in table.bbox[i])
+        if key == 'font':
+            return table.fonts[table.font_id[i]]
+        if key == 'size':
+            return float(table.size[i])
+        if key == 'flags':
+            return int(table.flags[i])
+        if key == 'color':
+            return int(table.color[i])
+        if key == 'start_char':
+            return int(table.start_char[i])
+        if key == 'end_char':
+            return int(table.end_char[i])
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(SPAN_KEYS)
+
+    def __len__(self) -> int:
+        return len(SPAN_KEYS)
+
+    def __repr__(self) -> str:
+        return f"SpanView({dict(self)!r})"
+
+
+class SpanTableBuilder:
+    """Append spans row by row and build a SpanTable"""
+
+    def __init__(self):
+        self.pages: List[int] = []
+        self.texts: List[str] = []
+        self.bboxes: List[Tuple[float, float, float, float]] = []
+        self.font_ids: List[int] = []
+        self.sizes: List[float] = []
+        self.flags: List[int] = []
+        self.colors: List[int] = []
+        self.fonts: List[str] = []
+        self._font_index: Dict[str, int] = {}
+        self.image_only_pages: List[int] = []
+
+    def append(self, page: int, text: str, bbox, font: str, size: float, flags: int, color: int) -> None:
+        """Add one span"""
+        font_id = self._font_index.get(font)
+        if font_id is None:
+            font_id = self._font_index[font] = len(self.fonts)
+            self.fonts.append(font)
+
+        self.pages.append(page)
+        self.texts.append(text)
+        self.bboxes.append(bbox)
+        self.font_ids.append(font_id)
+        self.sizes.append(size)
+        self.flags.append(flags)
+        self.colors.append(color)
+
+    def mark_image_only(self, page: int) -> None:
+        """Record a page that has no text layer but is covered by images"""
+        self.image_only_pages.append(page)
+
+    def build(self) -> 'SpanTable':
+        """Create the table (offsets are positions in the space-joined text)"""
+        lengths = np.fromiter((len(text) for text in self.texts), dtype=np.int64, count=len(self.texts))
+        start_char = np.zeros(len(lengths), dtype=np.int64)
+        if len(lengths) > 1:
+            start_char[1:] = np.cumsum(lengths[:-1] + 1)
+
+        return SpanTable(
+            page=np.asarray(self.pages, dtype=np.int32),
+            bbox=np.asarray(self.bboxes, dtype=np.float64).reshape(-1, 4),
+            size=np.asarray(self.sizes, dtype=np.float32),
+            flags=np.asarray(self.flags, dtype=np.int32),
+            color=np.asarray(self.colors, dtype=np.int32),
+            font_id=np.asarray(self.font_ids, dtype=np.int32),
+            fonts=list(self.fonts),
+            full_text=" ".join(self.texts),
+            start_char=start_char,
+            end_char=start_char + lengths,
+            image_only_pages=list(self.image_only_pages)
+        )
+
+
+class SpanTable(Sequence):
+    """Extracted spans as NumPy columns with one shared text buffer
+
+    Indexing and iteration yield SpanView objects, so code written for the
+    list-of-dicts representation keeps working. The text buffer is the
+    space-joined full text, so span offsets are full-text positions.
+    """
+
+    def __init__(self, page: np.ndarray, bbox: np.ndarray, size: np.ndarray, flags: np.ndarray,
+                 color: np.ndarray, font_id: np.ndarray, fonts: List[str], full_text: str,
+                 start_char: np.ndarray, end_char: np.ndarray, image_only_pages: Optional[List[int]] = None):
+        """
+        Initialize SpanTable
+
+        Args:
+            page: Page number per span
+            bbox: Bounding boxes, shape (n, 4)
+            size: Font size per span
+            flags: Font flags per span
+            color: sRGB color per span
+            font_id: Index into fonts per span
+            fonts: Interned font names
+            full_text: Span texts joined with single spaces
+            start_char: Start offset of each span in full_text
+            end_char: End offset (exclusive) of each span in full_text
+            image_only_pages: Pages without text layer that are covered by images (scans)
+        """
+        self.page = page
+        self.bbox = bbox
+        self.size = size
+        self.flags = flags
+        self.color = color
+        self.font_id = font_id
+        self.fonts = fonts
+        self.full_text = full_text
+        self.start_char = start_char
+        self.end_char = end_char
+        self.image_only_pages = image_only_pages or []
+
+    @classmethod
+    def from_spans(cls, spans: Iterable[Dict]) -> 'SpanTable':
+        """
+        Build a table from span dicts (their offsets are recomputed)
+
+        Args:
+            spans: Span dicts with the extractor's keys
+
+        Returns:
+            SpanTable instance
+        """
+        builder = SpanTableBuilder()
+        for span in spans:
+            builder.append(span['page'], span['text'], span['bbox'], span['font'],
+                           span['size'], span['flags'], span['color'])
+        return builder.build()
+
+    @classmethod
+    def coerce(cls, spans) -> 'SpanTable':
+        """
+        Return spans as a SpanTable (unchanged if it already is one)
+
+        Converting a list is O(n): callers convert once, not per lookup.
+
+        Args:
+            spans: SpanTable or iterable of span dicts
+
+        Returns:
+            SpanTable instance
+        """
+        return spans if isinstance(spans, cls) else cls.from_spans(spans)
+
+    @classmethod
+    def concat(cls, tables: List['SpanTable']) -> 'SpanTable':
+        """
+        Concatenate tables in order (offsets and font ids are remapped)
+
+        Args:
+            tables: Tables to join
+
+        Returns:
+            SpanTable instance
+        """
+        image_only_pages = sorted(page for table in tables for page in table.image_only_pages)
+        tables = [table for table in tables if len(table)]
+        if not tables:
+            builder = SpanTableBuilder()
+            builder.image_only_pages = image_only_pages
+            return builder.build()
+
+        fonts: List[str] = []
+        font_index: Dict[str, int] = {}
+        font_ids, start_chars, end_chars = [], [], []
+        offset = 0
+
+        for table in tables:
+            mapping = np.zeros(len(table.fonts), dtype=np.int32)
+            for i, font in enumerate(table.fonts):
+                if font not in font_index:
+                    font_index[font] = len(fonts)
+                    fonts.append(font)
+                mapping[i] = font_index[font]
+            font_ids.append(mapping[table.font_id])
+            start_chars.append(table.start_char + offset)
+            end_chars.append(table.end_char + offset)
+            offset += len(table.full_text) + 1
+
+        return cls(
+            page=np.concatenate([table.page for table in tables]),
+            bbox=np.concatenate([table.bbox for table in tables]),
+            size=np.concatenate([table.size for table in tables]),
+            flags=np.concatenate([table.flags for table in tables]),
+            color=np.concatenate([table.color for table in tables]),
+            font_id=np.concatenate(font_ids),
+            fonts=fonts,
+            full_text=" ".join(table.full_text for table in tables),
+            start_char=np.concatenate(start_chars),
+            end_char=np.concatenate(end_chars),
+            image_only_pages=image_only_pages
+        )
+
+    def __len__(self) -> int:
+        return len(self.page)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [SpanView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("span index out of range")
+        return SpanView(self, index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield SpanView(self, i)
+
+    def text(self, index: int) -> str:
+        """Text of one span"""
+        return self.full_text[self.start_char[index]:self.end_char[index]]
+
+    def find_span(self, start_pos: int, end_pos: int) -> Optional[int]:
+        """
+        Index of the span containing [start_pos, end_pos) in the full text
+
+        Args:
+            start_pos: Start offset in full text
+            end_pos: End offset in full text
+
+        Returns:
+            Span index, or None if no single span contains the range
+        """
+        index = int(np.searchsorted(self.start_char, start_pos, side='right')) - 1
+        # Like the sequential lookup, the range may run onto the separator after the span
+        if index < 0 or end_pos > self.end_char[index] + 1:
+            return None
+        return index
+
+    def find_spans(self, start_pos: int, end_pos: int) -> np.ndarray:
+        """
+        Indices of the spans overlapping [start_pos, end_pos) in the full text
+
+        Args:
+            start_pos: Start offset in full text
+            end_pos: End offset in full text
+
+        Returns:
+            Span indices in text order (empty if the range only covers separators)
+        """
+        first = max(int(np.searchsorted(self.start_char, start_pos, side='right')) - 1, 0)
+        last = int(np.searchsorted(self.start_char, end_pos, side='left'))
+        indices = np.arange(first, max(last, first))
+        return indices[self.end_char[indices] > start_pos]
+
+    def page_indices(self, page_num: int) -> np.ndarray:
+        """Indices of the spans on one page"""
+        return np.flatnonzero(self.page == page_num)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the columns and the text buffer"""
+        columns = (self.page, self.bbox, self.size, self.flags, self.color,
+                   self.font_id, self.start_char, self.end_char)
+        return sum(column.nbytes for column in columns) + len(self.full_text.encode('utf-8'))
@@ -0,0 +1,331 @@
+"""
+PDF Text Index Module - Per-page word and character indexes for locating entities
+"""
+import logging
+import unicodedata
+import fitz  # PyMuPDF
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from pdf.gazetteer import turkish_casefold
+from pdf.utils import document_token
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_search_text(text: str) -> str:
+    """
+    Normalize text the way PageTextIndex stores page text
+
+    NFKC, Turkish case folding (with diacritics folded to ASCII) and all
+    whitespace removed, so spacing and case differences between the
+    extracted entity and the page text do not matter.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Normalized text
+    """
+    folded = turkish_casefold(unicodedata.normalize("NFKC", text or ""))
+    return ''.join(ch for ch in folded if not ch.isspace())
+
+
+class PageTextIndex:
+    """Normalized text of one page with a map from every normalized character to its glyph box"""
+
+    def __init__(self, page):
+        """
+        Build the index from the page's raw characters
+
+        Args:
+            page: PDF page object
+        """
+        flags = fitz.TEXTFLAGS_RAWDICT & ~fitz.TEXT_PRESERVE_IMAGES
+        raw = page.get_text("rawdict", flags=flags)
+
+        normalized: List[str] = []
+        char_ids: List[int] = []
+        bboxes: List[tuple] = []
+        line_ids: List[int] = []
+        line_id = 0
+
+        for block in raw.get("blocks", []):
+            for line in block.get("lines", []):
+                for span in line.get("spans", []):
+                    for char in span.get("chars", []):
+                        folded = turkish_casefold(unicodedata.normalize("NFKC", char.get("c", "")))
+                        kept = [ch for ch in folded if not ch.isspace()]
+                        if not kept:
+                            continue
+                        # Ligatures expand to several normalized characters sharing one box
+                        normalized.extend(kept)
+                        char_ids.extend([len(bboxes)] * len(kept))
+                        bboxes.append(tuple(char["bbox"]))
+                        line_ids.append(line_id)
+                line_id += 1
+
+        self.text = ''.join(normalized)
+        self.char_ids = np.asarray(char_ids, dtype=np.int64)
+        self.bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+        self.line_ids = np.asarray(line_ids, dtype=np.int64)
+        self.centers = np.column_stack(((self.bboxes[:, 0] + self.bboxes[:, 2]) / 2,
+                                        (self.bboxes[:, 1] + self.bboxes[:, 3]) / 2))
+
+    def find_all(self, query: str, max_hits: int = 64, start: int = 0, end: Optional[int] = None) -> List[int]:
+        """
+        Start positions of a normalized query in the normalized page text
+
+        Args:
+            query: Already normalized query
+            max_hits: Maximum number of occurrences returned
+            start: First offset searched
+            end: End of the searched text (exclusive, None for the whole page)
+
+        Returns:
+            List of start offsets
+        """
+        hits = []
+        if not query:
+            return hits
+        end = len(self.text) if end is None else end
+        position = self.text.find(query, start, end)
+        while position >= 0 and len(hits) < max_hits:
+            hits.append(position)
+            position = self.text.find(query, position + 1, end)
+        return hits
+
+    def window(self, bbox) -> Optional[tuple]:
+        """
+        Range of normalized text whose glyphs have their center inside bbox
+
+        Args:
+            bbox: (x0, y0, x1, y1) in page coordinates
+
+        Returns:
+            (start, end) offsets, or None if no glyph lies inside
+        """
+        if not len(self.centers):
+            return None
+        x0, y0, x1, y1 = bbox
+        inside = ((self.centers[:, 0] >= x0) & (self.centers[:, 0] <= x1)
+                  & (self.centers[:, 1] >= y0) & (self.centers[:, 1] <= y1))
+        positions = np.flatnonzero(inside[self.char_ids])
+        if not positions.size:
+            return None
+        return int(positions[0]), int(positions[-1]) + 1
+
+    def rects_for_range(self, start: int, end: int) -> List[fitz.Rect]:
+        """
+        Rectangles covering normalized characters [start, end), one per text line
+
+        Args:
+            start: Start offset in the normalized text
+            end: End offset in the normalized text
+
+        Returns:
+            List of rectangles in line order
+        """
+        char_ids = np.unique(self.char_ids[start:end])
+        if char_ids.size == 0:
+            return []
+
+        lines = self.line_ids[char_ids]
+        boxes = self.bboxes[char_ids]
+        rects = []
+        for line in np.unique(lines):
+            line_boxes = boxes[lines == line]
+            rects.append(fitz.Rect(line_boxes[:, 0].min(), line_boxes[:, 1].min(),
+                                   line_boxes[:, 2].max(), line_boxes[:, 3].max()))
+        return rects
+
+    def find(self, text: str, ref_bbox=None, occurrence: int = 0, max_hits: int = 64) -> List[fitz.Rect]:
+        """
+        Locate text on the page
+
+        Args:
+            text: Text to find (normalized here)
+            ref_bbox: Bounding box of the span the text was extracted from;
+                occurrences inside it (or closest to it) win
+            occurrence: Which of the occurrences inside ref_bbox to take (0-based)
+            max_hits: Maximum number of occurrences considered
+
+        Returns:
+            Rectangles of the chosen occurrence (empty if not found)
+        """
+        query = normalize_search_text(text)
+        if not query:
+            return []
+
+        if ref_bbox is not None:
+            # Occurrences inside the source span, however many there are elsewhere on the page
+            window = self.window(ref_bbox)
+            if window is not None:
+                hits = self.find_all(query, occurrence + 1, *window)
+                if hits:
+                    best = hits[min(occurrence, len(hits) - 1)]
+                    return self.rects_for_range(best, best + len(query))
+
+        hits = self.find_all(query, max_hits)
+        if not hits:
+            return []
+
+        best = hits[0]
+        if ref_bbox is not None:
+            rx0, ry0, rx1, ry1 = ref_bbox
+            cx, cy = self.centers[self.char_ids[hits]].T
+            # Distance from the first glyph's center to the reference box (0 inside it)
+            distances = (np.maximum.reduce([rx0 - cx, np.zeros_like(cx), cx - rx1])
+                         + np.maximum.reduce([ry0 - cy, np.zeros_like(cy), cy - ry1]))
+
+            inside = np.flatnonzero(distances == 0)
+            if inside.size:
+                best = hits[int(inside[min(occurrence, inside.size - 1)])]
+            else:
+                best = hits[int(np.argmin(distances))]
+
+        return self.rects_for_range(best, best + len(query))
+
+
+class PageWordIndex:
+    """Words of one page with a hash index on their normalized tokens"""
+
+    def __init__(self, page):
+        """
+        Build the index from the page's words
+
+        Args:
+            page: PDF page object
+        """
+        words = page.get_text("words")
+
+        self.tokens: List[str] = [normalize_search_text(word[4]) for word in words]
+        self.bboxes = np.asarray([word[:4] for word in words], dtype=np.float64).reshape(-1, 4)
+        # (block, line) of every word, for one rectangle per text line
+        self.lines = [(word[5], word[6]) for word in words]
+        self.positions: Dict[str, List[int]] = {}
+        for position, token in enumerate(self.tokens):
+            self.positions.setdefault(token, []).append(position)
+
+    def find_sequence(self, tokens: List[str]) -> List[int]:
+        """
+        Positions of the first word of every occurrence of a token sequence
+
+        Args:
+            tokens: Normalized tokens
+
+        Returns:
+            Word positions in page order
+        """
+        if not tokens:
+            return []
+        length = len(tokens)
+        return [position for position in self.positions.get(tokens[0], [])
+                if self.tokens[position:position + length] == tokens]
+
+    def rects_for_words(self, start: int, end: int) -> List[fitz.Rect]:
+        """
+        Rectangles covering words [start, end), one per text line
+
+        Args:
+            start: First word position
+            end: End word position (exclusive)
+
+        Returns:
+            List of rectangles in reading order
+        """
+        rects, current_line = [], None
+        for position in range(start, end):
+            box = fitz.Rect(*self.bboxes[position])
+            if self.lines[position] == current_line:
+                rects[-1] |= box
+            else:
+                rects.append(box)
+                current_line = self.lines[position]
+        return rects
+
+    def find(self, tokens: List[str], ref_bbox=None, occurrence: int = 0) -> List[fitz.Rect]:
+        """
+        Locate a whole-word token sequence on the page
+
+        With a ref_bbox only occurrences starting inside it are accepted; a
+        miss there (e.g. punctuation glued to the word) is left to the
+        character index, which can match inside words.
+
+        Args:
+            tokens: Normalized tokens of the text
+            ref_bbox: Bounding box of the span the text was extracted from
+            occurrence: Which of the occurrences inside ref_bbox to take (0-based)
+
+        Returns:
+            Rectangles of the chosen occurrence (empty if not found)
+        """
+        hits = self.find_sequence(tokens)
+        if not hits:
+            return []
+
+        best = hits[0]
+        if ref_bbox is not None:
+            rx0, ry0, rx1, ry1 = ref_bbox
+            first_boxes = self.bboxes[hits]
+            cx = (first_boxes[:, 0] + first_boxes[:, 2]) / 2
+            cy = (first_boxes[:, 1] + first_boxes[:, 3]) / 2
+            inside = np.flatnonzero((cx >= rx0) & (cx <= rx1) & (cy >= ry0) & (cy <= ry1))
+            if not inside.size:
+                return []
+            best = hits[int(inside[min(occurrence, inside.size - 1)])]
+
+        return self.rects_for_words(best, best + len(tokens))
+
+
+class PageTextIndexCache:
+    """Small LRU of page indexes (word and character), keyed by document and page number"""
+
+    def __init__(self, max_pages: int = 4):
+        """
+        Initialize PageTextIndexCache
+
+        Args:
+            max_pages: Number of pages whose indexes are kept
+        """
+        self.max_pages = max_pages
+        # page key -> {index class: index}
+        self._indexes: "OrderedDict[tuple, Dict[type, object]]" = OrderedDict()
+
+    def _key(self, page) -> tuple:
+        # Not id(page.parent): ids of closed, collected documents are reused
+        return document_token(page.parent), page.number
+
+    def get(self, page, index_type: type = PageTextIndex):
+        """
+        Get (or build) an index of a page
+
+        Args:
+            page: PDF page object
+            index_type: PageTextIndex or PageWordIndex
+
+        Returns:
+            Index of the page in its current state
+        """
+        key = self._key(page)
+        indexes = self._indexes.get(key)
+        if indexes is None:
+            indexes = self._indexes[key] = {}
+            while len(self._indexes) > self.max_pages:
+                self._indexes.popitem(last=False)
+        else:
+            self._indexes.move_to_end(key)
+
+        index = indexes.get(index_type)
+        if index is None:
+            index = indexes[index_type] = index_type(page)
+        return index
+
+    def discard(self, page) -> None:
+        """Forget a page's indexes (call after modifying the page)"""
+        self._indexes.pop(self._key(page), None)
+
+    def clear(self) -> None:
+        """Forget all indexes"""
+        self._indexes.clear()
@@ -8,10 +8,12 @@ import re
 from typing import List, Dict, Tuple, Optional
 import torch
 from transformers import pipeline
+from pdf.propagation import EntityPropagator
+from pdf.ner_decoder import NERRunner
 
 
 class TextProcessor:
-    def __init__(self, ner_pipeline, validators, organized_data):
+    def __init__(self, ner_pipeline, validators, organized_data, gazetteer=None, ner_runner=None):
         """
         Initialize TextProcessor with required dependencies
         
@@ -19,11 +21,16 @@ class TextProcessor:
             ner_pipeline: Loaded NER model pipeline
             validators: PDFValidators instance with unique replacement system
             organized_data: Organized replacement data
+            gazetteer: Optional GazetteerDetector for known names
+            ner_runner: Optional NERRunner (defaults to running the pipeline per chunk)
         """
         self.logger = logging.getLogger(__name__)
         self.ner_pipeline = ner_pipeline
         self.validators = validators
         self.organized_data = organized_data
+        self.gazetteer = gazetteer
+        self.propagator = EntityPropagator()
+        self.ner_runner = ner_runner or NERRunner(ner_pipeline)
 
     def process_manual_text(self, text: str, confidence_threshold: float, 
                           processing_mode: str) -> Dict:
@@ -249,33 +256,37 @@ class TextProcessor:
             else:
                 chunks = self._split_text_into_chunks(text, max_length)
 
-            # Run NER on each chunk
-            for chunk in chunks:
-                try:
-                    results = self.ner_pipeline(chunk['text'])
-                    
-                    for result in results:
-                        if result['score'] >= confidence_threshold:
-                            entity = {
-                                'entity': self._map_model_label_to_type(result['entity_group']),
-                                'word': result['word'],
-                                'start': chunk['start_offset'] + result['start'],
-                                'end': chunk['start_offset'] + result['end'],
-                                'score': result['score'],
-                                'method': 'custom_ner'
-                            }
-                            entities.append(entity)
-
-                except Exception as e:
-                    self.logger.warning(f"Chunk processing error: {e}")
-                    continue
+            # Run NER on all chunks
+            chunk_results = self.ner_runner.run([chunk['text'] for chunk in chunks])
+
+            for chunk, results in zip(chunks, chunk_results):
+                for result in results:
+                    if result['score'] >= confidence_threshold:
+                        entity = {
+                            'entity': self._map_model_label_to_type(result['entity_group']),
+                            'word': result['word'],
+                            'start': chunk['start_offset'] + result['start'],
+                            'end': chunk['start_offset'] + result['end'],
+                            'score': result['score'],
+                            'method': 'custom_ner'
+                        }
+                        entities.append(entity)
 
             # Add TC Kimlik detection with regex
             tc_entities = self._detect_tc_kimlik(text)
             entities.extend(tc_entities)
 
+            # Add known names from gazetteer lists
+            if self.gazetteer is not None:
+                entities.extend(self.gazetteer.detect(text))
+
             # Clean and merge overlapping entities
             cleaned_entities = self._clean_overlapping_entities(entities)
+
+            # Tag remaining occurrences of the accepted entities
+            propagated_entities = self.propagator.propagate(text, cleaned_entities)
+            if propagated_entities:
+                cleaned_entities = sorted(cleaned_entities + propagated_entities, key=lambda x: x['start'])
             
             self.logger.info(f"Detected {len(cleaned_entities)} entities in text")
             return cleaned_entities
@@ -2,6 +2,7 @@
 PDF Utils Module - Common utilities and helper functions
 """
 import os
+import itertools
 import logging
 import shutil
 from datetime import datetime
@@ -312,4 +313,27 @@ class PDFUtils:
             'entity_types': entity_counts,
             'average_confidence': avg_confidence,
             'timestamp': datetime.now().isoformat()
-        }
\ No newline at end of file
+        }
+
+
+_document_tokens = itertools.count(1)
+
+
+def document_token(doc) -> int:
+    """
+    Identity of an open document for per-document caches
+
+    id(doc) is reused once a closed document is garbage collected, so a
+    counter value is stamped on the document object on first use instead.
+
+    Args:
+        doc: Open fitz.Document
+
+    Returns:
+        Token unique to this document object for the lifetime of the process
+    """
+    token = getattr(doc, '_cache_token', None)
+    if token is None:
+        token = next(_document_tokens)
+        doc._cache_token = token
+    return token
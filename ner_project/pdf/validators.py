@@ -8,6 +8,8 @@ from typing import List, Dict, Optional, Any, Set, Tuple
 from dataclasses import dataclass
 from collections import defaultdict
 
+from pdf.gazetteer import normalize_term
+
 
 @dataclass
 class ReplacementStats:
@@ -21,6 +23,11 @@ class ReplacementStats:
 
 
 class PDFValidators:
+    # Curated list hits, and further occurrences of already accepted entities, are
+    # kept at any model confidence threshold (precision comes from the gazetteer's
+    # stoplist and casing rules)
+    THRESHOLD_EXEMPT_METHODS = frozenset({'gazetteer', 'propagated'})
+
     def __init__(self, organized_data: Dict):
         self.organized_data = organized_data
         self.replacement_cache = {}
@@ -50,22 +57,26 @@ class PDFValidators:
             
         self.logger.info(f"Preprocessed data for {len(self.organized_data)} entity types")
 
-    def apply_replacement_strategy_consistent(self, entities: List[Dict]) -> List[Dict]:
+    def apply_replacement_strategy_consistent(self, entities: List[Dict], reset_usage: bool = True) -> List[Dict]:
         """
         Apply replacement strategy using ONLY custom lists
         Each replacement can only be used once across all entities
         Enhanced with better error handling and statistics
+        reset_usage=False keeps usage tracking across calls (incremental, page-by-page allocation)
         """
         if not entities:
             self.logger.warning("No entities provided for replacement")
             return []
 
         processed_entities = []
-        self.replacement_stats = ReplacementStats()  # Reset stats
         
-        # Reset used replacements for this batch
-        self.used_replacements.clear()
-        self.used_replacements_by_type.clear()
+        if reset_usage:
+            self.replacement_stats = ReplacementStats()  # Reset stats
+
+            # Reset used replacements for this batch
+            self.used_replacements.clear()
+            self.used_replacements_by_type.clear()
+            self.consistent_mappings.clear()
         
         # Group entities by type for better processing
         entities_by_type = defaultdict(list)
@@ -80,7 +91,22 @@ class PDFValidators:
             
             for entity in type_entities:
                 self.replacement_stats.total_processed += 1
+
+                # Repeated occurrences of one original (e.g. propagated ones) share its replacement
+                # Keyed on the normalized form on purpose: variants differing only in casing,
+                # whitespace or Turkish diacritics ("AHMET YILMAZ" / "Ahmet Yılmaz", "IŞIK" / "Işık")
+                # are the same person or company and get one pseudonym
+                mapping_key = (entity_type, normalize_term(entity.get('word') or ''))
+                if mapping_key in self.consistent_mappings:
+                    entity['replacement'] = self.consistent_mappings[mapping_key]
+                    self.replacement_stats.successful_replacements += 1
+                    processed_entities.append(entity)
+                    continue
+
                 processed_entity = self._process_single_entity(entity, entity_type)
+                replacement = processed_entity.get('replacement')
+                if replacement and replacement != processed_entity.get('word', ''):
+                    self.consistent_mappings[mapping_key] = replacement
                 processed_entities.append(processed_entity)
         
         self._log_replacement_statistics()
@@ -446,6 +472,7 @@ class PDFValidators:
         """
         Merge and clean entities, removing overlaps
         Enhanced with better overlap detection and validation
+        Entities found by a THRESHOLD_EXEMPT_METHODS method skip the confidence filter
         """
         if not entities:
             return []
@@ -462,7 +489,8 @@ class PDFValidators:
             start = entity.get('start')
             end = entity.get('end')
             
-            if score >= confidence_threshold and start is not None and end is not None:
+            passes_threshold = score >= confidence_threshold or entity.get('method') in self.THRESHOLD_EXEMPT_METHODS
+            if passes_threshold and start is not None and end is not None:
                 if start < end:  # Valid span
                     filtered_entities.append(entity)
                 else:
@@ -597,9 +625,38 @@ class PDFValidators:
         self.replacement_cache.clear()
         self.used_replacements.clear()
         self.used_replacements_by_type.clear()
+        self.consistent_mappings.clear()
         self.replacement_stats = ReplacementStats()
         self.logger.info("Replacement cache, usage tracking, and statistics cleared")
 
+    def export_replacement_state(self) -> Dict:
+        """
+        Serializable snapshot of the original -> replacement mappings
+
+        Returns:
+            Dict with 'mappings' as [entity_type, original, replacement] lists
+        """
+        return {
+            'mappings': [[entity_type, original, replacement]
+                         for (entity_type, original), replacement in self.consistent_mappings.items()]
+        }
+
+    def restore_replacement_state(self, state: Optional[Dict]) -> None:
+        """
+        Continue from a snapshot taken with export_replacement_state
+
+        Mapped originals keep their replacement and those replacements are
+        marked as used, so they are not handed out to other originals.
+
+        Args:
+            state: Snapshot dict (None clears the state)
+        """
+        self.clear_cache_and_usage()
+        for entity_type, original, replacement in (state or {}).get('mappings', []):
+            self.consistent_mappings[(entity_type, normalize_term(original))] = replacement
+            self.used_replacements.add(replacement.lower())
+            self.used_replacements_by_type[entity_type].add(replacement.lower())
+
     def get_available_replacements_count(self, entity_type: str, length: int) -> int:
         """Get count of available (unused) replacements for given entity type and length"""
         if entity_type not in self.organized_data:
@@ -0,0 +1,209 @@
+"""
+PDF Verify Module - Check outputs for original entity text left in the text layer
+"""
+import time
+import bisect
+import logging
+import fitz  # PyMuPDF
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pdf.gazetteer import AhoCorasickAutomaton, is_word_boundary, normalize_term
+
+logger = logging.getLogger(__name__)
+
+
+class LeakVerifier:
+    """Re-extract an output's text and scan it once for every original entity string"""
+
+    def __init__(self, min_length: int = 3, max_reported: int = 50):
+        """
+        Initialize LeakVerifier
+
+        Args:
+            min_length: Shortest normalized original that is checked (shorter ones match too often)
+            max_reported: Maximum number of individual leaks kept in the report
+        """
+        self.logger = logger
+        self.min_length = min_length
+        self.max_reported = max_reported
+
+    def _patterns(self, words: Iterable[str]) -> Dict[str, str]:
+        """Normalized patterns (with and without spaces) of the given strings, mapped to the string"""
+        patterns = {}
+        for word in words:
+            normalized = normalize_term(word)
+            for variant in (normalized, normalized.replace(' ', '')):
+                if variant:
+                    patterns.setdefault(variant, word)
+        return patterns
+
+    def build_automaton(self, entities: Iterable[Dict]) -> Tuple[AhoCorasickAutomaton, int]:
+        """
+        Build one automaton over all original entity strings
+
+        Each original is added normalized (case, Turkish diacritics, whitespace)
+        and, if it contains spaces, also without them.
+
+        Args:
+            entities: Processed entities with 'word'
+
+        Returns:
+            (AhoCorasickAutomaton with the original text as payload, number of
+            patterns not checked because they are shorter than min_length)
+        """
+        words = {(entity.get('word') or '').strip() for entity in entities}
+        automaton = AhoCorasickAutomaton()
+        skipped = 0
+        for pattern, word in self._patterns(word for word in words if word).items():
+            if len(pattern) < self.min_length:
+                skipped += 1
+                continue
+            automaton.add(pattern, word)
+
+        automaton.build()
+        return automaton, skipped
+
+    def build_replacement_automaton(self, entities: Iterable[Dict]) -> AhoCorasickAutomaton:
+        """
+        Build an automaton over the replacement texts written into the output
+
+        Args:
+            entities: Processed entities with 'word' and 'replacement'
+
+        Returns:
+            AhoCorasickAutomaton matching every replacement text
+        """
+        replacements = set()
+        for entity in entities:
+            replacement = (entity.get('replacement') or '').strip()
+            if replacement and replacement != (entity.get('word') or '').strip():
+                replacements.add(replacement)
+
+        automaton = AhoCorasickAutomaton()
+        for pattern in self._patterns(replacements):
+            automaton.add(pattern, None)
+        automaton.build()
+        return automaton
+
+    @staticmethod
+    def _covered_ranges(text: str, automaton: AhoCorasickAutomaton) -> Tuple[List[int], List[int]]:
+        """
+        Whole-word ranges of text matched by automaton
+
+        Returns:
+            (sorted range starts, running maximum of the range ends), for containment lookups
+        """
+        ranges = sorted((start, end) for start, end, _ in automaton.iter_matches(text)
+                        if is_word_boundary(text, start, end))
+        starts, max_ends, max_end = [], [], -1
+        for start, end in ranges:
+            max_end = max(max_end, end)
+            starts.append(start)
+            max_ends.append(max_end)
+        return starts, max_ends
+
+    @staticmethod
+    def _is_covered(starts: List[int], max_ends: List[int], start: int, end: int) -> bool:
+        """Whether [start, end) lies inside one of the ranges returned by _covered_ranges"""
+        position = bisect.bisect_right(starts, start) - 1
+        return position >= 0 and max_ends[position] >= end
+
+    def verify_document(self, doc, entities: List[Dict]) -> Dict:
+        """
+        Scan every page of an (output) document for original entity text
+
+        Every original is checked. A hit is only ignored when it lies inside
+        text that a replacement wrote (e.g. original "Demir" inside the
+        written replacement "Ozcan Demir").
+
+        Args:
+            doc: Open fitz.Document
+            entities: Processed entities with 'word' and 'replacement'
+
+        Returns:
+            Dict with 'passed', 'patterns', 'skipped_patterns' (too short to check),
+            'pages_checked', 'leak_count', 'ignored_hits' (inside replacement text),
+            'pages' (page numbers with leaks), 'leaks' (first max_reported
+            {'page', 'text'} dicts) and 'seconds'
+        """
+        start = time.perf_counter()
+        automaton, skipped = self.build_automaton(entities)
+        replacement_automaton = self.build_replacement_automaton(entities)
+
+        leaks, leak_pages, leak_count, ignored = [], [], 0, 0
+        if len(automaton):
+            for page_num in range(len(doc)):
+                text = normalize_term(doc.load_page(page_num).get_text("text"))
+                covered = None
+                page_hits = 0
+                for hit_start, hit_end, word in automaton.iter_matches(text):
+                    if not is_word_boundary(text, hit_start, hit_end):
+                        continue
+                    if covered is None:
+                        covered = self._covered_ranges(text, replacement_automaton)
+                    if self._is_covered(*covered, hit_start, hit_end):
+                        ignored += 1
+                        continue
+                    page_hits += 1
+                    if len(leaks) < self.max_reported:
+                        leaks.append({'page': page_num, 'text': word})
+                if page_hits:
+                    leak_pages.append(page_num)
+                    leak_count += page_hits
+
+        report = {
+            'passed': leak_count == 0,
+            'patterns': len(automaton),
+            'skipped_patterns': skipped,
+            'pages_checked': len(doc),
+            'leak_count': leak_count,
+            'ignored_hits': ignored,
+            'pages': leak_pages,
+            'leaks': leaks,
+            'seconds': time.perf_counter() - start
+        }
+
+        if leak_count:
+            self.logger.warning(f"Leak check: {leak_count} original strings remain on pages "
+                                f"{', '.join(str(page + 1) for page in leak_pages[:20])}")
+        else:
+            self.logger.info(f"Leak check passed: {report['patterns']} patterns, "
+                             f"{report['pages_checked']} pages in {report['seconds']:.2f}s "
+                             f"({skipped} too short to check, {ignored} hits inside replacement text)")
+        return report
+
+    def verify_file(self, pdf_path: str, entities: List[Dict]) -> Optional[Dict]:
+        """
+        Verify a saved output PDF
+
+        Args:
+            pdf_path: Output PDF path
+            entities: Processed entities
+
+        Returns:
+            Report dict as returned by verify_document, or None on error
+        """
+        try:
+            with fitz.open(pdf_path) as doc:
+                return self.verify_document(doc, entities)
+        except Exception as e:
+            self.logger.error(f"Leak check error: {e}")
+            return None
+
+    def verify_bytes(self, pdf_bytes: bytes, entities: List[Dict]) -> Optional[Dict]:
+        """
+        Verify an output PDF held in memory
+
+        Args:
+            pdf_bytes: Output PDF contents
+            entities: Processed entities
+
+        Returns:
+            Report dict as returned by verify_document, or None on error
+        """
+        try:
+            with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+                return self.verify_document(doc, entities)
+        except Exception as e:
+            self.logger.error(f"Leak check error: {e}")
+            return None
@@ -20,10 +20,8 @@ excel_file = os.path.join(DATA_DIR, "sikayetvar.xlsx")
 
 lock = threading.Lock()
 
-# (Önceden 'paraler' idi) -> şirket listesi
-sirketler = [
-    "Koç", "Sabancı", "TÜPRAŞ", "BİM", "ASELSAN", "Arçelik", "Vestel", "THY", "Türk Telekom", "Turkcell","LC Waikiki", "Migros", "Ford", "TOFAŞ", "Anadolu Efes", "Şişecam", "Eczacıbaşı", "Ziraat", "Garanti","Akbank", "İş Bankası", "Yapı Kredi", "Halkbank", "QNB", "VakıfBank", "Opet", "Petrol Ofisi","Enka", "Doğuş", "Çalık", "Limak", "Rönesans", "MNG", "Trendyol", "Hepsiburada", "Getir", "Yemeksepeti","Pegasus", "SunExpress", "Baykar", "Roketsan", "Havelsan", "Otokar", "BMC", "Temsa", "Koton", "Defacto","Penti", "Mavi", "FLO", "Vatan", "Teknosa", "Sahibinden", "N11", "Morhipo", "Boyner", "Watsons","Gratis", "A101", "Şok", "Metro", "CarrefourSA", "LCW", "Zorlu", "Doğan", "Alarko", "Borusan","Eren", "Demirören", "Cengiz", "Kolin", "Nurol", "OYAK", "Kale", "TAV", "İGA", "Sabiha","Eti", "Ülker", "Pınar", "Sütaş", "Torku", "Banvit", "Namet", "Tat", "Dardanel", "Arzum","Fakir", "Korkmaz", "Simfer", "Vitra", "Artema", "Bosch", "Siemens", "Mercedes", "MAN"
-]
+# (Önceden 'paraler' idi) -> şirket listesi, samplelists.py içinde tutulur
+from samplelists import sirketler
 
 # --- Excel Yardımcıları ---
 def init_excel():
@@ -37,6 +37,11 @@ iban_samples = [
     "TR330006100519786457841326", "TR640004600119786543210987", "TR750001500658742039485760", "TR860010005018765432109876", "TR970006200119874563201234", "TR180009900658741250963847", "TR290001200519632540789513", "TR400010100119753951486270", "TR510006400658987654321098", "TR620004800519874563201357", "TR730001700119654783921046", "TR840009800658741852963047", "TR950006300519987654321579", "TR060010200119753846291570", "TR170001600658852741963048", "TR280009700519741963085274", "TR390006500119863529471604", "TR500004900658741963852074", "TR610001800519654387291046", "TR720010300119741852963074", "TR830006600658987321456078", "TR940009600519852741963047", "TR050001900119654789321046", "TR160010400658741963852074", "TR270006700519987654123578", "TR380004700119852963741046", "TR490002000658741963852074", "TR600009500519654789321046", "TR710006800119852741963074", "TR820010500658987654321078", "TR930001100519741963852074", "TR040009400119654789321046", "TR150006900658852741963074", "TR260002100519987321456078", "TR370004600119741963852074", "TR480010600658654789321046", "TR590009300519852741963074", "TR700007000119987654321078", "TR810001300658741963852074", "TR920009200519654789321046", "TR030010700119852741963074", "TR140007100658987321456078", "TR250002200519741963852074", "TR360004500119654789321046", "TR470009100658852741963074", "TR580007200119987321456078", "TR690010800519741963852074", "TR800001400658654789321046", "TR910009000119852741963074", "TR020007300658987321456078", "TR130002300519741963852074"
 ]
 
+# Sikayet toplama ve gazetteer taramasi icin kullanilan sirket listesi
+sirketler = [
+    "Koç", "Sabancı", "TÜPRAŞ", "BİM", "ASELSAN", "Arçelik", "Vestel", "THY", "Türk Telekom", "Turkcell","LC Waikiki", "Migros", "Ford", "TOFAŞ", "Anadolu Efes", "Şişecam", "Eczacıbaşı", "Ziraat", "Garanti","Akbank", "İş Bankası", "Yapı Kredi", "Halkbank", "QNB", "VakıfBank", "Opet", "Petrol Ofisi","Enka", "Doğuş", "Çalık", "Limak", "Rönesans", "MNG", "Trendyol", "Hepsiburada", "Getir", "Yemeksepeti","Pegasus", "SunExpress", "Baykar", "Roketsan", "Havelsan", "Otokar", "BMC", "Temsa", "Koton", "Defacto","Penti", "Mavi", "FLO", "Vatan", "Teknosa", "Sahibinden", "N11", "Morhipo", "Boyner", "Watsons","Gratis", "A101", "Şok", "Metro", "CarrefourSA", "LCW", "Zorlu", "Doğan", "Alarko", "Borusan","Eren", "Demirören", "Cengiz", "Kolin", "Nurol", "OYAK", "Kale", "TAV", "İGA", "Sabiha","Eti", "Ülker", "Pınar", "Sütaş", "Torku", "Banvit", "Namet", "Tat", "Dardanel", "Arzum","Fakir", "Korkmaz", "Simfer", "Vitra", "Artema", "Bosch", "Siemens", "Mercedes", "MAN"
+]
+
 # --- 2. UZUNLUK BAZLI LISTELER (DOgRU FORMATTA VE DOgRU UZUNLUKLARLA) ---
 # Bu listeler, kodunuzun beklentisine uygun olarak "sozluk listesi" formatindadir.
 
@@ -0,0 +1,107 @@
+"""
+Tests for pdf.checkpoint - persisting and resuming page-range progress
+"""
+import json
+
+import numpy as np
+import pytest
+
+from pdf.checkpoint import ProcessingCheckpoint
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    return ProcessingCheckpoint(str(tmp_path / 'job.checkpoint.json'), 'abc123', 'replace', 0.7,
+                                page_count=4, work_base=str(tmp_path / 'job.work'))
+
+
+def _entity(page, word, replacement):
+    return {'entity': 'ad_soyad', 'word': word, 'replacement': replacement, 'score': np.float32(0.91),
+            'method': 'model', 'start': 0, 'end': len(word), 'text_block_info': {'page': page, 'bbox': (0, 0, 1, 1)}}
+
+
+def test_round_trip(checkpoint):
+    state = {'mappings': [['ad_soyad', 'ahmet yilmaz', 'Kadir Sonmez']]}
+    checkpoint.record_pages([0, 1], [_entity(0, 'Ahmet Yilmaz', 'Kadir Sonmez'), _entity(1, 'Ayse Kaya', 'Elif Demir')],
+                            {0: 1, 1: 1}, state)
+    checkpoint.save()
+
+    loaded = ProcessingCheckpoint.load(checkpoint.path)
+
+    assert loaded.matches('abc123', 'replace', 0.7)
+    assert not loaded.matches('abc123', 'censor', 0.7)
+    assert loaded.completed_pages == 2
+    assert loaded.is_done(1) and not loaded.is_done(2)
+    assert not loaded.complete
+    assert loaded.total_changes() == 2
+    assert loaded.replacement_state == state
+    assert loaded.work_path == checkpoint.work_path
+    assert loaded.work_version == 0
+    assert [(e['page'], e['word'], e['replacement']) for e in loaded.all_entities()] == [
+        (0, 'Ahmet Yilmaz', 'Kadir Sonmez'), (1, 'Ayse Kaya', 'Elif Demir')]
+    assert loaded.all_entities()[0]['score'] == pytest.approx(0.91)
+
+
+def test_only_entity_keys_are_stored(checkpoint):
+    checkpoint.record_pages([0], [_entity(0, 'Ahmet Yilmaz', 'Kadir Sonmez')], {0: 1}, {})
+    checkpoint.save()
+
+    with open(checkpoint.path, encoding='utf-8') as f:
+        stored = json.load(f)['pages']['0']['entities'][0]
+
+    assert set(stored) == {'entity', 'word', 'replacement', 'score', 'method'}
+
+
+def test_pages_without_entities_count_as_done(checkpoint):
+    checkpoint.record_pages([0, 1, 2, 3], [], {}, {})
+
+    assert checkpoint.complete
+    assert checkpoint.total_changes() == 0
+
+
+def test_missing_or_broken_files_are_ignored(tmp_path):
+    assert ProcessingCheckpoint.load(str(tmp_path / 'missing.json')) is None
+
+    broken = tmp_path / 'broken.json'
+    broken.write_text('{"version": 2, "input_hash"', encoding='utf-8')
+    assert ProcessingCheckpoint.load(str(broken)) is None
+
+
+def test_other_versions_are_ignored(checkpoint):
+    checkpoint.save()
+    with open(checkpoint.path, encoding='utf-8') as f:
+        data = json.load(f)
+    data['version'] = ProcessingCheckpoint.VERSION + 1
+    with open(checkpoint.path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+    assert ProcessingCheckpoint.load(checkpoint.path) is None
+
+
+def test_work_version_changes_only_with_recorded_pages(checkpoint, tmp_path):
+    checkpoint.save()
+    assert checkpoint.next_work_path == str(tmp_path / 'job.work.1.pdf')
+
+    # A newer work copy written before a crash is not referenced by the saved checkpoint
+    checkpoint.record_pages([0], [], {0: 1}, {}, work_version=1)
+    assert ProcessingCheckpoint.load(checkpoint.path).work_path == str(tmp_path / 'job.work.0.pdf')
+
+    checkpoint.save()
+    loaded = ProcessingCheckpoint.load(checkpoint.path)
+    assert loaded.work_path == str(tmp_path / 'job.work.1.pdf')
+    assert loaded.is_done(0)
+
+    # Pages without changes keep the current work copy
+    loaded.record_pages([1], [], {}, {})
+    assert loaded.work_version == 1
+
+
+def test_remove_deletes_checkpoint_and_work_files(checkpoint, tmp_path):
+    checkpoint.record_pages([0], [], {0: 1}, {}, work_version=1)
+    checkpoint.save()
+    for version in (0, 1, 2):
+        (tmp_path / f'job.work.{version}.pdf').write_bytes(b'%PDF-1.7')
+
+    checkpoint.remove()
+
+    assert [path.name for path in tmp_path.iterdir()] == []
@@ -0,0 +1,65 @@
+"""
+Tests for pdf.ner_cache.ChunkResultCache - chunk-level NER results for repeated text
+"""
+import unicodedata
+
+from pdf.ner_cache import ChunkResultCache
+
+RESULTS = [{'entity_group': 'PER', 'score': 0.98, 'start': 0, 'end': 4, 'word': 'Şule'}]
+
+
+def test_chunk_cache_hit_and_miss():
+    cache = ChunkResultCache(model_version='m1')
+
+    assert cache.get('Şule geldi') is None
+    cache.put('Şule geldi', RESULTS)
+    results = cache.get('Şule geldi')
+
+    assert results == [{'entity_group': 'PER', 'score': 0.98, 'start': 0, 'end': 4, 'word': 'Şule'}]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_chunk_cache_key_includes_model_version():
+    cache = ChunkResultCache(model_version='m1')
+    cache.put('Şule geldi', RESULTS)
+    cache.model_version = 'm2'
+
+    assert cache.get('Şule geldi') is None
+
+
+def test_length_mismatch_counts_as_miss():
+    cache = ChunkResultCache()
+    cache.put('Şule geldi', RESULTS)
+    decomposed = unicodedata.normalize('NFD', 'Şule geldi')
+
+    assert cache.make_key(decomposed) == cache.make_key('Şule geldi')
+    assert cache.get(decomposed) is None
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    # Results of the decomposed text replace the stale entry
+    cache.put(decomposed, [{'entity_group': 'PER', 'score': 0.9, 'start': 0, 'end': 5}])
+    assert cache.get(decomposed)[0]['word'] == decomposed[:5]
+    assert cache.hits == 1
+
+
+def test_lru_eviction_updates_memory():
+    cache = ChunkResultCache(max_entries=2)
+    for text in ('a b', 'c d', 'e f'):
+        cache.put(text, RESULTS)
+
+    assert cache.get('a b') is None
+    assert cache.get('e f') is not None
+    assert len(cache._entries) == 2
+    assert cache.memory_bytes == sum(cache._entry_sizes.values())
+
+
+def test_disk_store_survives_restart(tmp_path):
+    path = str(tmp_path / 'chunks.sqlite')
+    ChunkResultCache(model_version='m1', disk_path=path).put('Şule geldi', RESULTS)
+
+    cache = ChunkResultCache(model_version='m1', disk_path=path)
+
+    assert cache.get('Şule geldi')[0]['word'] == 'Şule'
+    assert (cache.hits, cache.disk_hits) == (1, 1)
+    assert cache.get('Şule geldi') is not None
+    assert (cache.hits, cache.disk_hits) == (2, 1)
@@ -0,0 +1,45 @@
+"""
+Tests for pdf.fonts - glyph advance tables and base-14 fallbacks
+"""
+import fitz  # PyMuPDF
+import pytest
+
+from pdf.fonts import FLAG_BOLD, FLAG_ITALIC, FLAG_SERIFED, FontMetrics, FontMetricsCache, base14_fallback, font_key
+
+
+@pytest.mark.parametrize('text', ['', 'Ahmet Yılmaz', 'ŞĞÜİÖÇ şğüıöç', 'Ω € ≥ x'])
+def test_text_width_matches_fitz(text):
+    font = fitz.Font('helv')
+    metrics = FontMetrics(font, 'helv')
+
+    assert metrics.text_width(text, 11) == pytest.approx(font.text_length(text, fontsize=11))
+
+
+def test_covers_turkish_letters_and_rejects_missing_glyphs():
+    metrics = FontMetrics(fitz.Font('helv'), 'helv')
+
+    assert metrics.covers('Işık Ğüneş')
+    assert not metrics.covers('日本')
+
+
+def test_base14_metrics_are_cached():
+    cache = FontMetricsCache()
+
+    assert cache.get_base14('tibo') is cache.get_base14('tibo')
+    assert cache.get_base14('tibo') is not cache.get_base14('helv')
+
+
+@pytest.mark.parametrize('name, flags, expected', [
+    ('ABCDEF+Arial-BoldMT', 0, 'hebo'),
+    ('TimesNewRomanPS-ItalicMT', 0, 'tiit'),
+    ('CourierNew', 0, 'cour'),
+    ('Calibri', FLAG_BOLD | FLAG_ITALIC, 'hebi'),
+    ('Unknown', FLAG_SERIFED, 'tiro'),
+    ('DejaVuSans', FLAG_SERIFED, 'helv'),
+])
+def test_base14_fallback(name, flags, expected):
+    assert base14_fallback(name, flags) == expected
+
+
+def test_font_key_ignores_subset_tags_and_regular_suffixes():
+    assert font_key('ABCDEF+DejaVuSerif') == font_key('DejaVu Serif Book') == font_key('DejaVuSerif')
@@ -0,0 +1,76 @@
+"""
+Tests for entities that cross text spans (wrapped lines, font changes, page breaks)
+"""
+import fitz  # PyMuPDF
+import pytest
+
+from pdf.extractor import PDFExtractor
+
+
+@pytest.fixture
+def doc():
+    document = fitz.open()
+    page = document.new_page()
+    page.insert_text((72, 72), "Sozlesmeyi imzalayan Ahmet", fontsize=11)
+    page.insert_text((72, 100), "Yilmaz ve tanik", fontsize=11)
+    page.insert_text((72, 140), "Musteri:", fontsize=11)
+    page.insert_text((120, 140), "Ayse Kaya", fontsize=11, fontname="hebo")
+    page.insert_text((72, 800), "Son satirda Mehmet", fontsize=11)
+    document.new_page().insert_text((72, 72), "Demir imzasi", fontsize=11)
+    document = fitz.open("pdf", document.tobytes())
+    yield document
+    document.close()
+
+
+def _entity(extractor, text_blocks, word):
+    full_text = text_blocks.full_text
+    start = full_text.index(word)
+    return {'entity': 'ad_soyad', 'word': word, 'start': start, 'end': start + len(word),
+            'text_block_info': extractor.find_text_block_for_position(start, start + len(word),
+                                                                      text_blocks, full_text)}
+
+
+def test_fragments_hold_their_own_part_of_the_range(doc):
+    extractor = PDFExtractor()
+    text_blocks = extractor.extract_text_with_positions(doc)
+
+    info = _entity(extractor, text_blocks, 'Ahmet Yilmaz')['text_block_info']
+
+    fragments = info['fragments']
+    assert [f['block_text'][f['relative_start']:f['relative_end']] for f in fragments] == ['Ahmet', 'Yilmaz']
+    assert info['bbox'] == fragments[0]['bbox']
+
+
+def test_entity_on_two_lines_gets_one_rect_per_line(doc):
+    extractor = PDFExtractor()
+    text_blocks = extractor.extract_text_with_positions(doc)
+
+    rects = extractor.locate_entity_rects(doc[0], _entity(extractor, text_blocks, 'Ahmet Yilmaz'))
+
+    assert len(rects) == 2
+    assert rects[0].y1 < rects[1].y1
+    assert doc[0].get_textbox(rects[0]).strip().endswith('Ahmet')
+    assert doc[0].get_textbox(rects[1]).strip().startswith('Yilmaz')
+
+
+def test_font_change_inside_an_entity(doc):
+    extractor = PDFExtractor()
+    text_blocks = extractor.extract_text_with_positions(doc)
+    entity = _entity(extractor, text_blocks, 'Musteri: Ayse Kaya')
+
+    fonts = {fragment['font'] for fragment in entity['text_block_info']['fragments']}
+    rects = extractor.locate_entity_rects(doc[0], entity)
+
+    assert len(fonts) == 2
+    assert len(rects) == 2 and all(130 < rect.y1 < 145 for rect in rects)
+
+
+def test_entity_crossing_a_page_break_is_located_on_both_pages(doc):
+    extractor = PDFExtractor()
+    text_blocks = extractor.extract_text_with_positions(doc)
+    entity = _entity(extractor, text_blocks, 'Mehmet Demir')
+
+    assert entity['text_block_info']['page'] == 0
+    assert [f['page'] for f in entity['text_block_info']['fragments']] == [0, 1]
+    assert doc[0].get_textbox(extractor.locate_entity_rects(doc[0], entity)[0]).strip().endswith('Mehmet')
+    assert doc[1].get_textbox(extractor.locate_entity_rects(doc[1], entity)[0]).strip().startswith('Demir')
@@ -0,0 +1,121 @@
+"""
+Tests for pdf.gazetteer - Aho-Corasick matching, Turkish folding and casing rules
+"""
+import pytest
+
+from pdf.gazetteer import (AhoCorasickAutomaton, GazetteerDetector, normalize_term,
+                           normalize_with_offsets, turkish_casefold)
+from pdf.validators import PDFValidators
+
+
+def test_automaton_reports_overlapping_patterns():
+    automaton = AhoCorasickAutomaton()
+    for pattern in ('he', 'she', 'his', 'hers'):
+        automaton.add(pattern, pattern)
+
+    matches = sorted(automaton.iter_matches('ushers'))
+
+    assert matches == [(1, 4, 'she'), (2, 4, 'he'), (2, 6, 'hers')]
+
+
+def test_automaton_rebuilds_after_new_patterns():
+    automaton = AhoCorasickAutomaton()
+    automaton.add('abc', 1)
+    assert list(automaton.iter_matches('xabcx')) == [(1, 4, 1)]
+
+    automaton.add('bc', 2)
+    assert sorted(automaton.iter_matches('xabcx')) == [(1, 4, 1), (2, 4, 2)]
+    assert len(automaton) == 2
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('İSTANBUL', 'istanbul'),
+    ('IŞIK', 'isik'),
+    ('Çağlar Güneş', 'caglar gunes'),
+    ('ırmak', 'irmak'),
+])
+def test_turkish_casefold(text, expected):
+    folded = turkish_casefold(text)
+
+    assert folded == expected
+    assert len(folded) == len(text)
+
+
+def test_turkish_casefold_without_ascii_folding():
+    assert turkish_casefold('IŞIK', ascii_fold=False) == 'ışık'
+
+
+def test_normalize_with_offsets_collapses_whitespace():
+    normalized, offsets = normalize_with_offsets('  Ahmet \n  YILMAZ ')
+
+    assert normalized == 'ahmet yilmaz'
+    assert len(offsets) == len(normalized)
+    assert offsets[0] == 2
+    assert offsets[normalized.index('y')] == 11
+
+
+def test_normalize_term_matches_document_text():
+    assert normalize_term('Arçelik  A.Ş.') == normalize_term('ARCELIK A.S.')
+
+
+@pytest.fixture
+def detector():
+    detector = GazetteerDetector()
+    detector.add_terms('sirket', ['Arçelik A.Ş.', 'Vestel', 'BIM', 'Getir'])
+    detector.add_terms('ad_soyad', ['Ahmet Yılmaz'])
+    return detector
+
+
+def test_detect_maps_offsets_to_original_text(detector):
+    text = 'Sözleşme ARCELIK  A.S. ile yapıldı.'
+    entities = detector.detect(text)
+
+    assert [(e['entity'], e['word']) for e in entities] == [('sirket', 'ARCELIK  A.S.')]
+    entity = entities[0]
+    assert text[entity['start']:entity['end']] == entity['word']
+    assert entity['method'] == 'gazetteer'
+
+
+def test_detect_requires_word_boundaries(detector):
+    assert detector.detect('Vesteller ve Vestelci') == []
+
+
+def test_stoplisted_single_words_are_not_added(detector):
+    assert 'getir' not in detector.terms['sirket']
+    assert detector.detect('Lütfen Getir ve götür.') == []
+
+
+def test_short_terms_match_only_in_capitals(detector):
+    words = [e['word'] for e in detector.detect('BIM, BİM ve bim')]
+
+    assert words == ['BIM', 'BİM']
+
+
+def test_single_word_terms_need_an_initial_capital(detector):
+    words = [e['word'] for e in detector.detect('Vestel ile vestel')]
+
+    assert words == ['Vestel']
+
+
+def test_multi_word_terms_match_any_casing(detector):
+    entities = detector.detect('ahmet yilmaz ve AHMET YILMAZ')
+
+    assert [e['word'] for e in entities] == ['ahmet yilmaz', 'AHMET YILMAZ']
+    assert not any(e['case_sensitive'] for e in entities)
+
+
+def test_single_word_matches_are_flagged_case_sensitive(detector):
+    entity = detector.detect('Vestel')[0]
+
+    assert entity['case_sensitive'] is True
+
+
+def test_list_hits_are_kept_at_any_model_threshold(detector):
+    text = 'Vestel ile ARCELIK A.S. anlaşması, model adayı: Mehmet'
+    entities = detector.detect(text) + [
+        {'entity': 'ad_soyad', 'word': 'Mehmet', 'start': 48, 'end': 54, 'score': 0.65, 'method': 'custom_ner'}
+    ]
+
+    kept = PDFValidators({}).merge_and_clean_entities(entities, confidence_threshold=0.9)
+
+    assert [e['word'] for e in kept] == ['Vestel', 'ARCELIK A.S.']
@@ -0,0 +1,51 @@
+"""
+Tests for pdf.geometry - merging redaction rectangles
+"""
+import fitz  # PyMuPDF
+
+from pdf.geometry import _drop_contained, coalesce_rects
+
+
+def test_touching_rects_on_one_line_are_merged():
+    merged = coalesce_rects([(10, 10, 50, 22), (50.3, 10, 90, 22), (89, 10.5, 120, 22.5)])
+
+    assert merged == [fitz.Rect(10, 10, 120, 22.5)]
+
+
+def test_rects_with_a_gap_stay_separate():
+    merged = coalesce_rects([(10, 10, 50, 22), (52, 10, 90, 22)])
+
+    assert merged == [fitz.Rect(10, 10, 50, 22), fitz.Rect(52, 10, 90, 22)]
+
+
+def test_rects_on_different_lines_stay_separate():
+    merged = coalesce_rects([(10, 24, 50, 36), (10, 10, 50, 22), (50, 24, 80, 36)])
+
+    assert merged == [fitz.Rect(10, 10, 50, 22), fitz.Rect(10, 24, 80, 36)]
+
+
+def test_empty_and_missing_rects_are_ignored():
+    merged = coalesce_rects([None, (10, 10, 10, 22), (20, 10, 30, 22)])
+
+    assert merged == [fitz.Rect(20, 10, 30, 22)]
+
+
+def test_contained_rects_are_dropped():
+    merged = coalesce_rects([(10, 8, 100, 30), (20, 15, 40, 25)])
+
+    assert merged == [fitz.Rect(10, 8, 100, 30)]
+
+
+def test_drop_contained_keeps_one_of_identical_rects():
+    rects = [fitz.Rect(0, 0, 10, 10), fitz.Rect(0, 0, 10, 10), fitz.Rect(2, 2, 5, 5), fitz.Rect(20, 0, 30, 10)]
+
+    kept = _drop_contained(rects)
+
+    assert kept == [fitz.Rect(0, 0, 10, 10), fitz.Rect(20, 0, 30, 10)]
+    assert kept[0] is rects[0]
+
+
+def test_drop_contained_keeps_partial_overlaps():
+    rects = [fitz.Rect(0, 0, 10, 10), fitz.Rect(5, 5, 15, 15)]
+
+    assert _drop_contained(rects) == rects
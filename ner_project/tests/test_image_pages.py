@@ -0,0 +1,50 @@
+"""
+Tests for image-only (scanned) page detection in pdf.extractor
+"""
+import fitz  # PyMuPDF
+import pytest
+
+from pdf.extractor import PDFExtractor
+
+
+def _png(width=40, height=40):
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, width, height), False)
+    pixmap.clear_with(200)
+    return pixmap.tobytes('png')
+
+
+@pytest.fixture
+def pdf_bytes():
+    doc = fitz.open()
+    text_page = doc.new_page()                                    # 0: text only
+    text_page.insert_text((72, 72), "Ahmet Yilmaz", fontsize=11)
+    doc.new_page().insert_image(fitz.Rect(0, 0, 595, 842), stream=_png())       # 1: full-page scan
+    doc.new_page().insert_image(fitz.Rect(0, 0, 100, 100), stream=_png())       # 2: small logo only
+    doc.new_page()                                                # 3: blank
+    captioned = doc.new_page()                                    # 4: scan with a text layer
+    captioned.insert_image(fitz.Rect(0, 0, 595, 842), stream=_png())
+    captioned.insert_text((72, 72), "OCR metni", fontsize=11)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_only_text_less_scans_are_image_only(pdf_bytes):
+    text_blocks = PDFExtractor().extract_text_with_positions(pdf_bytes)
+
+    assert text_blocks.image_only_pages == [1]
+    assert sorted(set(int(page) for page in text_blocks.page)) == [0, 4]
+
+
+def test_coverage_threshold_is_configurable(pdf_bytes):
+    extractor = PDFExtractor(image_page_min_coverage=0.01)
+
+    assert extractor.extract_text_with_positions(pdf_bytes).image_only_pages == [1, 2]
+
+
+def test_image_coverage(pdf_bytes):
+    extractor = PDFExtractor()
+    with fitz.open(stream=pdf_bytes, filetype='pdf') as doc:
+        assert extractor.image_coverage(doc[1]) == pytest.approx(1.0)
+        assert extractor.image_coverage(doc[2]) == pytest.approx(100 * 100 / (595 * 842))
+        assert extractor.image_coverage(doc[3]) == 0.0
@@ -0,0 +1,61 @@
+"""
+Tests for the in-memory document path - one fitz.Document from upload bytes to output bytes
+"""
+import fitz  # PyMuPDF
+
+from pdf.extractor import PDFExtractor
+from pdf.replace import PDFReplacer
+
+
+def _pdf_bytes(page_count=3):
+    doc = fitz.open()
+    for page_num in range(page_count):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Sayfa {page_num}: Ahmet Yilmaz", fontsize=11)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_extracting_an_open_document_matches_bytes_and_leaves_it_open():
+    data = _pdf_bytes()
+    extractor = PDFExtractor()
+    doc = fitz.open(stream=data, filetype='pdf')
+
+    from_doc = extractor.extract_text_with_positions(doc)
+    from_bytes = extractor.extract_text_with_positions(data)
+
+    assert not doc.is_closed
+    assert from_doc.full_text == from_bytes.full_text
+    assert [b['bbox'] for b in from_doc] == [b['bbox'] for b in from_bytes]
+    doc.close()
+
+
+def test_replace_and_serialize_without_touching_disk(tmp_path, monkeypatch):
+    data = _pdf_bytes()
+    extractor, replacer = PDFExtractor(), PDFReplacer()
+    doc = fitz.open(stream=data, filetype='pdf')
+    text_blocks = extractor.extract_text_with_positions(doc)
+    full_text = text_blocks.full_text
+
+    entities = []
+    start = full_text.find('Ahmet Yilmaz')
+    while start >= 0:
+        entities.append({
+            'entity': 'ad_soyad', 'word': 'Ahmet Yilmaz', 'replacement': 'Kadir Sonmez',
+            'start': start, 'end': start + 12, 'score': 0.9,
+            'text_block_info': extractor.find_text_block_for_position(start, start + 12, text_blocks, full_text)
+        })
+        start = full_text.find('Ahmet Yilmaz', start + 1)
+
+    monkeypatch.chdir(tmp_path)
+    changes = replacer.apply_replacements(doc, entities, extractor, source=data)
+    output, stats = replacer.saver.to_bytes(doc, replacer.saver.resolve_profile(secure=True))
+    doc.close()
+
+    assert changes == 3
+    assert stats['bytes'] == len(output)
+    assert list(tmp_path.iterdir()) == []
+    with fitz.open(stream=output, filetype='pdf') as result:
+        text = ''.join(page.get_text() for page in result)
+    assert text.count('Kadir Sonmez') == 3 and 'Ahmet Yilmaz' not in text
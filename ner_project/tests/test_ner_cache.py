@@ -0,0 +1,103 @@
+"""
+Tests for pdf.ner_cache - per-document detection cache and file hashes
+"""
+import os
+
+import pytest
+
+from pdf.ner_cache import DetectionCache, FileHashCache, compute_file_hash, copy_entities
+
+
+def _candidate(score, page=0):
+    return {'entity': 'ad_soyad', 'word': 'Ahmet', 'score': score,
+            'repeat_group': {'rects': None},
+            'text_block_info': {'page': page, 'fragments': [{'page': page}]}}
+
+
+@pytest.fixture
+def detection_cache():
+    cache = DetectionCache()
+    cache.put('doc', [], 'Ahmet', [_candidate(score) for score in (0.05, 0.3, 0.55, 0.7, 0.95, 1.0)])
+    return cache
+
+
+def test_cached_candidates_are_independent_copies(detection_cache):
+    candidates = detection_cache.get('doc')['candidates']
+    candidates[0]['text_block_info']['rects'] = [(0, 0, 1, 1)]
+    candidates[0]['text_block_info']['fragments'][0]['rects'] = [(0, 0, 1, 1)]
+    candidates[0]['repeat_group']['rects'] = [(0, 0, 1, 1)]
+
+    fresh = detection_cache.get('doc')['candidates'][0]
+
+    assert 'rects' not in fresh['text_block_info']
+    assert 'rects' not in fresh['text_block_info']['fragments'][0]
+    assert fresh['repeat_group']['rects'] is None
+
+
+def test_previews_are_copied(detection_cache):
+    entities = [_candidate(0.9)]
+    detection_cache.put_preview('doc', 0.7, entities)
+    entities[0]['text_block_info']['rects'] = [(0, 0, 1, 1)]
+
+    preview = detection_cache.get_preview('doc', 0.7)
+
+    assert 'rects' not in preview[0]['text_block_info']
+    assert detection_cache.get_preview('doc', 0.5) is None
+
+
+def test_entity_counts_are_computed_once_per_document(detection_cache):
+    calls = []
+
+    def count_entities(threshold):
+        calls.append(threshold)
+        return sum(c['score'] >= threshold for c in detection_cache.get('doc')['candidates'])
+
+    counts = detection_cache.entity_counts('doc', [0.1, 0.7, 1.0], count_entities)
+    again = detection_cache.entity_counts('doc', [0.1, 0.7, 1.0], count_entities)
+
+    assert counts == again == {0.1: 5, 0.7: 3, 1.0: 1}
+    assert calls == [0.1, 0.7, 1.0]
+    assert detection_cache.entity_counts('other', [0.1], count_entities) == {}
+
+
+def test_entity_counts_are_dropped_with_the_document(detection_cache):
+    detection_cache.entity_counts('doc', [0.5], lambda threshold: 1)
+    detection_cache.put('doc', [], 'Ahmet', [])
+
+    assert detection_cache.entity_counts('doc', [0.5], lambda threshold: 0) == {0.5: 0}
+
+
+def test_file_hash_is_reused_until_the_file_changes(tmp_path, monkeypatch):
+    path = tmp_path / 'input.pdf'
+    path.write_bytes(b'%PDF-1.7 one')
+    hashes = FileHashCache()
+    first = hashes.get(str(path))
+
+    reads = []
+    monkeypatch.setattr('pdf.ner_cache.compute_file_hash', lambda p: reads.append(p) or compute_file_hash(p))
+    assert hashes.get(str(path)) == first
+    assert reads == []
+
+    path.write_bytes(b'%PDF-1.7 two, longer')
+    os.utime(path, ns=(1, 1))
+    assert hashes.get(str(path)) == compute_file_hash(str(path)) != first
+    assert len(reads) == 1
+
+
+def test_copies_keep_shared_repeat_groups_shared():
+    group = {'rects': None}
+    header = _candidate(0.9, page=0)
+    header['repeat_group'] = group
+    copy_on_page_1 = _candidate(0.9, page=1)
+    copy_on_page_1['repeat_group'] = group
+    copy_on_page_1['text_block_info']['repeat_group'] = header['text_block_info']['repeat_group'] = group
+
+    copied = copy_entities([header, copy_on_page_1])
+
+    assert copied[0]['repeat_group'] is copied[1]['repeat_group']
+    assert copied[0]['text_block_info']['repeat_group'] is copied[1]['text_block_info']['repeat_group']
+    assert copied[0]['repeat_group'] is not group
+
+    copied[0]['text_block_info']['repeat_group']['rects'] = [(0, 0, 1, 1)]
+    assert copied[1]['text_block_info']['repeat_group']['rects'] == [(0, 0, 1, 1)]
+    assert group['rects'] is None
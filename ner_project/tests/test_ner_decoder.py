@@ -0,0 +1,67 @@
+"""
+Tests for pdf.ner_decoder - vectorised BIO grouping over token offsets
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+
+from pdf.ner_decoder import FastNERDecoder
+
+ID2LABEL = {0: 'O', 1: 'B-PER', 2: 'I-PER', 3: 'B-ORG', 4: 'I-ORG'}
+
+
+def _decoder():
+    decoder = FastNERDecoder.__new__(FastNERDecoder)
+    decoder._build_label_tables(ID2LABEL)
+    return decoder
+
+
+def _probs(label_ids, confidence=0.9):
+    """One-hot-ish probabilities with the given argmax per token"""
+    probs = np.full((len(label_ids), len(ID2LABEL)), (1 - confidence) / (len(ID2LABEL) - 1))
+    probs[np.arange(len(label_ids)), label_ids] = confidence
+    return probs
+
+
+def test_groups_bio_tags_into_character_spans():
+    # "Ahmet Yılmaz Vestel de"
+    offsets = np.array([[0, 5], [6, 12], [13, 19], [20, 22]])
+    probs = _probs([1, 2, 3, 0])
+    valid = np.ones(4, dtype=bool)
+
+    starts, ends, labels, scores = _decoder()._group_spans(probs, offsets, valid)
+
+    assert starts.tolist() == [0, 13]
+    assert ends.tolist() == [12, 19]
+    assert labels.tolist() == ['PER', 'ORG']
+    assert np.allclose(scores, 0.9)
+
+
+def test_begin_tag_splits_adjacent_entities():
+    offsets = np.array([[0, 5], [6, 11]])
+    starts, ends, labels, _ = _decoder()._group_spans(_probs([1, 1]), offsets, np.ones(2, dtype=bool))
+
+    assert list(zip(starts.tolist(), ends.tolist())) == [(0, 5), (6, 11)]
+    assert labels.tolist() == ['PER', 'PER']
+
+
+def test_invalid_tokens_are_ignored_and_scores_averaged():
+    # Special token first, sub-word continuation in the middle
+    offsets = np.array([[0, 0], [0, 3], [3, 6], [7, 9]])
+    probs = _probs([1, 1, 2, 0])
+    probs[2] = _probs([2], confidence=0.7)[0]
+    valid = np.array([False, True, True, True])
+
+    starts, ends, labels, scores = _decoder()._group_spans(probs, offsets, valid)
+
+    assert starts.tolist() == [0] and ends.tolist() == [6]
+    assert labels.tolist() == ['PER']
+    assert scores[0] == pytest.approx(0.8)
+
+
+def test_no_valid_tokens():
+    starts, ends, labels, scores = _decoder()._group_spans(
+        _probs([0]), np.array([[0, 0]]), np.zeros(1, dtype=bool))
+
+    assert starts.size == ends.size == labels.size == scores.size == 0
@@ -0,0 +1,46 @@
+"""
+Tests for page-parallel extraction in pdf.extractor
+"""
+import fitz  # PyMuPDF
+
+from pdf.extractor import PDFExtractor
+
+
+def _pdf_bytes(page_count=6):
+    doc = fitz.open()
+    for page_num in range(page_count):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Sayfa {page_num + 1}: Ahmet Yılmaz", fontsize=11)
+        page.insert_text((72, 100), "Vestel A.Ş. İstanbul", fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _as_tuples(text_blocks):
+    return [(b['page'], b['text'], b['start_char'], b['end_char'], tuple(round(v, 2) for v in b['bbox']))
+            for b in text_blocks]
+
+
+def test_parallel_matches_sequential():
+    data = _pdf_bytes()
+    extractor = PDFExtractor()
+
+    sequential = extractor.extract_text_with_positions(data, parallel=False)
+    parallel = extractor.extract_text_with_positions(data, parallel=True, max_workers=2)
+
+    assert _as_tuples(parallel) == _as_tuples(sequential)
+    assert parallel.full_text == sequential.full_text
+
+
+def test_parallel_extraction_is_opt_in(monkeypatch):
+    calls = []
+    extractor = PDFExtractor()
+    monkeypatch.setattr(extractor, '_extract_parallel', lambda *args: calls.append(args))
+
+    extractor.extract_text_with_positions(_pdf_bytes(page_count=3))
+    assert calls == []
+
+    extractor.parallel_min_pages = 2
+    extractor.extract_text_with_positions(_pdf_bytes(page_count=3))
+    assert len(calls) == 1
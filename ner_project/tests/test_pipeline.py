@@ -0,0 +1,91 @@
+"""
+Tests for pdf.pipeline - streaming extract -> NER -> allocate -> redact executor
+"""
+import fitz  # PyMuPDF
+import pytest
+
+from pdf.extractor import PDFExtractor
+from pdf.pipeline import OrderedAllocator, StreamingPipeline
+from pdf.replace import PDFReplacer
+
+
+def _write_pdf(path, page_count=5):
+    doc = fitz.open()
+    for page_num in range(page_count):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Sayfa {page_num}: Ahmet Yilmaz ve Ayse Kaya", fontsize=11)
+    doc.save(path)
+    doc.close()
+
+
+def _detector(extractor, words=('Ahmet Yilmaz', 'Ayse Kaya')):
+    def detect(page_text, page_blocks):
+        entities = []
+        for word in words:
+            start = page_text.find(word)
+            if start >= 0:
+                entities.append({
+                    'entity': 'ad_soyad', 'word': word, 'start': start, 'end': start + len(word), 'score': 0.9,
+                    'text_block_info': extractor.find_text_block_for_position(
+                        start, start + len(word), page_blocks, page_text)
+                })
+        return entities
+    return detect
+
+
+def test_allocator_reuses_replacements_across_pages():
+    calls = []
+
+    def allocate(entities):
+        calls.append([e['word'] for e in entities])
+        for entity in entities:
+            entity['replacement'] = f"X{len(calls)}"
+        return entities
+
+    allocator = OrderedAllocator(allocate)
+    first = allocator.allocate([{'entity': 'ad_soyad', 'word': 'Ahmet'}, {'entity': 'ad_soyad', 'word': 'Ahmet'}])
+    second = allocator.allocate([{'entity': 'ad_soyad', 'word': 'Ahmet '}, {'entity': 'ad_soyad', 'word': 'Ayse'}])
+
+    assert [e['replacement'] for e in first + second] == ['X1', 'X1', 'X1', 'X2']
+    assert calls == [['Ahmet'], ['Ayse']]
+
+
+def test_pipeline_replaces_every_page(tmp_path):
+    source, output = str(tmp_path / 'input.pdf'), str(tmp_path / 'output.pdf')
+    _write_pdf(source)
+    extractor, replacer = PDFExtractor(), PDFReplacer()
+    replacements = {'Ahmet Yilmaz': 'Kadir Sonmez', 'Ayse Kaya': 'Elif Demir'}
+
+    def allocate(entities):
+        for entity in entities:
+            entity['replacement'] = replacements[entity['word']]
+        return entities
+
+    pipeline = StreamingPipeline(
+        extractor, _detector(extractor), allocate,
+        lambda page, entities: replacer.replace_page_entities(page, entities, extractor),
+        queue_size=1
+    )
+    stats = pipeline.run(source, output)
+
+    assert (stats['pages'], stats['entities'], stats['changes']) == (5, 10, 10)
+    with fitz.open(output) as doc:
+        for page in doc:
+            text = page.get_text()
+            assert 'Kadir Sonmez' in text and 'Elif Demir' in text
+            assert 'Ahmet Yilmaz' not in text and 'Ayse Kaya' not in text
+
+
+def test_stage_errors_are_raised_and_nothing_is_saved(tmp_path):
+    source, output = str(tmp_path / 'input.pdf'), str(tmp_path / 'output.pdf')
+    _write_pdf(source, page_count=8)
+
+    def detect(page_text, page_blocks):
+        raise RuntimeError("model failed")
+
+    pipeline = StreamingPipeline(PDFExtractor(), detect, lambda entities: entities,
+                                 lambda page, entities: 0, queue_size=1)
+
+    with pytest.raises(RuntimeError, match="model failed"):
+        pipeline.run(source, output)
+    assert not (tmp_path / 'output.pdf').exists()
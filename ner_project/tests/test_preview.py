@@ -0,0 +1,119 @@
+"""
+Tests for pdf.preview - detect-only entity geometry reused when applying
+"""
+import fitz  # PyMuPDF
+import pytest
+
+from pdf.extractor import PDFExtractor
+from pdf.ner_cache import DetectionCache
+from pdf.preview import PDFPreviewer
+
+
+@pytest.fixture
+def doc():
+    document = fitz.open()
+    page = document.new_page()
+    page.insert_text((72, 72), "Sayin Ahmet Yilmaz, hesabiniz acildi", fontsize=11)
+    page.insert_text((72, 800), "Son satirda Mehmet", fontsize=11)
+    document.new_page().insert_text((72, 72), "Demir imzasi", fontsize=11)
+    document = fitz.open("pdf", document.tobytes())
+    yield document
+    document.close()
+
+
+def _entities(extractor, doc, words):
+    text_blocks = extractor.extract_text_with_positions(doc)
+    full_text = text_blocks.full_text
+    entities = []
+    for word in words:
+        start = full_text.index(word)
+        entities.append({'entity': 'ad_soyad', 'word': word, 'score': 0.912345, 'method': 'model',
+                         'start': start, 'end': start + len(word),
+                         'text_block_info': extractor.find_text_block_for_position(
+                             start, start + len(word), text_blocks, full_text)})
+    return entities
+
+
+def test_locate_stores_rects_and_continued_rects(doc):
+    extractor = PDFExtractor()
+    entities = _entities(extractor, doc, ['Ahmet Yilmaz', 'Mehmet Demir'])
+
+    located = PDFPreviewer().locate_entities(doc, entities, extractor)
+
+    assert located == 2
+    name, crossing = (entity['text_block_info'] for entity in entities)
+    assert len(name['rects']) == 1
+    assert doc[0].get_textbox(name['rects'][0]).strip() == 'Ahmet Yilmaz'
+    assert crossing['page'] == 0 and list(crossing['continued_rects']) == [1]
+    assert doc[1].get_textbox(crossing['continued_rects'][1][0]).strip() == 'Demir'
+
+
+def test_apply_reuses_the_preview_rects(doc, monkeypatch):
+    extractor = PDFExtractor()
+    entities = _entities(extractor, doc, ['Ahmet Yilmaz', 'Mehmet Demir'])
+    PDFPreviewer().locate_entities(doc, entities, extractor)
+    name, crossing = (entity['text_block_info'] for entity in entities)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("page searched again")
+
+    monkeypatch.setattr(extractor, '_locate_in_span', fail)
+
+    assert extractor.locate_entity_rects(doc[0], entities[0]) == [fitz.Rect(r) for r in name['rects']]
+    assert extractor.locate_entity_rects(doc[1], entities[1]) == [fitz.Rect(r) for r in crossing['continued_rects'][1]]
+
+
+def test_preview_rects_survive_the_detection_cache(doc):
+    extractor = PDFExtractor()
+    entities = _entities(extractor, doc, ['Ahmet Yilmaz'])
+    PDFPreviewer().locate_entities(doc, entities, extractor)
+    cache = DetectionCache()
+    cache.put('doc', [], 'text', [])
+
+    cache.put_preview('doc', 0.7, entities)
+    cached = cache.get_preview('doc', 0.7)
+
+    assert cached[0]['text_block_info']['rects'] == entities[0]['text_block_info']['rects']
+    assert cached[0] is not entities[0]
+
+
+def test_relocating_drops_stale_rects(doc):
+    extractor = PDFExtractor()
+    entities = _entities(extractor, doc, ['Ahmet Yilmaz'])
+    entities[0]['text_block_info']['rects'] = [(0, 0, 1, 1)]
+    entities[0]['text_block_info']['continued_rects'] = {1: [(0, 0, 1, 1)]}
+
+    PDFPreviewer().locate_entities(doc, entities, extractor)
+
+    info = entities[0]['text_block_info']
+    assert info['rects'] != [(0, 0, 1, 1)]
+    assert 'continued_rects' not in info
+
+
+def test_entity_records_are_json_friendly(doc):
+    extractor = PDFExtractor()
+    previewer = PDFPreviewer()
+    entities = _entities(extractor, doc, ['Ahmet Yilmaz', 'Mehmet Demir'])
+    previewer.locate_entities(doc, entities, extractor)
+
+    records = previewer.entity_records(entities)
+
+    assert [record['id'] for record in records] == [0, 1]
+    assert records[0]['score'] == 0.9123
+    assert all(value == round(value, 2) for value in records[0]['rects'][0])
+    assert 'continued_rects' not in records[0]
+    assert list(records[1]['continued_rects']) == ['1']
+
+
+def test_thumbnails_cover_pages_with_entities(doc):
+    extractor = PDFExtractor()
+    previewer = PDFPreviewer(thumbnail_dpi=36)
+    entities = _entities(extractor, doc, ['Ahmet Yilmaz', 'Mehmet Demir'])
+    previewer.locate_entities(doc, entities, extractor)
+
+    thumbnails = previewer.render_thumbnails(doc, entities)
+
+    assert [caption for _, caption in thumbnails] == ["Page 1: 2 areas", "Page 2: 1 areas"]
+    image = thumbnails[0][0]
+    assert image.shape[2] == 3
+    assert (image == previewer.outline_color).all(axis=2).any()
@@ -0,0 +1,85 @@
+"""
+Tests for pdf.propagation and consistent replacements - every occurrence of an accepted entity
+"""
+from pdf.propagation import EntityPropagator
+from pdf.validators import PDFValidators
+
+
+def _entity(text, word, entity_type='ad_soyad', score=0.9, **extra):
+    start = text.index(word)
+    return dict({'entity': entity_type, 'word': word, 'start': start, 'end': start + len(word),
+                 'score': score, 'method': 'custom_ner'}, **extra)
+
+
+def test_propagates_to_uncovered_occurrences():
+    text = 'Ahmet Yılmaz geldi. AHMET YILMAZ imzaladı, ahmet yilmaz onayladı.'
+    accepted = [_entity(text, 'Ahmet Yılmaz')]
+
+    propagated = EntityPropagator().propagate(text, accepted)
+
+    assert [e['word'] for e in propagated] == ['AHMET YILMAZ', 'ahmet yilmaz']
+    assert all(e['method'] == 'propagated' and e['score'] == 0.9 for e in propagated)
+    assert all(text[e['start']:e['end']] == e['word'] for e in propagated)
+
+
+def test_existing_entities_and_embedded_words_are_skipped():
+    text = 'Ahmet Yılmaz ve Ahmet Yılmazlar; Ahmet Yılmaz'
+    accepted = [_entity(text, 'Ahmet Yılmaz')]
+    last = text.rindex('Ahmet Yılmaz')
+    accepted.append(dict(accepted[0], start=last, end=last + 12))
+
+    assert EntityPropagator().propagate(text, accepted) == []
+
+
+def test_single_words_keep_their_casing():
+    text = 'Eti bisküvi aldı, eti pişirdi. ETI faturası.'
+    accepted = [_entity(text, 'Eti', 'sirket', case_sensitive=True)]
+
+    propagated = EntityPropagator().propagate(text, accepted)
+
+    assert [e['word'] for e in propagated] == ['ETI']
+    assert propagated[0]['case_sensitive'] is True
+
+
+def test_longest_form_wins():
+    text = 'Ahmet Yılmaz ile Ahmet. Sonra Ahmet Yılmaz.'
+    accepted = [_entity(text, 'Ahmet Yılmaz'), _entity(text, 'Ahmet', score=0.8)]
+    accepted[1]['start'] = text.index('Ahmet.')
+    accepted[1]['end'] = accepted[1]['start'] + 5
+
+    propagated = EntityPropagator().propagate(text, accepted)
+
+    assert [(e['word'], e['start']) for e in propagated] == [('Ahmet Yılmaz', text.rindex('Ahmet Yılmaz'))]
+
+
+def test_short_forms_are_not_propagated():
+    text = 'Al geldi, al bakalım, Al.'
+
+    assert EntityPropagator().propagate(text, [_entity(text, 'Al')]) == []
+
+
+def test_variants_share_one_replacement():
+    validators = PDFValidators({'ad_soyad': {12: ['Kadir Sonmez', 'Rukiye Aydin']}})
+    text = 'Ahmet Yılmaz, AHMET YILMAZ, Ahmet Yilmaz'
+    entities = [dict(_entity(text, 'Ahmet Yılmaz'), start=0, end=12),
+                dict(_entity(text, 'AHMET YILMAZ')), dict(_entity(text, 'Ahmet Yilmaz'))]
+
+    processed = validators.apply_replacement_strategy_consistent(entities)
+
+    replacements = {e['replacement'] for e in processed}
+    assert len(replacements) == 1
+    assert replacements.pop() in ('Kadir Sonmez', 'Rukiye Aydin')
+
+
+def test_replacement_state_round_trip():
+    validators = PDFValidators({'ad_soyad': {12: ['Kadir Sonmez', 'Rukiye Aydin']}})
+    text = 'Ahmet Yılmaz'
+    first = validators.apply_replacement_strategy_consistent([_entity(text, 'Ahmet Yılmaz')])[0]['replacement']
+    state = validators.export_replacement_state()
+
+    resumed = PDFValidators({'ad_soyad': {12: ['Kadir Sonmez', 'Rukiye Aydin']}})
+    resumed.restore_replacement_state(state)
+    again = resumed.apply_replacement_strategy_consistent([_entity('AHMET YILMAZ', 'AHMET YILMAZ')],
+                                                          reset_usage=False)
+
+    assert again[0]['replacement'] == first
@@ -0,0 +1,90 @@
+"""
+Tests for pdf.redact - page raster cache and background colour sampling
+"""
+import fitz  # PyMuPDF
+import pytest
+
+from pdf.redact import PageRasterCache, PDFRedactor
+
+
+def _coloured_doc():
+    """One page: red left half, blue right half, black text on the red half"""
+    doc = fitz.open()
+    page = doc.new_page(width=400, height=200)
+    page.draw_rect(fitz.Rect(0, 0, 200, 200), color=None, fill=(1, 0, 0))
+    page.draw_rect(fitz.Rect(200, 0, 400, 200), color=None, fill=(0, 0, 1))
+    page.insert_text((20, 100), "Ahmet Yilmaz", fontsize=14, color=(0, 0, 0))
+    return doc
+
+
+def test_page_is_rendered_once():
+    doc = _coloured_doc()
+    cache = PageRasterCache(dpi=36)
+
+    rgb, to_pixels = cache.get(doc[0])
+    again, _ = cache.get(doc.load_page(0))
+
+    assert again is rgb
+    assert rgb.shape == (100, 200, 3)
+    x, y = fitz.Point(50, 50) * to_pixels
+    assert tuple(rgb[int(y), int(x)]) == (255, 0, 0)
+    doc.close()
+
+
+def test_rasters_are_keyed_per_document():
+    first, second = _coloured_doc(), fitz.open()
+    second.new_page(width=400, height=200)
+    cache = PageRasterCache(dpi=36)
+
+    red_half = cache.get(first[0])[0]
+    blank = cache.get(second[0])[0]
+
+    assert blank is not red_half
+    assert tuple(blank[10, 10]) == (255, 255, 255)
+    first.close()
+    second.close()
+
+
+def test_discard_drops_the_raster():
+    doc = _coloured_doc()
+    cache = PageRasterCache(dpi=36)
+    rgb, _ = cache.get(doc[0])
+
+    cache.discard(doc[0])
+
+    assert cache.get(doc[0])[0] is not rgb
+    cache.clear()
+    assert cache._rasters == {}
+    doc.close()
+
+
+def test_background_colors_per_rect():
+    doc = _coloured_doc()
+    redactor = PDFRedactor()
+    text_rect = doc[0].search_for("Ahmet Yilmaz")[0]
+
+    colors = redactor.sample_background_colors(doc[0], [text_rect, fitz.Rect(250, 80, 300, 100)])
+
+    # Text pixels are dropped, so the name on the red half samples red
+    assert colors[0] == pytest.approx((1, 0, 0))
+    assert colors[1] == pytest.approx((0, 0, 1))
+    doc.close()
+
+
+def test_background_color_matches_batched_sampling():
+    doc = _coloured_doc()
+    redactor = PDFRedactor()
+    rects = [fitz.Rect(20, 20, 60, 40), fitz.Rect(250, 150, 320, 170), fitz.Rect(180, 80, 220, 100)]
+
+    batched = redactor.sample_background_colors(doc[0], rects)
+
+    assert [redactor.sample_background_color(doc[0], rect) for rect in rects] == batched
+    assert redactor.sample_background_colors(doc[0], []) == []
+    doc.close()
+
+
+def test_rect_outside_the_page_gets_the_default():
+    doc = _coloured_doc()
+
+    assert PDFRedactor().sample_background_color(doc[0], fitz.Rect(1000, 1000, 1010, 1010)) == (0.96, 0.96, 0.96)
+    doc.close()
@@ -0,0 +1,73 @@
+"""
+Tests for repeated header/footer handling in pdf.extractor - masking and replay
+"""
+import fitz  # PyMuPDF
+import pytest
+
+from pdf.extractor import PDFExtractor
+
+HEADER = "Gizli - Ahmet Yilmaz Holding"
+
+
+@pytest.fixture
+def doc():
+    document = fitz.open()
+    for page_num in range(4):
+        page = document.new_page()
+        page.insert_text((72, 40), HEADER, fontsize=9)
+        page.insert_text((72, 100), f"Sayfa {page_num} icerigi", fontsize=11)
+    # Same text elsewhere on the page is not a repeat of the header
+    document[3].insert_text((72, 300), HEADER, fontsize=9)
+    document = fitz.open("pdf", document.tobytes())
+    yield document
+    document.close()
+
+
+def _header_entity(extractor, spans):
+    start = spans.full_text.index('Ahmet Yilmaz')
+    return {'entity': 'ad_soyad', 'word': 'Ahmet Yilmaz', 'start': start, 'end': start + 12, 'score': 0.9,
+            'text_block_info': extractor.find_text_block_for_position(start, start + 12, spans, spans.full_text)}
+
+
+def test_header_copies_are_found_and_masked(doc):
+    extractor = PDFExtractor()
+    spans = extractor.extract_text_with_positions(doc)
+
+    repeats = extractor.find_repeated_spans(spans)
+    masked = extractor.mask_repeated_text(spans, repeats)
+
+    assert len(repeats) == 1
+    first, copies = next(iter(repeats.items()))
+    assert spans.text(first) == HEADER
+    assert [int(spans.page[i]) for i in copies] == [1, 2, 3]
+    assert len(masked) == len(spans.full_text)
+    assert masked.count(HEADER) == 2        # first occurrence and the body text on page 3
+    assert masked.count('icerigi') == 4
+
+
+def test_min_pages_setting(doc):
+    extractor = PDFExtractor(repeat_min_pages=5)
+
+    assert extractor.find_repeated_spans(extractor.extract_text_with_positions(doc)) == {}
+
+
+def test_replayed_entities_share_located_rects(doc):
+    extractor = PDFExtractor()
+    spans = extractor.extract_text_with_positions(doc)
+    repeats = extractor.find_repeated_spans(spans)
+    entity = _header_entity(extractor, spans)
+
+    replayed = extractor.replay_repeated_entities([entity], spans, repeats)
+
+    assert [e['text_block_info']['page'] for e in replayed] == [1, 2, 3]
+    assert all(spans.full_text[e['start']:e['end']] == 'Ahmet Yilmaz' for e in replayed)
+    group = entity['text_block_info']['repeat_group']
+    assert all(e['text_block_info']['repeat_group'] is group for e in replayed)
+
+    first_rects = extractor.locate_entity_rects(doc[0], entity)
+    assert group['rects'] is not None
+    for copy in replayed:
+        page = doc[copy['text_block_info']['page']]
+        rects = extractor.locate_entity_rects(page, copy)
+        assert [tuple(round(v, 3) for v in r) for r in rects] == [tuple(round(v, 3) for v in r) for r in first_rects]
+        assert page.get_textbox(rects[0]).strip() == 'Ahmet Yilmaz'
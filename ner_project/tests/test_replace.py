@@ -0,0 +1,142 @@
+"""
+Tests for pdf.replace - per-page replacement written through TextWriters and review overlays
+"""
+import fitz  # PyMuPDF
+
+from pdf.extractor import PDFExtractor
+from pdf.redact import PDFRedactor
+from pdf.replace import PDFReplacer
+
+REPLACEMENTS = {'Ahmet Yilmaz': 'Kadir Sonmez', 'Ayse Kaya': 'Elif Demir', 'Vestel': 'Arcam'}
+
+
+def _doc():
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), "Ahmet Yilmaz ile Ayse Kaya", fontsize=11, color=(0, 0, 0))
+    page.insert_text((72, 120), "Firma: Vestel", fontsize=14, color=(1, 0, 0))
+    return fitz.open("pdf", doc.tobytes())
+
+
+def _entities(doc, extractor):
+    text_blocks = extractor.extract_text_with_positions(doc)
+    full_text = text_blocks.full_text
+    entities = []
+    for word, replacement in REPLACEMENTS.items():
+        start = full_text.find(word)
+        entities.append({
+            'entity': 'ad_soyad', 'word': word, 'replacement': replacement,
+            'start': start, 'end': start + len(word), 'score': 0.9,
+            'text_block_info': extractor.find_text_block_for_position(start, start + len(word), text_blocks, full_text)
+        })
+    return entities
+
+
+def _spans(page):
+    return [span for block in page.get_text("dict")["blocks"] for line in block.get("lines", [])
+            for span in line["spans"]]
+
+
+def test_page_entities_are_replaced_in_one_pass():
+    doc, extractor = _doc(), PDFExtractor()
+    page = doc[0]
+
+    count = PDFReplacer().replace_page_entities(page, _entities(doc, extractor), extractor)
+
+    text = page.get_text()
+    assert count == 3
+    assert all(original not in text for original in REPLACEMENTS)
+    assert all(replacement in text for replacement in REPLACEMENTS.values())
+    doc.close()
+
+
+def test_replacements_keep_their_text_colour():
+    doc, extractor = _doc(), PDFExtractor()
+    page = doc[0]
+    PDFReplacer().replace_page_entities(page, _entities(doc, extractor), extractor)
+
+    colours = {span['text'].strip(): span['color'] for span in _spans(page)}
+
+    assert colours['Arcam'] == 0xFF0000
+    assert colours['Kadir Sonmez'] == 0
+    doc.close()
+
+
+def test_one_writer_per_colour(monkeypatch):
+    doc, extractor = _doc(), PDFExtractor()
+    page = doc[0]
+    written = []
+    original_write = fitz.TextWriter.write_text
+    monkeypatch.setattr(fitz.TextWriter, 'write_text',
+                        lambda self, page, **kwargs: written.append(kwargs.get('color')) or original_write(self, page, **kwargs))
+
+    PDFReplacer().replace_page_entities(page, _entities(doc, extractor), extractor)
+
+    assert sorted(written) == [(0.0, 0.0, 0.0), (1.0, 0.0, 0.0)]
+    doc.close()
+
+
+def test_review_copy_keeps_the_original_text_under_overlays():
+    doc, extractor = _doc(), PDFExtractor()
+    page = doc[0]
+
+    count = PDFReplacer().replace_page_entities(page, _entities(doc, extractor), extractor, secure=False)
+
+    text = page.get_text()
+    assert count == 3
+    assert 'Ahmet Yilmaz' in text and 'Kadir Sonmez' in text
+    doc.close()
+
+
+def test_overlays_are_drawn_without_redaction_annots():
+    doc, extractor = _doc(), PDFExtractor()
+    page = doc[0]
+    rects = [page.search_for('Ayse Kaya')]
+
+    drawn = PDFRedactor().draw_page_overlays(page, rects, background_color=(0, 1, 0))
+
+    assert drawn == 1
+    assert list(page.annots()) == []
+    assert any(drawing['fill'] == (0.0, 1.0, 0.0) for drawing in page.get_drawings())
+    assert PDFRedactor().draw_page_overlays(page, [[], None]) == 0
+    doc.close()
+
+
+def _review_input(tmp_path):
+    path = tmp_path / 'input.pdf'
+    doc = _doc()
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+def test_review_copy_is_flagged_and_saved_incrementally(tmp_path):
+    input_path, output_path = _review_input(tmp_path), tmp_path / 'review.pdf'
+    extractor, replacer = PDFExtractor(), PDFReplacer()
+    with fitz.open(str(input_path)) as doc:
+        entities = _entities(doc, extractor)
+
+    # Sharding is never used for review copies
+    assert replacer.process_pdf_replacement(str(input_path), entities, str(output_path), extractor,
+                                            sharded=True, secure=False)
+
+    assert replacer.last_save_stats['profile'] == 'incremental'
+    assert output_path.read_bytes().startswith(input_path.read_bytes())
+    with fitz.open(str(output_path)) as review:
+        assert 'review-copy' in review.metadata['keywords']
+        assert review.metadata['subject'].startswith('REVIEW COPY - NOT REDACTED')
+        assert 'Ahmet Yilmaz' in review[0].get_text()
+
+
+def test_secure_output_is_rewritten_without_the_original(tmp_path):
+    input_path, output_path = _review_input(tmp_path), tmp_path / 'secure.pdf'
+    extractor, replacer = PDFExtractor(), PDFReplacer()
+    with fitz.open(str(input_path)) as doc:
+        entities = _entities(doc, extractor)
+
+    assert replacer.process_pdf_replacement(str(input_path), entities, str(output_path), extractor)
+
+    assert replacer.last_save_stats['incremental'] is False
+    with fitz.open(str(output_path)) as result:
+        assert 'review-copy' not in (result.metadata['keywords'] or '')
+        assert 'Ahmet Yilmaz' not in result[0].get_text()
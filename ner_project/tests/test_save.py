@@ -0,0 +1,94 @@
+"""
+Tests for pdf.save - save profile resolution and incremental saves
+"""
+import fitz  # PyMuPDF
+import pytest
+
+from pdf.save import SAVE_PROFILES, PDFSaver
+
+
+@pytest.fixture
+def saver():
+    return PDFSaver()
+
+
+def test_default_profile(saver):
+    assert saver.resolve_profile() == SAVE_PROFILES['balanced']
+
+
+def test_secure_output_refuses_incremental(saver):
+    profile = saver.resolve_profile('incremental', secure=True)
+
+    assert not profile.incremental
+    assert profile.name == 'balanced'
+
+
+def test_review_output_may_save_incrementally(saver):
+    assert saver.resolve_profile('incremental', secure=False).incremental
+
+
+@pytest.mark.parametrize('secure, changed_pages, expected', [
+    (False, 2, 'incremental'),
+    (False, 50, 'balanced'),
+    (True, 2, 'balanced'),
+])
+def test_auto_profile(saver, secure, changed_pages, expected):
+    profile = saver.resolve_profile('auto', secure=secure, changed_pages=changed_pages, page_count=100)
+
+    assert profile.name == expected
+
+
+def test_unknown_profile_falls_back_to_balanced(saver):
+    assert saver.resolve_profile('tiny') == SAVE_PROFILES['balanced']
+
+
+def test_secure_profiles_collect_garbage(saver):
+    for name in SAVE_PROFILES:
+        assert saver.resolve_profile(name, secure=True).garbage >= 1
+
+
+def test_save_options_of_full_profiles():
+    options = SAVE_PROFILES['compact'].save_options()
+
+    assert options['garbage'] == 4
+    assert options['use_objstms'] == 1
+    assert 'use_objstms' not in SAVE_PROFILES['fast'].save_options()
+
+
+def _write_pdf(path, text):
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    doc.save(path)
+    doc.close()
+
+
+def test_incremental_save_appends_to_a_copy(saver, tmp_path):
+    input_path, output_path = str(tmp_path / 'in.pdf'), str(tmp_path / 'out.pdf')
+    _write_pdf(input_path, 'Ahmet Yilmaz')
+    profile = saver.resolve_profile('incremental', secure=False)
+
+    doc = saver.open_document(input_path, output_path, profile)
+    doc[0].insert_text((72, 100), 'review')
+    stats = saver.save(doc, output_path, profile)
+    doc.close()
+
+    assert stats['incremental']
+    with fitz.open(output_path) as result:
+        assert 'review' in result[0].get_text()
+    with fitz.open(input_path) as original:
+        assert 'review' not in original[0].get_text()
+
+
+def test_full_save_reports_size(saver, tmp_path):
+    input_path, output_path = str(tmp_path / 'in.pdf'), str(tmp_path / 'out.pdf')
+    _write_pdf(input_path, 'Ahmet Yilmaz')
+    profile = saver.resolve_profile(secure=True)
+
+    doc = saver.open_document(input_path, output_path, profile)
+    stats = saver.save(doc, output_path, profile)
+    data, byte_stats = saver.to_bytes(doc, profile)
+    doc.close()
+
+    assert not stats['incremental']
+    assert stats['bytes'] == (tmp_path / 'out.pdf').stat().st_size
+    assert byte_stats['bytes'] == len(data)
@@ -0,0 +1,118 @@
+"""
+Tests for pdf.sharding - page-range workers merged back into the document
+"""
+import fitz  # PyMuPDF
+import pytest
+
+from pdf.extractor import PDFExtractor
+from pdf.redact import PDFRedactor
+from pdf.replace import PDFReplacer
+
+
+def test_shard_workers_carry_the_parent_settings():
+    extractor = PDFExtractor(image_page_min_coverage=0.8, repeat_min_pages=5)
+    replacer = PDFReplacer(shard_min_pages=4, redactor_config={'raster_dpi': 96, 'coalesce_gap': 2.0})
+
+    worker = replacer.make_shard_worker(extractor)
+    rebuilt = PDFReplacer(**worker.keywords['replacer_config'])
+    rebuilt_extractor = PDFExtractor(**worker.keywords['extractor_config'])
+
+    assert rebuilt.get_config() == replacer.get_config()
+    assert rebuilt.redactor.raster_cache.dpi == 96 and rebuilt.redactor.coalesce_gap == 2.0
+    assert rebuilt_extractor.get_config() == extractor.get_config()
+
+
+def test_redactor_config_round_trip():
+    redactor = PDFRedactor(shard_min_pages=8, raster_dpi=50, save_profile='fast', coalesce_gap=1.5)
+
+    assert PDFRedactor(**redactor.get_config()).get_config() == redactor.get_config()
+
+
+def _linked_pdf(path, page_count=4):
+    """Pages with a mailto link over a name, a link elsewhere, a note and a form field"""
+    doc = fitz.open()
+    for _ in range(page_count):
+        doc.new_page()
+    for page_num in range(page_count):
+        page = doc[page_num]
+        page.insert_text((72, 72), f"Sayfa {page_num}: Ahmet Yilmaz yazdi", fontsize=11)
+        name_rect = page.search_for("Ahmet Yilmaz")[0]
+        page.insert_link({'kind': fitz.LINK_URI, 'from': name_rect, 'uri': 'mailto:ahmet@example.com'})
+        page.insert_link({'kind': fitz.LINK_GOTO, 'from': fitz.Rect(500, 10, 540, 30),
+                          'page': (page_num + 1) % page_count})
+        page.add_text_annot((400, 400), "Not")
+        widget = fitz.Widget()
+        widget.field_name = f"alan{page_num}"
+        widget.field_type = fitz.PDF_WIDGET_TYPE_TEXT
+        widget.rect = fitz.Rect(300, 700, 450, 720)
+        widget.field_value = "x"
+        page.add_widget(widget)
+    doc.save(path)
+    doc.close()
+
+
+def _entities(path, extractor):
+    text_blocks = extractor.extract_text_with_positions(path)
+    full_text = text_blocks.full_text
+    entities = []
+    start = full_text.find('Ahmet Yilmaz')
+    while start >= 0:
+        entities.append({
+            'entity': 'ad_soyad', 'word': 'Ahmet Yilmaz', 'replacement': 'Kadir Sonmez',
+            'start': start, 'end': start + 12, 'score': 0.9,
+            'text_block_info': extractor.find_text_block_for_position(start, start + 12, text_blocks, full_text)
+        })
+        start = full_text.find('Ahmet Yilmaz', start + 1)
+    return entities
+
+
+def _page_objects(path):
+    with fitz.open(path) as doc:
+        return [
+            (
+                sorted((link['kind'], link.get('uri'), link.get('page')) for link in page.get_links()),
+                sorted(annot.type[1] for annot in page.annots()),
+                sorted(widget.field_name for widget in page.widgets())
+            )
+            for page in doc
+        ]
+
+
+@pytest.mark.parametrize('mode', ['replace', 'redact'])
+def test_sharded_output_keeps_the_same_links_and_annotations(tmp_path, mode):
+    source = str(tmp_path / 'input.pdf')
+    _linked_pdf(source)
+    extractor = PDFExtractor()
+
+    outputs = {}
+    for sharded in (False, True):
+        output = str(tmp_path / f'{mode}_{sharded}.pdf')
+        entities = _entities(source, extractor)
+        if mode == 'replace':
+            PDFReplacer().process_pdf_replacement(source, entities, output, extractor,
+                                                  sharded=sharded, max_workers=2)
+        else:
+            PDFRedactor().process_pdf_redaction(source, entities, output, extractor,
+                                                sharded=sharded, max_workers=2)
+        outputs[sharded] = _page_objects(output)
+
+    assert outputs[True] == outputs[False]
+    # The mailto link over the name is gone, page links, notes and fields remain
+    assert all(links == [(fitz.LINK_GOTO, None, (page_num + 1) % 4)] and annots == ['Text'] and widgets
+               for page_num, (links, annots, widgets) in enumerate(outputs[True]))
+
+
+def test_in_memory_sharding_drops_links_over_replaced_text(tmp_path):
+    source = str(tmp_path / 'input.pdf')
+    _linked_pdf(source)
+    extractor = PDFExtractor()
+    with open(source, 'rb') as f:
+        data = f.read()
+
+    doc = fitz.open(stream=data, filetype='pdf')
+    replacer = PDFReplacer(shard_min_pages=2)
+    replacer.apply_replacements(doc, _entities(source, extractor), extractor, source=data, max_workers=2)
+
+    assert all(link['kind'] == fitz.LINK_GOTO for page in doc for link in page.get_links())
+    assert 'Kadir Sonmez' in doc[0].get_text() and 'Ahmet Yilmaz' not in doc[0].get_text()
+    doc.close()
@@ -0,0 +1,146 @@
+"""
+Tests for pdf.spans - SpanTable lookups against the sequential list lookup they replace
+"""
+import random
+
+import pytest
+
+from pdf.spans import SpanTable, SpanTableBuilder
+
+
+def _span(page, text, index=0):
+    return {'page': page, 'text': text, 'bbox': (10.0, 20.0 * index, 100.0, 20.0 * index + 12),
+            'font': 'Helvetica', 'size': 11.0, 'flags': 0, 'color': 0}
+
+
+def _sequential_find_span(spans, start_pos, end_pos):
+    """Former lookup: walk the span list, offsets in the space-joined text"""
+    current_pos = 0
+    for index, span in enumerate(spans):
+        block_start = current_pos
+        block_end = current_pos + len(span['text'])
+        if start_pos >= block_start and end_pos <= block_end + 1:
+            return index
+        current_pos = block_end + 1
+    return None
+
+
+def _sequential_find_spans(spans, start_pos, end_pos):
+    """All spans overlapping [start_pos, end_pos), by linear scan"""
+    indices, current_pos = [], 0
+    for index, span in enumerate(spans):
+        block_start, block_end = current_pos, current_pos + len(span['text'])
+        if block_start < end_pos and block_end > start_pos:
+            indices.append(index)
+        current_pos = block_end + 1
+    return indices
+
+
+@pytest.fixture
+def random_spans():
+    rng = random.Random(42)
+    words = ['Ahmet', 'Yılmaz', 'TC', '12345678901', 'İstanbul', 'a', 'Sözleşme No:', 'x y z']
+    return [_span(i // 20, ' '.join(rng.choice(words) for _ in range(rng.randint(1, 4))), i)
+            for i in range(200)]
+
+
+def test_full_text_and_offsets(random_spans):
+    table = SpanTable.from_spans(random_spans)
+
+    assert table.full_text == ' '.join(span['text'] for span in random_spans)
+    for index, span in enumerate(random_spans):
+        assert table.text(index) == span['text']
+        assert table[index]['page'] == span['page']
+
+
+def test_find_span_matches_sequential_lookup(random_spans):
+    table = SpanTable.from_spans(random_spans)
+    rng = random.Random(7)
+    length = len(table.full_text)
+
+    for _ in range(3000):
+        start = rng.randrange(length)
+        end = min(length, start + rng.randint(1, 30))
+        assert table.find_span(start, end) == _sequential_find_span(random_spans, start, end), (start, end)
+
+
+def test_find_span_at_span_boundaries(random_spans):
+    table = SpanTable.from_spans(random_spans)
+
+    for index in range(len(random_spans)):
+        start, end = int(table.start_char[index]), int(table.end_char[index])
+        assert table.find_span(start, end) == index
+        # The range may run onto the separator after the span
+        assert table.find_span(start, end + 1) == _sequential_find_span(random_spans, start, end + 1)
+
+
+def test_find_spans_matches_linear_scan(random_spans):
+    table = SpanTable.from_spans(random_spans)
+    rng = random.Random(11)
+    length = len(table.full_text)
+
+    for _ in range(3000):
+        start = rng.randrange(length)
+        end = min(length, start + rng.randint(1, 80))
+        assert list(table.find_spans(start, end)) == _sequential_find_spans(random_spans, start, end), (start, end)
+
+
+def test_coerce_keeps_tables_and_converts_lists(random_spans):
+    table = SpanTable.from_spans(random_spans)
+
+    assert SpanTable.coerce(table) is table
+    converted = SpanTable.coerce(random_spans)
+    assert isinstance(converted, SpanTable)
+    assert converted.full_text == table.full_text
+
+
+def test_concat_keeps_page_order():
+    first = SpanTable.from_spans([_span(0, 'Ahmet'), _span(0, 'Yılmaz', 1)])
+    second = SpanTable.from_spans([_span(1, 'İstanbul')])
+
+    merged = SpanTable.concat([first, second])
+
+    assert merged.full_text == 'Ahmet Yılmaz İstanbul'
+    assert merged.find_span(13, 21) == 2
+    assert list(merged.page) == [0, 0, 1]
+
+
+def test_concat_matches_a_single_table(random_spans):
+    parts = [SpanTable.from_spans(random_spans[i:i + 37]) for i in range(0, len(random_spans), 37)]
+    fonts = ['Arial', 'Times', 'Helvetica']
+    for offset, part in enumerate(parts):
+        part.fonts = [fonts[(offset + i) % 3] for i in range(len(part.fonts))]
+
+    merged = SpanTable.concat(parts)
+    whole = SpanTable.from_spans(random_spans)
+
+    assert merged.full_text == whole.full_text
+    assert merged.start_char.tolist() == whole.start_char.tolist()
+    assert merged.end_char.tolist() == whole.end_char.tolist()
+    assert [merged[i]['font'] for i in range(len(merged))] == [
+        fonts[offset % 3] for offset, part in enumerate(parts) for _ in range(len(part))]
+    for index in range(len(merged)):
+        assert merged.full_text[merged.start_char[index]:merged.end_char[index]] == random_spans[index]['text']
+
+
+def test_concat_skips_empty_tables_and_merges_image_only_pages():
+    empty = SpanTableBuilder()
+    empty.mark_image_only(1)
+    scanned = empty.build()
+    first = SpanTable.from_spans([_span(0, 'Ahmet')])
+    third = SpanTable.from_spans([_span(2, 'Yılmaz')])
+
+    merged = SpanTable.concat([first, scanned, third])
+
+    assert merged.full_text == 'Ahmet Yılmaz'
+    assert merged.start_char.tolist() == [0, 6]
+    assert merged.image_only_pages == [1]
+    assert SpanTable.concat([scanned]).image_only_pages == [1]
+
+
+def test_empty_table():
+    table = SpanTable.from_spans([])
+
+    assert len(table) == 0
+    assert table.full_text == ''
+    assert list(table.find_spans(0, 5)) == []
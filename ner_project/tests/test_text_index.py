@@ -0,0 +1,119 @@
+"""
+Tests for pdf.text_index - locating entity text on a page
+"""
+import fitz  # PyMuPDF
+import pytest
+
+from pdf.text_index import PageTextIndex, PageTextIndexCache, PageWordIndex, normalize_search_text
+
+
+@pytest.fixture
+def doc():
+    document = fitz.open()
+    page = document.new_page()
+    # Base-14 fonts have no dotless i, queries with it must still match
+    page.insert_text((72, 72), "Sayin AHMET YILMAZ, hesabiniz", fontsize=11)
+    page.insert_text((72, 120), "Ahmet Yilmaz ve Ahmet Yilmaz", fontsize=11)
+    page.insert_text((72, 168), "Ahmet Yilmazlar A.S.", fontsize=11)
+    yield document
+    document.close()
+
+
+def _line_box(page, y):
+    """Bounding box of the text line at baseline y"""
+    return fitz.Rect(60, y - 14, 540, y + 4)
+
+
+def test_normalize_search_text():
+    assert normalize_search_text('  AHMET YILMAZ ') == normalize_search_text('ahmet yılmaz') == 'ahmetyilmaz'
+    assert normalize_search_text('İŞ Çağrı') == 'iscagri'
+
+
+def test_find_ignores_case_spacing_and_diacritics(doc):
+    index = PageTextIndex(doc[0])
+
+    rects = index.find('Ahmet  Yilmaz', ref_bbox=_line_box(doc[0], 72))
+
+    assert len(rects) == 1
+    assert rects[0].y1 <= 80 and rects[0].x0 > 90
+
+
+def test_find_takes_the_requested_occurrence_inside_the_span(doc):
+    index = PageTextIndex(doc[0])
+    line = _line_box(doc[0], 120)
+
+    first = index.find('Ahmet Yılmaz', ref_bbox=line, occurrence=0)[0]
+    second = index.find('Ahmet Yılmaz', ref_bbox=line, occurrence=1)[0]
+
+    assert 110 < first.y1 < 125 and 110 < second.y1 < 125
+    assert second.x0 > first.x1
+
+
+def test_find_falls_back_to_the_closest_occurrence(doc):
+    index = PageTextIndex(doc[0])
+
+    rect = index.find('Ahmet Yılmazlar', ref_bbox=fitz.Rect(60, 300, 540, 320))[0]
+
+    assert 155 < rect.y1 < 175
+    assert index.find('Mehmet Demir') == []
+    assert index.find('   ') == []
+
+
+def _tokens(text):
+    return [normalize_search_text(token) for token in text.split()]
+
+
+def test_word_index_matches_whole_words_only(doc):
+    index = PageWordIndex(doc[0])
+
+    # 'YILMAZ,' carries the comma and 'Yilmazlar' is a longer word: only line two matches
+    rects = index.find(_tokens('Ahmet Yılmaz'))
+
+    assert len(rects) == 1
+    assert 110 < rects[0].y1 < 125 and rects[0].x0 < 80
+    assert len(index.find_sequence(_tokens('Ahmet Yilmaz'))) == 2
+    assert index.find(_tokens('Ahmet Yilmazla')) == []
+    assert index.find([]) == []
+
+
+def test_word_index_filters_by_span_and_occurrence(doc):
+    index = PageWordIndex(doc[0])
+    line = _line_box(doc[0], 120)
+
+    first = index.find(_tokens('Ahmet Yilmaz'), ref_bbox=line, occurrence=0)[0]
+    second = index.find(_tokens('Ahmet Yilmaz'), ref_bbox=line, occurrence=1)[0]
+    # Occurrences past the last one inside the span take the last
+    last = index.find(_tokens('Ahmet Yilmaz'), ref_bbox=line, occurrence=5)[0]
+
+    assert second.x0 > first.x1
+    assert last == second
+    assert index.find(_tokens('Ahmet Yilmaz'), ref_bbox=_line_box(doc[0], 168)) == []
+
+
+def test_word_index_returns_one_rect_per_line(doc):
+    index = PageWordIndex(doc[0])
+
+    rects = index.find(_tokens('hesabiniz Ahmet'))
+
+    assert len(rects) == 2
+    assert rects[0].y1 < 80 and 110 < rects[1].y1 < 125
+
+
+def test_cache_reuses_indexes_until_discarded(doc):
+    cache = PageTextIndexCache()
+
+    index = cache.get(doc[0])
+    assert cache.get(doc.load_page(0)) is index
+
+    cache.discard(doc[0])
+    assert cache.get(doc[0]) is not index
+
+
+def test_cache_keys_pages_per_document(doc):
+    other = fitz.open()
+    other.new_page().insert_text((72, 72), "Mehmet Demir", fontsize=11)
+    cache = PageTextIndexCache()
+
+    assert cache.get(doc[0]) is not cache.get(other[0])
+    assert cache.get(other[0]).find('Mehmet Demir')
+    other.close()
@@ -0,0 +1,61 @@
+"""
+Tests for pdf.verify - post-redaction leak check
+"""
+import fitz  # PyMuPDF
+
+from pdf.verify import LeakVerifier
+
+
+def _pdf(*lines):
+    doc = fitz.open()
+    page = doc.new_page()
+    for i, line in enumerate(lines):
+        page.insert_text((72, 72 + 20 * i), line, fontsize=11)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_original_inside_a_replacement_word_is_still_checked():
+    entities = [{'word': 'Can', 'replacement': 'Ozcan Demir'}]
+    verifier = LeakVerifier()
+
+    clean = verifier.verify_bytes(_pdf("Sayin Ozcan Demir geldi"), entities)
+    leaked = verifier.verify_bytes(_pdf("Sayin Ozcan Demir geldi", "Imza: Can"), entities)
+
+    assert clean['passed'] and clean['patterns'] == 1
+    assert not leaked['passed'] and leaked['leaks'] == [{'page': 0, 'text': 'Can'}]
+
+
+def test_hits_inside_written_replacement_text_are_ignored():
+    entities = [{'word': 'Demir', 'replacement': 'Ozcan Demir'}]
+    verifier = LeakVerifier()
+
+    clean = verifier.verify_bytes(_pdf("Sayin Ozcan Demir geldi"), entities)
+    leaked = verifier.verify_bytes(_pdf("Sayin Ozcan Demir geldi", "Demir imzaladi"), entities)
+
+    assert clean['passed'] and clean['ignored_hits'] == 1
+    assert not leaked['passed'] and leaked['leak_count'] == 1 and leaked['ignored_hits'] == 1
+
+
+def test_case_diacritics_and_spacing_are_normalized():
+    entities = [{'word': 'Ahmet Yılmaz', 'replacement': 'Kadir Sonmez'}]
+
+    report = LeakVerifier().verify_bytes(_pdf("AHMET YILMAZ", "ahmetyilmaz"), entities)
+
+    assert report['leak_count'] == 2 and report['pages'] == [0]
+
+
+def test_short_originals_are_reported_as_skipped():
+    entities = [{'word': 'Ay', 'replacement': 'Su'}, {'word': 'Vestel', 'replacement': 'Arcam'}]
+
+    report = LeakVerifier().verify_bytes(_pdf("Ay ve Arcam"), entities)
+
+    assert report['passed']
+    assert report['patterns'] == 1 and report['skipped_patterns'] == 1
+
+
+def test_censored_output_passes():
+    entities = [{'word': 'Ahmet Yilmaz', 'replacement': '***** ******'}]
+
+    assert LeakVerifier().verify_bytes(_pdf("Sayin ***** ****** geldi"), entities)['passed']